@@ -0,0 +1,72 @@
+"""Measures how much memory parsed requirements take up.
+
+Generates a large requirements.txt file (see
+bench_parse_requirements_list.py), parses all of it into a list and
+reports the memory held by the resulting entries.
+
+    python benchmarks/bench_entry_memory.py [--lines 500000] [--packages 5000]
+        [--no-line-text] [--stream]
+
+With --stream, the entries are counted and dropped right away. That
+measures the memory needed to parse the file, rather than to hold the
+result.
+
+Like in an aggregated list of a large repository, the same packages and
+files are referred to many times.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_parse_requirements_list import (  # noqa: E402
+    generate_requirements_txt,
+)
+
+from pippackagelist.parse_requirements_txt import (  # noqa: E402
+    parse_requirements_txt,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", default=500000, type=int)
+    parser.add_argument("--packages", default=5000, type=int)
+    parser.add_argument("--no-line-text", default=False, action="store_true")
+    parser.add_argument("--stream", default=False, action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "requirements.txt")
+        generate_requirements_txt(file_path, args.lines, args.packages)
+
+        gc.collect()
+        tracemalloc.start()
+
+        entries = parse_requirements_txt(file_path, not args.no_line_text)
+        if args.stream:
+            count = sum(1 for _ in entries)
+        else:
+            entries = list(entries)
+            count = len(entries)
+
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"lines:     {args.lines}")
+    print(f"entries:   {count}")
+    print(f"retained:  {current / 1024 / 1024:.1f} MB")
+    print(f"peak:      {peak / 1024 / 1024:.1f} MB")
+    print(f"per entry: {current / count:.0f} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
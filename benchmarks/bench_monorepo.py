@@ -0,0 +1,389 @@
+"""Measures how listing the packages of a monorepo scales.
+
+Generates a synthetic monorepo (see generate_monorepo.py) and runs every
+scenario against it: the CLI with a combination of flags, or one of
+the parsers on all files of the monorepo. Every run happens in a fresh
+process, for which the time spent listing/parsing, the wall time
+(which includes starting Python and importing) and the peak memory (max
+RSS) are measured. Throughput is the number of lines that were read
+(of all files, or of the files the parser reads) divided by the time
+spent listing/parsing them.
+
+    python benchmarks/bench_monorepo.py [--size medium] [--repeat 3]
+        [--scenario NAME ...] [--save-baseline NAME] [--compare NAME]
+        [--threshold 0.1]
+
+Results can be saved as a baseline (in benchmarks/baselines/NAME.json)
+and later runs compared against it, e.g. on the previous release:
+
+    git checkout v1.0
+    python benchmarks/bench_monorepo.py --save-baseline v1.0
+    git checkout main
+    python benchmarks/bench_monorepo.py --compare v1.0
+
+When comparing, scenarios that got slower or use more memory than the
+threshold allows are reported as regressions and the exit code is 1.
+Baselines are only comparable on the same machine.
+
+Only works on Unix-like systems, memory is measured using os.wait4.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from generate_monorepo import (  # noqa: E402
+    Monorepo,
+    MonorepoSpec,
+    generate_monorepo,
+    sizes,
+)
+
+baselines_dir = os.path.join(os.path.dirname(__file__), "baselines")
+
+# Flags for the CLI, which is pointed at the services directory
+cli_scenarios = {
+    "cli-default": [],
+    "cli-recurse-recursive": ["--recurse-recursive"],
+    "cli-recurse-all": [
+        "--recurse-recursive",
+        "--recurse-editable",
+        "--recurse-path",
+    ],
+    "cli-inline-constraints": [
+        "--recurse-recursive",
+        "--inline-constraints",
+    ],
+    "cli-dedupe-semantic": [
+        "--recurse-recursive",
+        "--recurse-editable",
+        "--dedupe-mode",
+        "semantic",
+    ],
+    "cli-remove-all": [
+        "--recurse-recursive",
+        "--remove-editable",
+        "--remove-path",
+        "--remove-constraints",
+        "--remove-vcs",
+        "--remove-wheel",
+        "--remove-unversioned",
+        "--remove-index-urls",
+    ],
+    "cli-setup-py-exec": [
+        "--recurse-recursive",
+        "--recurse-editable",
+        "--setup-py-mode",
+        "exec",
+    ],
+    "cli-setup-py-workers": [
+        "--recurse-recursive",
+        "--recurse-editable",
+        "--setup-py-mode",
+        "exec",
+        "--setup-py-workers",
+        "4",
+    ],
+    "cli-jobs": ["--recurse-recursive", "--recurse-editable", "-j", "4"],
+    "cli-json": ["--recurse-recursive", "--format", "json"],
+}
+
+
+def _run_cli(monorepo: Monorepo, flags: List[str]) -> None:
+    from pippackagelist.__main__ import main
+
+    main(
+        flags
+        + ["--scan", os.path.join(monorepo.directory, "services")]
+        + ["-o", os.devnull]
+    )
+
+
+def _run_parse_requirements_txt(monorepo: Monorepo) -> None:
+    from pippackagelist.parse_requirements_txt import parse_requirements_txt
+
+    for file_path in monorepo.requirements_paths:
+        for _ in parse_requirements_txt(file_path):
+            pass
+
+
+def _run_parse_setup_py(monorepo: Monorepo, mode_value: str) -> None:
+    from pippackagelist.parse_setup_py import SetupPyMode, parse_setup_py
+
+    mode = SetupPyMode(mode_value)
+    extras = [
+        f"extra{extra}" for extra in range(monorepo.spec.extras_per_package)
+    ]
+
+    for file_path in monorepo.setup_py_paths:
+        for _ in parse_setup_py(file_path, extras, mode):
+            pass
+
+
+scenarios: Dict[str, Callable[[Monorepo], None]] = {
+    **{
+        name: (lambda monorepo, flags=flags: _run_cli(monorepo, flags))
+        for name, flags in cli_scenarios.items()
+    },
+    "parse_requirements_txt": _run_parse_requirements_txt,
+    "parse_setup_py-static": lambda monorepo: _run_parse_setup_py(
+        monorepo, "static"
+    ),
+    "parse_setup_py-exec": lambda monorepo: _run_parse_setup_py(
+        monorepo, "exec"
+    ),
+}
+
+
+def _scenario_lines(name: str, monorepo: Monorepo) -> int:
+    if name.startswith("parse_setup_py"):
+        return monorepo.setup_py_lines
+
+    if name == "parse_requirements_txt":
+        return monorepo.lines - monorepo.setup_py_lines
+
+    return monorepo.lines
+
+
+def _run_child(name: str, monorepo_path: str) -> int:
+    """Runs a single scenario and prints how long it took, in a
+    process of its own."""
+
+    with open(monorepo_path, "r") as fp:
+        data = json.load(fp)
+
+    monorepo = Monorepo(**dict(data, spec=MonorepoSpec(**data["spec"])))
+
+    # Importing is part of the wall time, not of the time spent listing
+    import pippackagelist.__main__  # noqa: F401
+
+    start = time.perf_counter()
+    scenarios[name](monorepo)
+    print(json.dumps({"time": time.perf_counter() - start}))
+    return 0
+
+
+def _max_rss_bytes(max_rss: int) -> int:
+    # Kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return max_rss
+
+    return max_rss * 1024
+
+
+def _measure(name: str, monorepo_path: str) -> Dict[str, float]:
+    start = time.perf_counter()
+
+    process = subprocess.Popen(
+        [sys.executable, __file__, "--child", name, monorepo_path],
+        stdout=subprocess.PIPE,
+    )
+    output = process.stdout.read()
+    process.stdout.close()
+
+    _, status, rusage = os.wait4(process.pid, 0)
+    # Already waited for, keep Popen from doing so as well
+    process.returncode = status
+
+    wall = time.perf_counter() - start
+
+    if status != 0:
+        raise RuntimeError(f"Scenario '{name}' failed")
+
+    return {
+        "time": json.loads(output)["time"],
+        "wall": wall,
+        "peak_memory": _max_rss_bytes(rusage.ru_maxrss),
+    }
+
+
+def run(
+    size: str, names: List[str], repeat: int
+) -> Dict[str, Dict[str, float]]:
+    """Runs the specified scenarios `repeat` times each, keeping the
+    best time and the highest peak memory."""
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        monorepo = generate_monorepo(directory, sizes[size])
+
+        # Describes the monorepo to the processes running the scenarios
+        monorepo_path = os.path.join(directory, "monorepo.json")
+        with open(monorepo_path, "w") as fp:
+            json.dump(asdict(monorepo), fp)
+
+        for name in names:
+            measurements = [
+                _measure(name, monorepo_path) for _ in range(repeat)
+            ]
+
+            best_time = min(
+                measurement["time"] for measurement in measurements
+            )
+            results[name] = {
+                "time": best_time,
+                "wall": min(
+                    measurement["wall"] for measurement in measurements
+                ),
+                "peak_memory": max(
+                    measurement["peak_memory"] for measurement in measurements
+                ),
+                "throughput": _scenario_lines(name, monorepo) / best_time,
+            }
+
+            print(_format_result(name, results[name]), flush=True)
+
+    return results
+
+
+def _format_result(name: str, result: Dict[str, float]) -> str:
+    return (
+        f"{name:<28} "
+        f"{result['time'] * 1000:>9.1f}ms "
+        f"{result['wall'] * 1000:>9.1f}ms "
+        f"{result['peak_memory'] / 1024 / 1024:>8.1f}MB "
+        f"{result['throughput']:>12,.0f} lines/s"
+    )
+
+
+def _baseline_path(name: str) -> str:
+    return os.path.join(baselines_dir, f"{name}.json")
+
+
+def save_baseline(
+    name: str, size: str, results: Dict[str, Dict[str, float]]
+) -> str:
+    os.makedirs(baselines_dir, exist_ok=True)
+
+    file_path = _baseline_path(name)
+    with open(file_path, "w") as fp:
+        json.dump(
+            {
+                "size": size,
+                "spec": asdict(sizes[size]),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            fp,
+            indent=2,
+            sort_keys=True,
+        )
+
+    return file_path
+
+
+def load_baseline(name: str, size: str) -> Dict[str, Any]:
+    with open(_baseline_path(name), "r") as fp:
+        baseline = json.load(fp)
+
+    if baseline["spec"] != asdict(sizes[size]):
+        raise RuntimeError(
+            f"Baseline '{name}' was made with a different monorepo, "
+            f"use --size {baseline['size']}"
+        )
+
+    return baseline
+
+
+def compare(
+    name: str,
+    baseline: Dict[str, Any],
+    results: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Prints how the results compare to the specified baseline.
+
+    Returns the names of the scenarios that regressed by more than
+    `threshold` (a fraction) in time or peak memory.
+    """
+
+    regressions = []
+
+    print()
+    print(f"{'compared to ' + name:<28} {'time':>11} {'peak memory':>12}")
+
+    for scenario, result in results.items():
+        base_result = baseline["results"].get(scenario)
+        if not base_result:
+            print(f"{scenario:<28} {'new':>11} {'new':>12}")
+            continue
+
+        time_change = result["time"] / base_result["time"] - 1
+        memory_change = (
+            result["peak_memory"] / base_result["peak_memory"] - 1
+        )
+
+        regressed = time_change > threshold or memory_change > threshold
+        if regressed:
+            regressions.append(scenario)
+
+        print(
+            f"{scenario:<28} {time_change:>+11.1%} {memory_change:>+12.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--child"]:
+        return _run_child(*argv[1:])
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="medium", choices=list(sizes))
+    parser.add_argument("--repeat", default=3, type=int)
+    parser.add_argument(
+        "--scenario",
+        default=[],
+        action="append",
+        choices=list(scenarios),
+        help="only run this scenario (can be specified multiple times)",
+    )
+    parser.add_argument("--save-baseline", default=None, metavar="NAME")
+    parser.add_argument("--compare", default=None, metavar="NAME")
+    parser.add_argument(
+        "--threshold",
+        default=0.1,
+        type=float,
+        help="fraction time and peak memory can grow by before it counts as a regression (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    # Fail before spending minutes on running the benchmarks
+    baseline = None
+    if args.compare:
+        baseline = load_baseline(args.compare, args.size)
+
+    print(
+        f"{'scenario':<28} {'time':>11} {'wall':>11} "
+        f"{'peak':>10} {'throughput':>20}"
+    )
+    results = run(args.size, args.scenario or list(scenarios), args.repeat)
+
+    if args.save_baseline:
+        file_path = save_baseline(args.save_baseline, args.size, results)
+        print(f"\nsaved {file_path}")
+
+    if baseline:
+        if compare(args.compare, baseline, results, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Measures the throughput of parsing a large requirements.txt file.
+
+Generates a file with a realistic mix of entries (pinned packages,
+markers, extras, comments, blank lines, includes, VCS and wheel URLs)
+and times how long it takes to parse it.
+
+    python benchmarks/bench_parse_requirements_list.py [--lines 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pippackagelist.parse_requirements_txt import (  # noqa: E402
+    parse_requirements_txt,
+)
+
+line_templates = [
+    "package{index}=={index}.0.1",
+    "package{index}>=1.{index}",
+    "package{index}",
+    "package{index}[extra1,extra2]==2.0",
+    'package{index}==1.0 ; sys_platform == "linux"',
+    "# comment about package{index}",
+    "",
+    "-r requirements-{index}.txt",
+    "-c constraints-{index}.txt",
+    "-e ./package-{index}",
+    "git+https://github.com/org/package{index}@v1.0#egg=package{index}",
+    "https://mirror.com/package{index}-1.0-py3-none-any.whl",
+    "package{index} @ https://mirror.com/package{index}.zip",
+    "-i https://mirror.com/simple",
+]
+
+
+def generate_requirements_txt(
+    file_path: str, lines: int, packages: Optional[int] = None
+) -> None:
+    """Generates a file with `lines` lines, referring to at most
+    `packages` different packages (and files)."""
+
+    rng = random.Random(42)
+
+    with open(file_path, "w") as fp:
+        for index in range(lines):
+            if packages:
+                index %= packages
+
+            fp.write(rng.choice(line_templates).format(index=index) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", default=200000, type=int)
+    parser.add_argument("--repeat", default=5, type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "requirements.txt")
+        generate_requirements_txt(file_path, args.lines)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            entries = sum(1 for _ in parse_requirements_txt(file_path))
+            timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"lines:   {args.lines}")
+    print(f"entries: {entries}")
+    print(f"best:    {best:.3f}s ({args.lines / best:,.0f} lines/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Measures the throughput of parsing a file generated by pip-compile.
+
+Generates a compiled requirements file with 5,000 pinned packages, each
+with multiple hashes spread over continuation lines and `# via`
+comments, and times how long it takes to parse it.
+
+    python benchmarks/bench_pip_compile.py [--packages 5000]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pippackagelist.parse_requirements_txt import (  # noqa: E402
+    parse_requirements_txt,
+)
+
+
+def generate_compiled_requirements_txt(file_path: str, packages: int) -> int:
+    """Generates the file and returns the number of lines in it."""
+
+    rng = random.Random(42)
+    lines = [
+        "#",
+        "# This file is autogenerated by pip-compile",
+        "#",
+        "#    pip-compile --generate-hashes requirements.in",
+        "#",
+    ]
+
+    for index in range(packages):
+        requirement = f"package{index}=={rng.randint(0, 9)}.{index}.0"
+        if rng.random() < 0.1:
+            requirement += ' ; python_version >= "3.7"'
+
+        lines.append(requirement + " \\")
+
+        hashes = [
+            hashlib.sha256(f"{index}-{count}".encode()).hexdigest()
+            for count in range(rng.randint(1, 6))
+        ]
+        for count, package_hash in enumerate(hashes):
+            last = count == len(hashes) - 1
+            lines.append(
+                f"    --hash=sha256:{package_hash}" + ("" if last else " \\")
+            )
+
+        via = [f"package{rng.randrange(packages)}" for _ in range(3)]
+        if rng.random() < 0.5:
+            lines.append(f"    # via {via[0]}")
+        else:
+            lines.append("    # via")
+            lines.extend(f"    #   {name}" for name in via)
+
+    with open(file_path, "w") as fp:
+        fp.write("\n".join(lines) + "\n")
+
+    return len(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packages", default=5000, type=int)
+    parser.add_argument("--repeat", default=10, type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "requirements.txt")
+        lines = generate_compiled_requirements_txt(file_path, args.packages)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            entries = sum(1 for _ in parse_requirements_txt(file_path))
+            timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"packages: {args.packages}")
+    print(f"lines:    {lines}")
+    print(f"entries:  {entries}")
+    print(
+        f"best:     {best * 1000:.1f}ms "
+        f"({args.packages / best:,.0f} packages/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Measures how long it takes the CLI to start on a trivial input.
+
+Every run of the CLI pays for starting Python and importing the
+package, which for a small requirements.txt is nearly all the time it
+takes. Each scenario is run in a fresh process a number of times (after
+a run that writes the bytecode, like an installed package has it) and
+the median wall time is reported, along with how much of it is on top
+of starting a bare Python.
+
+    python benchmarks/bench_startup.py [--repeat 20] [--importtime]
+        [--max-overhead 150]
+
+With --importtime, the modules that took the longest to import when
+listing a requirements.txt are printed as well. With --max-overhead,
+the exit code is 1 when listing a requirements.txt takes more than that
+many milliseconds on top of starting Python.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Dict, List, Optional
+
+package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def _scenarios(directory: str) -> Dict[str, List[str]]:
+    requirements_path = os.path.join(directory, "requirements.txt")
+    with open(requirements_path, "w") as fp:
+        fp.write("django==4.2\nredis>=4.0\n-c constraints.txt\n")
+
+    with open(os.path.join(directory, "constraints.txt"), "w") as fp:
+        fp.write("redis==5.0\n")
+
+    setup_py_path = os.path.join(directory, "setup.py")
+    with open(setup_py_path, "w") as fp:
+        fp.write(
+            "from setuptools import setup\n\n"
+            "setup(install_requires=['django==4.2'])\n"
+        )
+
+    return {
+        "python": ["-c", "pass"],
+        "import": ["-c", "import pippackagelist"],
+        "cli-help": ["-m", "pippackagelist", "--help"],
+        "cli-requirements-txt": ["-m", "pippackagelist", requirements_path],
+        "cli-inline-constraints": [
+            "-m",
+            "pippackagelist",
+            "--inline-constraints",
+            requirements_path,
+        ],
+        "cli-setup-py-static": [
+            "-m",
+            "pippackagelist",
+            "--setup-py-mode",
+            "static",
+            setup_py_path,
+        ],
+        "cli-setup-py-exec": [
+            "-m",
+            "pippackagelist",
+            "--setup-py-mode",
+            "exec",
+            setup_py_path,
+        ],
+    }
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [package_dir] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+
+    # Compiling the package on every run isn't what users see
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def _measure(args: List[str], repeat: int) -> float:
+    env = _environment()
+    command = [sys.executable] + args
+
+    # Writes the bytecode
+    subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            command, env=env, stdout=subprocess.DEVNULL, check=True
+        )
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def _slowest_imports(args: List[str], count: int) -> List[str]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        env=_environment(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    imports = []
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.rstrip()))
+
+    return [
+        f"{cumulative / 1000:>8.1f}ms {name}"
+        for cumulative, name in sorted(imports, reverse=True)[:count]
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", default=20, type=int)
+    parser.add_argument(
+        "--importtime",
+        default=False,
+        help="print the slowest imports of listing a requirements.txt",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--max-overhead",
+        default=None,
+        type=float,
+        metavar="MS",
+        help="fail when listing a requirements.txt takes longer than this on top of starting Python",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        scenarios = _scenarios(directory)
+
+        print(f"{'scenario':<28} {'median':>10} {'overhead':>10}")
+
+        results = {}
+        for name, scenario_args in scenarios.items():
+            results[name] = _measure(scenario_args, args.repeat)
+            overhead = results[name] - results["python"]
+
+            print(
+                f"{name:<28} {results[name] * 1000:>8.1f}ms "
+                f"{overhead * 1000:>8.1f}ms",
+                flush=True,
+            )
+
+        if args.importtime:
+            print()
+            for line in _slowest_imports(
+                scenarios["cli-requirements-txt"], 20
+            ):
+                print(line)
+
+    overhead = results["cli-requirements-txt"] - results["python"]
+    if args.max_overhead is not None and overhead * 1000 > args.max_overhead:
+        print(
+            f"\nlisting a requirements.txt takes {overhead * 1000:.1f}ms "
+            f"on top of starting Python, more than {args.max_overhead}ms"
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
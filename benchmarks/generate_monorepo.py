@@ -0,0 +1,321 @@
+"""Generates a synthetic monorepo to benchmark against.
+
+The monorepo has a requirements.txt file per service that includes
+shared files through several layers of -r entries. Every file includes
+multiple files of the layer below it, so that the same files are
+reached through many paths (diamond includes). A handful of constraint
+files are referred to by -c entries from many files (fan-in), services
+install local setup.py packages with extras through -e entries and
+some services include a pip-compile style file with hashes.
+
+    python benchmarks/generate_monorepo.py DIR [--size medium]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+
+from dataclasses import asdict, dataclass
+from typing import List
+
+
+@dataclass
+class MonorepoSpec:
+    # Root requirements.txt files, one per service
+    services: int = 50
+    # Layers of shared files below the services, i.e. the -r depth
+    layers: int = 4
+    files_per_layer: int = 20
+    # Files of the next layer every file includes, more than one
+    # creates diamonds
+    includes_per_file: int = 3
+    requirements_per_file: int = 30
+    # Number of different third-party packages to pick from
+    package_pool: int = 1000
+    constraint_files: int = 3
+    # Number of files that refer to each constraint file
+    constraint_fan_in: int = 30
+    # Local setup.py packages and the -e entries per service
+    packages: int = 20
+    extras_per_package: int = 2
+    editables_per_service: int = 3
+    # Services that include a pip-compile style file with hashes
+    hashed_files: int = 10
+    hashed_requirements: int = 200
+    seed: int = 42
+
+
+sizes = {
+    "small": MonorepoSpec(
+        services=5,
+        layers=2,
+        files_per_layer=5,
+        includes_per_file=2,
+        requirements_per_file=10,
+        package_pool=100,
+        constraint_files=1,
+        constraint_fan_in=5,
+        packages=3,
+        editables_per_service=1,
+        hashed_files=1,
+        hashed_requirements=50,
+    ),
+    "medium": MonorepoSpec(),
+    "large": MonorepoSpec(
+        services=200,
+        layers=6,
+        files_per_layer=50,
+        includes_per_file=4,
+        requirements_per_file=50,
+        package_pool=5000,
+        constraint_files=5,
+        constraint_fan_in=100,
+        packages=100,
+        editables_per_service=5,
+        hashed_files=50,
+        hashed_requirements=500,
+    ),
+}
+
+
+@dataclass
+class Monorepo:
+    directory: str
+    spec: MonorepoSpec
+    # The root files, one per service
+    root_paths: List[str]
+    requirements_paths: List[str]
+    setup_py_paths: List[str]
+    # Total number of lines in all requirements.txt and setup.py files
+    lines: int
+    setup_py_lines: int
+
+
+def _requirement(rng: random.Random, spec: MonorepoSpec) -> str:
+    name = f"dist-{rng.randrange(spec.package_pool)}"
+
+    kind = rng.random()
+    if kind < 0.5:
+        return f"{name}=={rng.randint(0, 9)}.{rng.randint(0, 20)}.0"
+    if kind < 0.7:
+        return f"{name}>={rng.randint(0, 9)}.0"
+    if kind < 0.8:
+        return f'{name}[extra]==1.0 ; python_version >= "3.7"'
+    if kind < 0.9:
+        # Differently spelled, same package after normalizing
+        return name.replace("-", "_").upper()
+
+    return name
+
+
+def _write_lines(file_path: str, lines: List[str]) -> int:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    with open(file_path, "w") as fp:
+        fp.write("\n".join(lines) + "\n")
+
+    return len(lines)
+
+
+def generate_monorepo(directory: str, spec: MonorepoSpec) -> Monorepo:
+    """Generates the monorepo described by `spec` in `directory`.
+
+    The same spec always generates the same files.
+    """
+
+    rng = random.Random(spec.seed)
+    line_count = 0
+
+    def _relpath(file_path: str, from_path: str) -> str:
+        return os.path.relpath(file_path, os.path.dirname(from_path))
+
+    constraint_paths = [
+        os.path.join(directory, "constraints", f"constraints-{index}.txt")
+        for index in range(spec.constraint_files)
+    ]
+    for constraint_path in constraint_paths:
+        line_count += _write_lines(
+            constraint_path,
+            [
+                f"dist-{index}=={rng.randint(0, 9)}.0.0"
+                for index in range(0, spec.package_pool, 2)
+            ],
+        )
+
+    layer_paths = [
+        [
+            os.path.join(directory, "common", f"layer-{layer}-{index}.txt")
+            for index in range(spec.files_per_layer)
+        ]
+        for layer in range(spec.layers)
+    ]
+
+    # Files that get a -c entry, spread over all files
+    all_paths = [path for paths in layer_paths for path in paths]
+    root_paths = [
+        os.path.join(
+            directory, "services", f"service-{index}", "requirements.txt"
+        )
+        for index in range(spec.services)
+    ]
+    constrained_paths = {
+        constraint_path: set(
+            rng.sample(
+                all_paths + root_paths,
+                min(spec.constraint_fan_in, len(all_paths + root_paths)),
+            )
+        )
+        for constraint_path in constraint_paths
+    }
+
+    def _constraint_lines(file_path: str) -> List[str]:
+        return [
+            f"-c {_relpath(constraint_path, file_path)}"
+            for constraint_path in constraint_paths
+            if file_path in constrained_paths[constraint_path]
+        ]
+
+    for layer, paths in enumerate(layer_paths):
+        for file_path in paths:
+            lines = _constraint_lines(file_path)
+
+            if layer + 1 < spec.layers:
+                for included_path in rng.sample(
+                    layer_paths[layer + 1],
+                    min(spec.includes_per_file, spec.files_per_layer),
+                ):
+                    lines.append(f"-r {_relpath(included_path, file_path)}")
+
+            lines.extend(
+                _requirement(rng, spec)
+                for _ in range(spec.requirements_per_file)
+            )
+            line_count += _write_lines(file_path, lines)
+
+    setup_py_paths = []
+    setup_py_line_count = 0
+    for index in range(spec.packages):
+        setup_py_path = os.path.join(
+            directory, "packages", f"package-{index}", "setup.py"
+        )
+        extras = {
+            f"extra{extra}": [_requirement(rng, spec) for _ in range(3)]
+            for extra in range(spec.extras_per_package)
+        }
+
+        setup_py_line_count += _write_lines(
+            setup_py_path,
+            [
+                "from setuptools import setup",
+                "",
+                "setup(",
+                f'    name="package-{index}",',
+                "    install_requires=[",
+                *[
+                    f"        {_requirement(rng, spec)!r},"
+                    for _ in range(spec.requirements_per_file // 3)
+                ],
+                "    ],",
+                f"    extras_require={extras!r},",
+                ")",
+            ],
+        )
+        setup_py_paths.append(setup_py_path)
+
+    requirements_paths = list(all_paths)
+    for index, root_path in enumerate(root_paths):
+        lines = _constraint_lines(root_path)
+
+        if layer_paths:
+            for included_path in rng.sample(
+                layer_paths[0],
+                min(spec.includes_per_file, spec.files_per_layer),
+            ):
+                lines.append(f"-r {_relpath(included_path, root_path)}")
+
+        for setup_py_path in rng.sample(
+            setup_py_paths, min(spec.editables_per_service, spec.packages)
+        ):
+            extra = rng.randrange(max(spec.extras_per_package, 1))
+            lines.append(
+                f"-e {_relpath(os.path.dirname(setup_py_path), root_path)}"
+                + (f"[extra{extra}]" if spec.extras_per_package else "")
+            )
+
+        if index < spec.hashed_files:
+            compiled_path = os.path.join(
+                os.path.dirname(root_path), "requirements-compiled.txt"
+            )
+            line_count += _write_lines(
+                compiled_path, _compiled_lines(rng, spec)
+            )
+            lines.append("-r requirements-compiled.txt")
+            requirements_paths.append(compiled_path)
+
+        lines.extend(
+            _requirement(rng, spec) for _ in range(spec.requirements_per_file)
+        )
+        line_count += _write_lines(root_path, lines)
+
+    return Monorepo(
+        directory=directory,
+        spec=spec,
+        root_paths=root_paths,
+        requirements_paths=root_paths + requirements_paths,
+        setup_py_paths=setup_py_paths,
+        lines=line_count + setup_py_line_count,
+        setup_py_lines=setup_py_line_count,
+    )
+
+
+def _compiled_lines(rng: random.Random, spec: MonorepoSpec) -> List[str]:
+    """Generates the lines of a file like pip-compile --generate-hashes
+    writes."""
+
+    lines = [
+        "#",
+        "# This file is autogenerated by pip-compile",
+        "#",
+    ]
+
+    for index in rng.sample(
+        range(spec.package_pool),
+        min(spec.hashed_requirements, spec.package_pool),
+    ):
+        lines.append(f"dist-{index}=={rng.randint(0, 9)}.{index}.0 \\")
+
+        hashes = [
+            hashlib.sha256(f"{index}-{count}".encode()).hexdigest()
+            for count in range(rng.randint(1, 4))
+        ]
+        for count, package_hash in enumerate(hashes):
+            last = count == len(hashes) - 1
+            lines.append(
+                f"    --hash=sha256:{package_hash}" + ("" if last else " \\")
+            )
+
+        lines.append(f"    # via dist-{rng.randrange(spec.package_pool)}")
+
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("--size", default="medium", choices=list(sizes))
+    args = parser.parse_args()
+
+    monorepo = generate_monorepo(args.directory, sizes[args.size])
+
+    print(f"spec:     {asdict(monorepo.spec)}")
+    print(f"roots:    {len(monorepo.root_paths)}")
+    print(f"files:    {len(monorepo.requirements_paths)}")
+    print(f"setup.py: {len(monorepo.setup_py_paths)}")
+    print(f"lines:    {monorepo.lines}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,180 @@
-from .entry import (
-    RequirementsEditableEntry,
-    RequirementsEntry,
-    RequirementsEntrySource,
-    RequirementsPackageEntry,
-    RequirementsRecursiveEntry,
-    RequirementsVCSPackageEntry,
-)
-from .list_packages_from_files import list_packages_from_files
-from .parse_requirements_list import (
-    RequirementsEntryParseError,
-    parse_requirements_list,
-)
-from .parse_requirements_txt import parse_requirements_txt
-from .parse_setup_py import parse_setup_py
+import importlib
+import sys
+import types
+
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .build_requirements_graph import build_requirements_graph
+    from .canonicalize_package_name import canonicalize_package_name
+    from .constraint_index import ConstraintIndex
+    from .entry import (
+        RequirementsEditableEntry,
+        RequirementsEntry,
+        RequirementsEntrySource,
+        RequirementsPackageEntry,
+        RequirementsRecursiveEntry,
+        RequirementsVCSPackageEntry,
+    )
+    from .error import (
+        DeclarativeMetadataError,
+        OutputProfilesError,
+        RequirementsIncludeCycleError,
+        RootsManifestError,
+        SetupPyStaticAnalysisError,
+        SetupPyTimeoutError,
+        SetupPyWorkerError,
+    )
+    from .extract_setup_py_kwargs import extract_setup_py_kwargs
+    from .list_packages_from_files import DedupeMode, list_packages_from_files
+    from .parse_memo import ParseMemo
+    from .parse_pipfile_lock import parse_pipfile_lock
+    from .parse_poetry_lock import parse_poetry_lock
+    from .parse_pyproject_toml import parse_pyproject_toml
+    from .parse_requirements_list import (
+        RequirementsEntryParseError,
+        parse_requirements_buffer,
+        parse_requirements_lines,
+        parse_requirements_list,
+    )
+    from .parse_requirements_txt import parse_requirements_txt
+    from .parse_session import ParseSession
+    from .parse_setup_cfg import parse_setup_cfg
+    from .parse_setup_py import SetupPyMode, parse_setup_py
+    from .read_requirements_lines import read_requirements_lines
+    from .render_requirements import RenderFormat, render_requirements
+    from .requirements_graph import (
+        RequirementsGraph,
+        RequirementsGraphEdge,
+        RequirementsGraphEdgeKind,
+        RequirementsGraphNode,
+    )
+    from .run_observer import (
+        FileParseTiming,
+        RunObserver,
+        RunObserverGroup,
+        RunStatistics,
+        StageTiming,
+    )
+    from .scan_package_list_files import IgnorePatterns, scan_package_list_files
+    from .trace_recorder import TraceRecorder
+    from .update_root_outputs import update_root_outputs
+    from .watch_package_list_files import watch_package_list_files
+    from .write_output_profiles import (
+        OutputProfile,
+        read_output_profiles,
+        write_output_profiles,
+    )
+    from .write_root_lists import read_roots_manifest, write_root_lists
+
+# The module every name is defined in. Modules are only imported once
+# one of their names is used, so that using one part of the package
+# doesn't pay for importing all of it.
+_exports = {
+    "build_requirements_graph": "build_requirements_graph",
+    "canonicalize_package_name": "canonicalize_package_name",
+    "ConstraintIndex": "constraint_index",
+    "RequirementsEditableEntry": "entry",
+    "RequirementsEntry": "entry",
+    "RequirementsEntrySource": "entry",
+    "RequirementsPackageEntry": "entry",
+    "RequirementsRecursiveEntry": "entry",
+    "RequirementsVCSPackageEntry": "entry",
+    "DeclarativeMetadataError": "error",
+    "OutputProfilesError": "error",
+    "RequirementsIncludeCycleError": "error",
+    "RootsManifestError": "error",
+    "SetupPyStaticAnalysisError": "error",
+    "SetupPyTimeoutError": "error",
+    "SetupPyWorkerError": "error",
+    "extract_setup_py_kwargs": "extract_setup_py_kwargs",
+    "DedupeMode": "list_packages_from_files",
+    "list_packages_from_files": "list_packages_from_files",
+    "ParseMemo": "parse_memo",
+    "parse_pipfile_lock": "parse_pipfile_lock",
+    "parse_poetry_lock": "parse_poetry_lock",
+    "parse_pyproject_toml": "parse_pyproject_toml",
+    "RequirementsEntryParseError": "parse_requirements_list",
+    "parse_requirements_buffer": "parse_requirements_list",
+    "parse_requirements_lines": "parse_requirements_list",
+    "parse_requirements_list": "parse_requirements_list",
+    "parse_requirements_txt": "parse_requirements_txt",
+    "ParseSession": "parse_session",
+    "parse_setup_cfg": "parse_setup_cfg",
+    "SetupPyMode": "parse_setup_py",
+    "parse_setup_py": "parse_setup_py",
+    "read_requirements_lines": "read_requirements_lines",
+    "RenderFormat": "render_requirements",
+    "render_requirements": "render_requirements",
+    "RequirementsGraph": "requirements_graph",
+    "RequirementsGraphEdge": "requirements_graph",
+    "RequirementsGraphEdgeKind": "requirements_graph",
+    "RequirementsGraphNode": "requirements_graph",
+    "FileParseTiming": "run_observer",
+    "RunObserver": "run_observer",
+    "RunObserverGroup": "run_observer",
+    "RunStatistics": "run_observer",
+    "StageTiming": "run_observer",
+    "IgnorePatterns": "scan_package_list_files",
+    "scan_package_list_files": "scan_package_list_files",
+    "TraceRecorder": "trace_recorder",
+    "update_root_outputs": "update_root_outputs",
+    "watch_package_list_files": "watch_package_list_files",
+    "OutputProfile": "write_output_profiles",
+    "read_output_profiles": "write_output_profiles",
+    "write_output_profiles": "write_output_profiles",
+    "read_roots_manifest": "write_root_lists",
+    "write_root_lists": "write_root_lists",
+}
 
 __all__ = [
     "parse_setup_py",
+    "extract_setup_py_kwargs",
+    "SetupPyMode",
+    "SetupPyStaticAnalysisError",
+    "SetupPyTimeoutError",
+    "SetupPyWorkerError",
+    "parse_setup_cfg",
+    "parse_pyproject_toml",
+    "DeclarativeMetadataError",
+    "parse_pipfile_lock",
+    "parse_poetry_lock",
     "parse_requirements_txt",
     "parse_requirements_list",
+    "parse_requirements_buffer",
+    "parse_requirements_lines",
+    "read_requirements_lines",
     "list_packages_from_files",
+    "DedupeMode",
+    "RequirementsIncludeCycleError",
+    "ConstraintIndex",
+    "canonicalize_package_name",
+    "scan_package_list_files",
+    "watch_package_list_files",
+    "update_root_outputs",
+    "write_root_lists",
+    "read_roots_manifest",
+    "RootsManifestError",
+    "write_output_profiles",
+    "read_output_profiles",
+    "OutputProfile",
+    "OutputProfilesError",
+    "ParseMemo",
+    "ParseSession",
+    "build_requirements_graph",
+    "RequirementsGraph",
+    "RequirementsGraphNode",
+    "RequirementsGraphEdge",
+    "RequirementsGraphEdgeKind",
+    "render_requirements",
+    "RunObserver",
+    "RunStatistics",
+    "RunObserverGroup",
+    "FileParseTiming",
+    "StageTiming",
+    "TraceRecorder",
+    "RenderFormat",
+    "IgnorePatterns",
     "RequirementsEntryParseError",
     "RequirementsEditableEntry",
     "RequirementsEntry",
@@ -26,5 +182,31 @@ __all__ = [
     "RequirementsVCSPackageEntry",
     "RequirementsEntrySource",
     "RequirementsPackageEntry",
-    "parse_requirements",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _exports.get(name)
+    if not module_name:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_exports))
+
+
+class _LazyModule(types.ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Importing a module of the package sets it as an attribute of
+        # the package, which would hide the function of the same name.
+        if isinstance(value, types.ModuleType) and name in _exports:
+            return
+
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyModule
@@ -1,11 +1,53 @@
 import argparse
+import itertools
+import os
 import sys
 
-from .list_packages_from_files import list_packages_from_files
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
 
+from .entry import RequirementsEntry
+from .list_packages_from_files import DedupeMode, list_packages_from_files
+from .parse_setup_py import SetupPyMode
+from .render_requirements import RenderFormat, render_requirements
+from .scan_package_list_files import (
+    IgnorePatterns,
+    default_scan_include,
+    scan_package_list_files,
+)
+
+# Starting is most of the time it takes to list a small file, what only
+# some of the options need is imported when they're used.
+if TYPE_CHECKING:  # pragma: no cover
+    from .run_observer import RunObserver
+
+
+def _add_recurse_arguments(
+    parser: argparse.ArgumentParser, default: bool = False
+) -> None:
+    if default:
+        parser.add_argument(
+            "--no-recurse-recursive",
+            dest="recurse_recursive",
+            default=True,
+            help="don't recurse into -r entries",
+            action="store_false",
+        )
+        parser.add_argument(
+            "--no-recurse-editable",
+            dest="recurse_editable",
+            default=True,
+            help="don't recurse into -e entries",
+            action="store_false",
+        )
+        parser.add_argument(
+            "--no-recurse-path",
+            dest="recurse_path",
+            default=True,
+            help="don't recurse into local path entries",
+            action="store_false",
+        )
+        return
 
-def main() -> int:
-    parser = argparse.ArgumentParser()
     parser.add_argument(
         "--recurse-recursive",
         default=False,
@@ -24,6 +66,231 @@ def main() -> int:
         help="recurse into local path entries",
         action="store_true",
     )
+
+
+def _add_read_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--include-build-requires",
+        default=False,
+        help="also list the build-system requires of pyproject.toml files",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--include-dev-packages",
+        default=False,
+        help="also list the development packages of Pipfile.lock and poetry.lock files",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--setup-py-mode",
+        default=SetupPyMode.AUTO.value,
+        choices=[mode.value for mode in SetupPyMode],
+        help="how to read setup.py files, auto tries static analysis before executing them (default: auto)",
+    )
+    parser.add_argument(
+        "--setup-py-workers",
+        default=0,
+        type=int,
+        metavar="N",
+        help="evaluate setup.py files in N worker processes (default: 0, evaluate in-process)",
+    )
+    parser.add_argument(
+        "--setup-py-timeout",
+        default=None,
+        type=float,
+        metavar="SECONDS",
+        help="maximum time evaluating a single setup.py can take, requires --setup-py-workers",
+    )
+    parser.add_argument(
+        "--setup-py-memory-limit",
+        default=None,
+        type=int,
+        metavar="MB",
+        help="maximum memory a setup.py worker process can use, requires --setup-py-workers",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=1,
+        type=int,
+        metavar="N",
+        help="read and parse upcoming files on N threads (default: 1)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="cache parsed files in this directory and re-use them across runs",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        default=256,
+        type=int,
+        metavar="MB",
+        help="maximum size of the cache directory (default: 256)",
+    )
+
+
+def _add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--scan",
+        default=[],
+        action="append",
+        metavar="DIR",
+        help="find requirements files in this directory (can be specified multiple times)",
+    )
+    parser.add_argument(
+        "--scan-include",
+        default=[],
+        action="append",
+        metavar="GLOB",
+        help="file names to look for when scanning (default: %s)"
+        % ", ".join(default_scan_include),
+    )
+    parser.add_argument(
+        "--scan-exclude",
+        default=[],
+        action="append",
+        metavar="PATTERN",
+        help="skip files and directories matching this .gitignore-style pattern when scanning",
+    )
+    parser.add_argument(
+        "--scan-exclude-from",
+        default=[],
+        action="append",
+        metavar="FILE",
+        help="read patterns to skip when scanning from a .gitignore-style file",
+    )
+    parser.add_argument(
+        "file_paths",
+        nargs="*",
+        help="list of requirements.txt, setup.py, setup.cfg, pyproject.toml, Pipfile.lock or poetry.lock files",
+    )
+
+
+def _file_paths(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> Iterable[str]:
+    if not args.file_paths and not args.scan:
+        parser.error("specify at least one file or a directory to --scan")
+
+    exclude = IgnorePatterns.from_files(
+        args.scan_exclude_from, args.scan_exclude
+    )
+
+    return itertools.chain(
+        args.file_paths,
+        *[
+            scan_package_list_files(
+                directory,
+                include=args.scan_include or default_scan_include,
+                exclude=exclude,
+            )
+            for directory in args.scan
+        ],
+    )
+
+
+def _read_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return dict(
+        recurse_recursive=args.recurse_recursive,
+        recurse_editable=args.recurse_editable,
+        recurse_path=args.recurse_path,
+        include_build_requires=args.include_build_requires,
+        include_dev_packages=args.include_dev_packages,
+        setup_py_mode=SetupPyMode(args.setup_py_mode),
+        setup_py_workers=args.setup_py_workers,
+        setup_py_timeout=args.setup_py_timeout,
+        setup_py_memory_limit=(
+            args.setup_py_memory_limit * 1024 * 1024
+            if args.setup_py_memory_limit
+            else None
+        ),
+        cache_dir=args.cache_dir,
+        cache_max_size=args.cache_max_size * 1024 * 1024,
+        jobs=args.jobs,
+    )
+
+
+def _changed_files(values: List[str]) -> List[str]:
+    changed_files = []
+
+    for value in values:
+        if value != "-":
+            changed_files.append(value)
+            continue
+
+        # e.g. piped from `git diff --name-only`
+        changed_files.extend(
+            line.strip() for line in sys.stdin if line.strip()
+        )
+
+    return changed_files
+
+
+def _format_location(entry: RequirementsEntry) -> str:
+    if not entry.source:
+        return str(entry)
+
+    location = os.path.relpath(entry.source.path)
+    if entry.source.line_number:
+        location += f":{entry.source.line_number}"
+
+    return f"{location}: {entry}"
+
+
+def why(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} why",
+        description="explain which files pull in a package and through which includes",
+    )
+    parser.add_argument(
+        "package", help="name of the package, spelled any way",
+    )
+    # A package can only be explained by following the includes
+    _add_recurse_arguments(parser, default=True)
+    _add_read_arguments(parser)
+    _add_scan_arguments(parser)
+
+    # Allows options between the package and the files
+    args = parser.parse_intermixed_args(argv)
+
+    from .build_requirements_graph import build_requirements_graph
+
+    graph = build_requirements_graph(
+        _file_paths(parser, args), **_read_options(args)
+    )
+
+    explanations = graph.why(args.package)
+    if not explanations:
+        print(
+            f"{args.package} is not required by any of the files",
+            file=sys.stderr,
+        )
+        return 1
+
+    for index, (chain, entry) in enumerate(explanations):
+        if index:
+            print()
+
+        for edge in chain:
+            print(_format_location(edge.entry))
+
+        print(_format_location(entry))
+
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv[:1] == ["why"]:
+        return why(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        epilog="use '%(prog)s why PACKAGE ...' to find out why a package is in the list",
+    )
+    _add_recurse_arguments(parser)
     parser.add_argument(
         "--inline-constraints",
         default=False,
@@ -36,6 +303,12 @@ def main() -> int:
         help="de-duplicate the resulting list",
         action="store_true",
     )
+    parser.add_argument(
+        "--dedupe-mode",
+        default=None,
+        choices=[mode.value for mode in DedupeMode],
+        help="what counts as a duplicate, semantic also matches differently spelled package names (default: exact), implies --dedupe",
+    )
     parser.add_argument(
         "--remove-editable",
         default=False,
@@ -85,18 +358,111 @@ def main() -> int:
         action="store_true",
     )
     parser.add_argument(
-        "file_paths",
-        nargs="+",
-        help="list of requirements.txt or setup.py files",
+        "--reemit-includes",
+        default=False,
+        help="emit the entries of files that are included multiple times every time they are included",
+        action="store_true",
+    )
+    _add_read_arguments(parser)
+    _add_scan_arguments(parser)
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        metavar="FILE",
+        help="write the list to this file instead of stdout",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        metavar="DIR",
+        help="write the list of each file to its own file in this directory, mirroring the directory structure",
+    )
+    parser.add_argument(
+        "--changed-files",
+        default=[],
+        action="append",
+        metavar="FILE",
+        help="only update the lists in --output-dir that include this file (can be specified multiple times, - reads paths from stdin)",
     )
+    parser.add_argument(
+        "--roots-file",
+        default=None,
+        metavar="FILE",
+        help="write a list for every output file in this JSON manifest of output files to input files, instead of listing the specified files",
+    )
+    parser.add_argument(
+        "--profiles-file",
+        default=None,
+        metavar="FILE",
+        help="write a variant of the list for every output file in this JSON file of output files to --remove-*, --dedupe and --inline-constraints options, reading the files only once",
+    )
+    parser.add_argument(
+        "--format",
+        default=RenderFormat.TEXT.value,
+        choices=[fmt.value for fmt in RenderFormat],
+        help="output format (default: text)",
+    )
+    parser.add_argument(
+        "--stats",
+        default=False,
+        help="print statistics about the run to stderr: files parsed, entries, duplicates, time spent per stage and the slowest setup.py files",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--stats-top",
+        default=10,
+        type=int,
+        metavar="N",
+        help="number of slowest setup.py files --stats lists (default: 10)",
+    )
+    parser.add_argument(
+        "--trace-out",
+        default=None,
+        metavar="FILE",
+        help="write a timeline of when every file was parsed, on which thread, and of every stage to this file, in the Chrome Trace Event format (open it in Perfetto or chrome://tracing)",
+    )
+    parser.add_argument(
+        "--watch",
+        default=False,
+        help="keep running and rewrite the output file whenever one of the files changes, requires --output",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        default=None,
+        type=float,
+        metavar="SECONDS",
+        help="how often to check the files for changes (default: 0.5)",
+    )
+    args = parser.parse_args(argv)
 
-    args = parser.parse_args()
+    if args.watch and not args.output:
+        parser.error("--watch requires --output")
 
-    requirements = list_packages_from_files(
-        args.file_paths,
-        recurse_recursive=args.recurse_recursive,
-        recurse_editable=args.recurse_editable,
-        recurse_path=args.recurse_path,
+    if args.output_dir and (args.output or args.watch):
+        parser.error("--output-dir cannot be combined with --output or --watch")
+
+    if args.changed_files and not args.output_dir:
+        parser.error("--changed-files requires --output-dir")
+
+    if args.roots_file and (args.file_paths or args.scan):
+        parser.error("--roots-file cannot be combined with files or --scan")
+
+    if args.roots_file and (args.output or args.output_dir or args.watch):
+        parser.error(
+            "--roots-file cannot be combined with --output, --output-dir or --watch"
+        )
+
+    if args.profiles_file and (
+        args.output or args.output_dir or args.watch or args.roots_file
+    ):
+        parser.error(
+            "--profiles-file cannot be combined with --output, --output-dir, --watch or --roots-file"
+        )
+
+    options = dict(
+        _read_options(args),
         inline_constraints=args.inline_constraints,
         remove_editable=args.remove_editable,
         remove_recursive=args.remove_recursive,
@@ -106,14 +472,149 @@ def main() -> int:
         remove_wheel=args.remove_wheel,
         remove_unversioned=args.remove_unversioned,
         remove_index_urls=args.remove_index_urls,
-        dedupe=args.dedupe,
+        dedupe=args.dedupe or bool(args.dedupe_mode),
+        dedupe_mode=DedupeMode(args.dedupe_mode or DedupeMode.EXACT.value),
+        reemit_includes=args.reemit_includes,
     )
 
-    for req in requirements:
-        print(req)
+    observers: List["RunObserver"] = []
 
-    return 0
+    stats = None
+    if args.stats:
+        from .run_observer import RunStatistics
+
+        stats = RunStatistics()
+        observers.append(stats)
+
+    trace = None
+    if args.trace_out:
+        from .trace_recorder import TraceRecorder
+
+        trace = TraceRecorder()
+        observers.append(trace)
+
+    if observers:
+        from .run_observer import RunObserverGroup
+
+        options["observer"] = (
+            observers[0] if len(observers) == 1 else RunObserverGroup(observers)
+        )
+
+    exit_code = _run(parser, args, options)
+
+    if stats:
+        # The list itself may be written to stdout
+        stats.render_summary(sys.stderr, top=args.stats_top)
+
+    if trace:
+        with open(args.trace_out, "w") as fp:
+            trace.write(fp)
+
+    return exit_code
+
+
+def _run(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    options: Dict[str, Any],
+) -> int:
+    if args.roots_file:
+        from .write_root_lists import read_roots_manifest, write_root_lists
+
+        for output_path in write_root_lists(
+            read_roots_manifest(args.roots_file),
+            fmt=RenderFormat(args.format),
+            **options,
+        ):
+            print(output_path)
+
+        return 0
 
+    file_paths = _file_paths(parser, args)
 
-if __name__ == "__main__":
-    sys.exit(main())
+    if args.profiles_file:
+        from .write_output_profiles import (
+            output_option_names,
+            read_output_profiles,
+            write_output_profiles,
+        )
+
+        output_options = {
+            name: options.pop(name) for name in output_option_names
+        }
+
+        for output_path in write_output_profiles(
+            file_paths,
+            read_output_profiles(args.profiles_file, **output_options),
+            fmt=RenderFormat(args.format),
+            **options,
+        ):
+            print(output_path)
+
+        return 0
+
+    if args.output_dir:
+        from .update_root_outputs import update_root_outputs
+
+        changed_files = None
+        if args.changed_files:
+            changed_files = _changed_files(args.changed_files)
+
+        for output_path in update_root_outputs(
+            file_paths,
+            args.output_dir,
+            changed_files=changed_files,
+            fmt=RenderFormat(args.format),
+            **options,
+        ):
+            print(output_path)
+
+        return 0
+
+    if args.watch:
+        from .watch_package_list_files import watch_package_list_files
+
+        if args.watch_interval is not None:
+            options["poll_interval"] = args.watch_interval
+
+        try:
+            for _ in watch_package_list_files(
+                list(file_paths),
+                args.output,
+                fmt=RenderFormat(args.format),
+                **options,
+            ):
+                pass
+        except KeyboardInterrupt:
+            pass
+
+        return 0
+
+    requirements = list_packages_from_files(file_paths, **options)
+    observer = options.get("observer")
+
+    def _write(render: Callable[[Iterable[RequirementsEntry]], None]) -> None:
+        if not observer:
+            render(requirements)
+            return
+
+        from .run_observer import _observe_output
+
+        _observe_output(observer, "render", render, requirements)
+
+    if not args.output:
+        _write(
+            lambda entries: render_requirements(
+                entries, fmt=RenderFormat(args.format)
+            )
+        )
+        return 0
+
+    with open(args.output, "w") as fp:
+        _write(
+            lambda entries: render_requirements(
+                entries, fmt=RenderFormat(args.format), out=fp
+            )
+        )
+
+    return 0
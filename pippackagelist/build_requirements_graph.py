@@ -0,0 +1,37 @@
+from typing import Iterable
+
+from .list_packages_from_files import list_packages_from_files
+from .requirements_graph import RequirementsGraph
+
+
+def build_requirements_graph(
+    file_paths: Iterable[str],
+    *,
+    recurse_recursive: bool = True,
+    recurse_editable: bool = True,
+    recurse_path: bool = True,
+    **kwargs,
+) -> RequirementsGraph:
+    """Reads the specified files and everything they include into a
+    graph of files, the entries in them and the includes between them.
+
+    By default, all -r, -e and path entries are followed. Constraint
+    files (-c) are part of the graph, but their entries are not read.
+    Any other keyword arguments are passed on to
+    `list_packages_from_files`.
+    """
+
+    graph = RequirementsGraph()
+
+    for _ in list_packages_from_files(
+        file_paths,
+        recurse_recursive=recurse_recursive,
+        recurse_editable=recurse_editable,
+        recurse_path=recurse_path,
+        graph=graph,
+        **kwargs,
+    ):
+        pass
+
+    graph.index()
+    return graph
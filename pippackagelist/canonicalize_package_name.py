@@ -0,0 +1,8 @@
+import re
+
+# From: https://peps.python.org/pep-0503/#normalized-names
+_separators_regex = re.compile(r"[-_.]+")
+
+
+def canonicalize_package_name(name: str) -> str:
+    return _separators_regex.sub("-", name).lower()
@@ -0,0 +1,253 @@
+import os
+
+from collections import defaultdict, deque
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .canonicalize_package_name import canonicalize_package_name
+from .entry import (
+    RequirementsConstraintsEntry,
+    RequirementsEditableEntry,
+    RequirementsEntry,
+    RequirementsEntrySource,
+    RequirementsPathPackageEntry,
+    RequirementsRecursiveEntry,
+)
+from .error import (
+    ConstraintWithoutNameError,
+    DeclarativeMetadataError,
+    SetupPyStaticAnalysisError,
+)
+from .extract_setup_py_kwargs import extract_setup_py_kwargs
+from .find_package_metadata_file import find_package_metadata_file
+from .identify_package_list_file_type import (
+    PackageListFileType,
+    identify_package_list_file_type,
+)
+from .parse_pipfile_lock import parse_pipfile_lock
+from .parse_poetry_lock import parse_poetry_lock
+from .parse_pyproject_toml import parse_pyproject_toml
+from .parse_requirements_list import _parse_line, line_regex
+from .parse_requirements_txt import parse_requirements_txt
+from .parse_setup_cfg import parse_setup_cfg
+from .parse_setup_py import SetupPyMode, _parse_setup_kwargs
+from .read_requirements_lines import read_requirements_lines
+
+# Kinds of lines that can lead to a constraints file
+_prescan_kinds = {"constraints", "recursive", "editable", "path"}
+
+
+class ConstraintIndex:
+    """Constraints from one or more constraint files, by package name.
+
+    Each file is only parsed once, no matter how often it is added.
+    Package names are normalized (PEP 503). When multiple files
+    constrain the same package, the file that was added first wins.
+    Multiple entries for the same package in a single file are all kept,
+    they usually have different markers.
+    """
+
+    def __init__(
+        self,
+        parse: Callable[
+            [str], Iterable[RequirementsEntry]
+        ] = parse_requirements_txt,
+    ) -> None:
+        self.parse = parse
+        self.file_paths: List[str] = []
+        self.constraints: Dict[str, List[RequirementsEntry]] = {}
+
+        self._real_file_paths: Set[str] = set()
+
+    def add(self, file_path: str) -> bool:
+        """Adds the constraints from the specified file.
+
+        Returns False if the file was already added before.
+        """
+
+        real_path = os.path.realpath(file_path)
+        if real_path in self._real_file_paths:
+            return False
+
+        file_constraints = defaultdict(list)
+        for constraint in self.parse(real_path):
+            package_name = constraint.package_name()
+            if package_name is None:
+                raise ConstraintWithoutNameError(constraint)
+
+            file_constraints[canonicalize_package_name(package_name)].append(
+                constraint
+            )
+
+        for package_name, constraints in file_constraints.items():
+            self.constraints.setdefault(package_name, constraints)
+
+        self.file_paths.append(real_path)
+        self._real_file_paths.add(real_path)
+        return True
+
+    def get(self, package_name: str) -> Optional[List[RequirementsEntry]]:
+        return self.constraints.get(canonicalize_package_name(package_name))
+
+    def __contains__(self, file_path: str) -> bool:
+        return os.path.realpath(file_path) in self._real_file_paths
+
+    def __len__(self) -> int:
+        return len(self.constraints)
+
+
+def prescan_constraint_files(
+    file_paths: Iterable[str],
+    *,
+    recurse_recursive: bool = False,
+    recurse_editable: bool = False,
+    recurse_path: bool = False,
+    include_dev_packages: bool = False,
+    memory_map: bool = True,
+    setup_py_mode: SetupPyMode = SetupPyMode.AUTO,
+    parse: Optional[Callable[[str], Iterable[RequirementsEntry]]] = None,
+) -> Optional[List[str]]:
+    """Finds the constraint files the specified files refer to, in the
+    order they are referred to.
+
+    Only the lines that can lead to a constraints file (-c, -r, -e and
+    paths) are parsed and files are visited in the same order as
+    `list_packages_from_files` does: the specified files first, then
+    the files they include, breadth first.
+
+    Requirements files are parsed with `parse` when specified, rather
+    than only reading the lines that matter, e.g. to keep their entries
+    around for listing them afterwards (see `ParseMemo`).
+
+    Returns None if the list could not be determined up front, for
+    example because a setup.py cannot be read without executing it.
+    With `setup_py_mode` EXEC, setup.py files are always executed, so
+    there is no prescan at all.
+    """
+
+    if setup_py_mode == SetupPyMode.EXEC:
+        return None
+
+    constraint_files = []
+    seen_constraint_files = set()
+
+    visited: Set[Tuple[str, Tuple[str, ...]]] = set()
+    queue: Deque[Tuple[str, List[str]]] = deque()
+
+    def _enqueue(file_path: str, extras: List[str]) -> None:
+        key = (os.path.realpath(file_path), tuple(sorted(extras)))
+        if key in visited:
+            return
+
+        visited.add(key)
+        queue.append((file_path, extras))
+
+    for file_path in file_paths:
+        _enqueue(file_path, [])
+
+    while queue:
+        file_path, extras = queue.popleft()
+
+        try:
+            entries = list(
+                _prescan_file(
+                    file_path, extras, include_dev_packages, memory_map, parse
+                )
+            )
+        except (
+            OSError,
+            SyntaxError,
+            SetupPyStaticAnalysisError,
+            DeclarativeMetadataError,
+        ):
+            # Let the actual parsing raise the error, or in the
+            # case of a setup.py, execute it.
+            return None
+
+        for entry in entries:
+            if isinstance(entry, RequirementsConstraintsEntry):
+                if entry.absolute_path not in seen_constraint_files:
+                    seen_constraint_files.add(entry.absolute_path)
+                    constraint_files.append(entry.absolute_path)
+            elif isinstance(entry, RequirementsRecursiveEntry):
+                if recurse_recursive:
+                    _enqueue(entry.absolute_path, [])
+            elif isinstance(entry, RequirementsEditableEntry):
+                if recurse_editable:
+                    _enqueue(
+                        find_package_metadata_file(
+                            entry.resolved_absolute_path
+                        ),
+                        entry.extras,
+                    )
+            elif isinstance(entry, RequirementsPathPackageEntry):
+                if recurse_path:
+                    _enqueue(
+                        find_package_metadata_file(
+                            entry.resolved_absolute_path
+                        ),
+                        entry.extras,
+                    )
+
+    return constraint_files
+
+
+def _prescan_file(
+    file_path: str,
+    extras: List[str],
+    include_dev_packages: bool = False,
+    memory_map: bool = True,
+    parse: Optional[Callable[[str], Iterable[RequirementsEntry]]] = None,
+) -> Generator[RequirementsEntry, None, None]:
+    file_type = identify_package_list_file_type(file_path)
+
+    if file_type == PackageListFileType.SETUP_PY:
+        setup_kwargs = extract_setup_py_kwargs(file_path)
+        for entry in _parse_setup_kwargs(file_path, setup_kwargs, extras):
+            yield entry
+        return
+
+    if file_type == PackageListFileType.PYPROJECT_TOML:
+        for entry in parse_pyproject_toml(file_path, extras):
+            yield entry
+        return
+
+    if file_type == PackageListFileType.SETUP_CFG:
+        for entry in parse_setup_cfg(file_path, extras):
+            yield entry
+        return
+
+    if file_type == PackageListFileType.PIPFILE_LOCK:
+        for entry in parse_pipfile_lock(file_path, include_dev_packages):
+            yield entry
+        return
+
+    if file_type == PackageListFileType.POETRY_LOCK:
+        for entry in parse_poetry_lock(file_path, include_dev_packages):
+            yield entry
+        return
+
+    if parse:
+        for entry in parse(file_path):
+            yield entry
+        return
+
+    source = RequirementsEntrySource(
+        path=os.path.realpath(file_path), line=None, line_number=None
+    )
+
+    for line_number, line in read_requirements_lines(
+        file_path, memory_map=memory_map
+    ):
+        match = line_regex.match(line)
+        if match and match.lastgroup in _prescan_kinds:
+            yield _parse_line(source, line_number, match)
@@ -1,9 +1,57 @@
 import os
 
-from dataclasses import dataclass, field
-from typing import List, Optional
+from dataclasses import dataclass, field, fields
+from typing import Callable, Hashable, List, Optional, Tuple
 
+from .canonicalize_package_name import canonicalize_package_name
 
+
+def _canonicalize_extras(extras: List[str]) -> tuple:
+    return tuple(sorted(canonicalize_package_name(extra) for extra in extras))
+
+
+def _canonicalize_markers(markers: Optional[str]) -> Optional[str]:
+    if not markers:
+        return None
+
+    return " ".join(markers.split())
+
+
+def _relpath_from_cwd(path: str) -> str:
+    return os.path.relpath(path, os.getcwd())
+
+
+def _slotted(cls):
+    """Re-creates a dataclass with __slots__ for its fields.
+
+    This is what `@dataclass(slots=True)` does on Python 3.10 and newer.
+    Instances don't have a __dict__, which saves a lot of memory when
+    there are hundreds of thousands of them.
+    """
+
+    field_names = [f.name for f in fields(cls)]
+
+    inherited_slots = set()
+    for base in cls.__mro__[1:]:
+        inherited_slots.update(getattr(base, "__slots__", ()))
+
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = tuple(
+        name for name in field_names if name not in inherited_slots
+    )
+
+    # Defaults are already baked into __init__, as class attributes
+    # they would conflict with the slots.
+    for name in field_names:
+        cls_dict.pop(name, None)
+
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@_slotted
 @dataclass
 class RequirementsEntrySource:
     path: str
@@ -11,6 +59,7 @@ class RequirementsEntrySource:
     line_number: Optional[str] = None
 
 
+@_slotted
 @dataclass
 class RequirementsEntry:
     source: Optional[RequirementsEntrySource]
@@ -18,27 +67,60 @@ class RequirementsEntry:
     def package_name(self) -> Optional[str]:
         return None
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        """Gets a hashable value identifying this requirement.
+
+        Two entries with the same identity render to the same line. When
+        `semantic` is set, names and extras are normalized (PEP 503) so
+        that differently spelled entries for the same package compare
+        equal as well.
+        """
 
+        return (type(self), str(self))
+
+    def render(self, relpath: Callable[[str], str]) -> str:
+        """Renders this entry as a line for a requirements file.
+
+        Paths are made relative using `relpath`. Rendering with str()
+        makes them relative to the current working directory.
+        """
+
+        return str(self)
+
+
+@_slotted
 @dataclass
 class RequirementsRecursiveEntry(RequirementsEntry):
     original_path: str
     absolute_path: str
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        return ("-r", self.absolute_path)
+
+    def render(self, relpath: Callable[[str], str]) -> str:
+        return f"-r {relpath(self.absolute_path)}"
+
     def __str__(self) -> str:
-        path = os.path.relpath(self.absolute_path, os.getcwd())
-        return f"-r {path}"
+        return self.render(_relpath_from_cwd)
 
 
+@_slotted
 @dataclass
 class RequirementsConstraintsEntry(RequirementsEntry):
     original_path: str
     absolute_path: str
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        return ("-c", self.absolute_path)
+
+    def render(self, relpath: Callable[[str], str]) -> str:
+        return f"-c {relpath(self.absolute_path)}"
+
     def __str__(self) -> str:
-        path = os.path.relpath(self.absolute_path, os.getcwd())
-        return f"-c {path}"
+        return self.render(_relpath_from_cwd)
 
 
+@_slotted
 @dataclass
 class RequirementsEditableEntry(RequirementsEntry):
     original_path: str
@@ -50,8 +132,15 @@ class RequirementsEditableEntry(RequirementsEntry):
     extras: List[str] = field(default_factory=list)
     options: Optional[str] = None
 
-    def __str__(self) -> str:
-        line = os.path.relpath(self.absolute_path, os.getcwd())
+    def identity(self, semantic: bool = False) -> Hashable:
+        extras = tuple(self.extras)
+        if semantic:
+            extras = _canonicalize_extras(self.extras)
+
+        return ("-e", self.absolute_path, extras, self.options)
+
+    def render(self, relpath: Callable[[str], str]) -> str:
+        line = relpath(self.absolute_path)
         if self.extras:
             line += "[" + ",".join(self.extras) + "]"
 
@@ -60,15 +149,23 @@ class RequirementsEditableEntry(RequirementsEntry):
 
         return f"-e {line}"
 
+    def __str__(self) -> str:
+        return self.render(_relpath_from_cwd)
+
 
+@_slotted
 @dataclass
 class RequirementsIndexURLEntry(RequirementsEntry):
     url: str
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        return ("-i", self.url)
+
     def __str__(self) -> str:
         return f"-i {self.url}"
 
 
+@_slotted
 @dataclass
 class RequirementsVCSPackageEntry(RequirementsEntry):
     vcs: str
@@ -81,6 +178,13 @@ class RequirementsVCSPackageEntry(RequirementsEntry):
     def package_name(self) -> Optional[str]:
         return self.name
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        name = self.name
+        if semantic and name:
+            name = canonicalize_package_name(name)
+
+        return ("vcs", self.vcs, self.uri, self.tag, name, self.options)
+
     def __str__(self) -> str:
         line = f"{self.vcs}+{self.uri}"
         if self.tag:
@@ -95,6 +199,7 @@ class RequirementsVCSPackageEntry(RequirementsEntry):
         return line
 
 
+@_slotted
 @dataclass
 class RequirementsPathPackageEntry(RequirementsEntry):
     original_path: str
@@ -106,17 +211,28 @@ class RequirementsPathPackageEntry(RequirementsEntry):
     extras: List[str] = field(default_factory=list)
     options: Optional[str] = None
 
-    def __str__(self) -> str:
-        line = os.path.relpath(self.absolute_path, os.getcwd())
+    def identity(self, semantic: bool = False) -> Hashable:
+        extras = tuple(self.extras)
+        if semantic:
+            extras = _canonicalize_extras(self.extras)
+
+        return ("path", self.absolute_path, extras, self.options)
+
+    def render(self, relpath: Callable[[str], str]) -> str:
+        line = relpath(self.absolute_path)
         if self.extras:
             line += "[" + ",".join(self.extras) + "]"
 
         if self.options:
             line += f" {self.options}"
 
-        return f"{line}"
+        return line
+
+    def __str__(self) -> str:
+        return self.render(_relpath_from_cwd)
 
 
+@_slotted
 @dataclass
 class RequirementsWheelPackageEntry(RequirementsEntry):
     uri: str
@@ -128,6 +244,14 @@ class RequirementsWheelPackageEntry(RequirementsEntry):
     def package_name(self) -> Optional[str]:
         return self.name
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        name, markers = self.name, self.markers
+        if semantic:
+            name = name and canonicalize_package_name(name)
+            markers = _canonicalize_markers(markers)
+
+        return ("wheel", self.uri, name, markers, self.options)
+
     def __str__(self) -> str:
         line = self.uri
         if self.name:
@@ -142,6 +266,7 @@ class RequirementsWheelPackageEntry(RequirementsEntry):
         return line
 
 
+@_slotted
 @dataclass
 class RequirementsDirectRefEntry(RequirementsEntry):
     name: str
@@ -153,6 +278,14 @@ class RequirementsDirectRefEntry(RequirementsEntry):
     def package_name(self) -> Optional[str]:
         return self.name
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        name, markers = self.name, self.markers
+        if semantic:
+            name = canonicalize_package_name(name)
+            markers = _canonicalize_markers(markers)
+
+        return ("direct_ref", name, self.uri, markers, self.options)
+
     def __str__(self) -> str:
         line = f"{self.name} @ {self.uri}"
         if self.markers:
@@ -164,6 +297,7 @@ class RequirementsDirectRefEntry(RequirementsEntry):
         return line
 
 
+@_slotted
 @dataclass
 class RequirementsPackageEntry(RequirementsEntry):
     name: str
@@ -174,9 +308,36 @@ class RequirementsPackageEntry(RequirementsEntry):
     markers: Optional[str] = None
     options: Optional[str] = None
 
+    # Values of the --hash options, e.g. "sha256:..."
+    hashes: Tuple[str, ...] = ()
+
     def package_name(self) -> Optional[str]:
         return self.name
 
+    def identity(self, semantic: bool = False) -> Hashable:
+        if not semantic:
+            return (
+                "package",
+                self.name,
+                tuple(self.extras),
+                self.operator,
+                self.version,
+                self.markers,
+                self.options,
+                self.hashes,
+            )
+
+        return (
+            "package",
+            canonicalize_package_name(self.name),
+            _canonicalize_extras(self.extras),
+            self.operator,
+            self.version and self.version.strip(),
+            _canonicalize_markers(self.markers),
+            self.options,
+            tuple(sorted(self.hashes)),
+        )
+
     def __str__(self) -> str:
         line = self.name
 
@@ -195,4 +356,7 @@ class RequirementsPackageEntry(RequirementsEntry):
         if self.options:
             line += f" {self.options}"
 
+        for package_hash in self.hashes:
+            line += f" --hash={package_hash}"
+
         return line
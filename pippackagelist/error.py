@@ -1,6 +1,92 @@
+from typing import List
+
 from .entry import RequirementsEntry
 
 
 class ConstraintWithoutNameError(RuntimeError):
     def __init__(self, requirement: RequirementsEntry) -> None:
         super().__init__(f"Constraint '{requirement}' does not have a name")
+
+
+class SetupPyStaticAnalysisError(RuntimeError):
+    def __init__(self, file_path: str, reason: str) -> None:
+        super().__init__(
+            f"Cannot statically determine the requirements in '{file_path}': {reason}"
+        )
+
+        self.file_path = file_path
+        self.reason = reason
+
+    def __reduce__(self):
+        return (type(self), (self.file_path, self.reason))
+
+
+class SetupPyTimeoutError(RuntimeError):
+    def __init__(self, file_path: str, timeout: float) -> None:
+        super().__init__(
+            f"Evaluating '{file_path}' took longer than {timeout} seconds"
+        )
+
+        self.file_path = file_path
+        self.timeout = timeout
+
+    def __reduce__(self):
+        return (type(self), (self.file_path, self.timeout))
+
+
+class SetupPyWorkerError(RuntimeError):
+    def __init__(self, file_path: str) -> None:
+        super().__init__(
+            f"The worker process evaluating '{file_path}' exited "
+            "unexpectedly, it might have run out of memory or crashed"
+        )
+
+        self.file_path = file_path
+
+    def __reduce__(self):
+        return (type(self), (self.file_path,))
+
+
+class RequirementsIncludeCycleError(RuntimeError):
+    def __init__(self, cycle: List[str]) -> None:
+        super().__init__("Cyclic include detected: %s" % " -> ".join(cycle))
+
+        self.cycle = cycle
+
+    def __reduce__(self):
+        return (type(self), (self.cycle,))
+
+
+class DeclarativeMetadataError(RuntimeError):
+    def __init__(self, file_path: str, reason: str) -> None:
+        super().__init__(
+            f"Cannot determine the requirements in '{file_path}': {reason}"
+        )
+
+        self.file_path = file_path
+        self.reason = reason
+
+    def __reduce__(self):
+        return (type(self), (self.file_path, self.reason))
+
+
+class RootsManifestError(RuntimeError):
+    def __init__(self, file_path: str, reason: str) -> None:
+        super().__init__(f"Invalid roots manifest '{file_path}': {reason}")
+
+        self.file_path = file_path
+        self.reason = reason
+
+    def __reduce__(self):
+        return (type(self), (self.file_path, self.reason))
+
+
+class OutputProfilesError(RuntimeError):
+    def __init__(self, file_path: str, reason: str) -> None:
+        super().__init__(f"Invalid output profiles '{file_path}': {reason}")
+
+        self.file_path = file_path
+        self.reason = reason
+
+    def __reduce__(self):
+        return (type(self), (self.file_path, self.reason))
@@ -0,0 +1,685 @@
+import ast
+import os
+
+from typing import Any, Dict, List, Optional
+
+from .error import SetupPyStaticAnalysisError
+
+# Keyword arguments to `setup()` we care about. Anything else passed to
+# `setup()` (long_description, cmdclass, etc) is allowed to be dynamic.
+setup_py_kwargs = ["install_requires", "extras_require"]
+
+# Pure methods we are willing to "call" on a resolved value. None of these
+# have side effects, so evaluating them statically is safe.
+safe_methods = {
+    str: [
+        "endswith",
+        "lower",
+        "lstrip",
+        "partition",
+        "replace",
+        "rstrip",
+        "split",
+        "splitlines",
+        "startswith",
+        "strip",
+    ],
+    list: ["copy", "index", "count"],
+    dict: ["copy", "get", "items", "keys", "values"],
+}
+
+
+# Builtins we evaluate ourselves, see `_SetupPyEvaluator.evaluate_call`.
+pure_functions = ["open", "list", "tuple", "sorted"]
+
+# Arguments of `open()`, in order, that we understand. Any others (like
+# `newline`) could change what's read.
+open_arguments = ["file", "mode", "buffering", "encoding", "errors"]
+
+# Raised by the calls we evaluate when the setup.py would fail (or do
+# something else) as well, e.g. sorted() on a mixed list or a file that
+# cannot be decoded (UnicodeDecodeError is a ValueError).
+evaluation_errors = (TypeError, ValueError, OSError)
+
+
+class _Unresolvable(Exception):
+    pass
+
+
+class _OpenedFile:
+    def __init__(
+        self,
+        path: str,
+        encoding: Optional[str] = None,
+        errors: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.encoding = encoding
+        self.errors = errors
+
+    def read(self) -> str:
+        try:
+            with open(
+                self.path, "r", encoding=self.encoding, errors=self.errors
+            ) as fp:
+                return fp.read()
+        except (OSError, ValueError, LookupError) as err:
+            raise _Unresolvable(f"cannot read '{self.path}': {err}")
+
+    def readlines(self) -> List[str]:
+        return self.read().splitlines(keepends=True)
+
+
+class _Unbound:
+    """Marks a name that was assigned something we could not resolve.
+
+    We only fail once such a name is actually needed to resolve one of
+    the keyword arguments we care about.
+    """
+
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+
+
+class _SetupPyEvaluator:
+    def __init__(
+        self, file_path: str, read_files: Optional[List[str]] = None
+    ) -> None:
+        self.file_path = os.path.realpath(file_path)
+        self.directory = os.path.dirname(self.file_path)
+        self.read_files = read_files
+
+        self.env: Dict[str, Any] = {
+            "__file__": self.file_path,
+            "__name__": "__main__",
+        }
+        self.setup_names = set()
+        self.setup_modules = set()
+        self.os_names = set()
+        self.os_path_names = set()
+
+        self.setup_kwargs: Optional[Dict[str, Any]] = None
+
+    def run(self, module: ast.Module) -> Dict[str, Any]:
+        self.execute(module.body)
+
+        if self.setup_kwargs is None:
+            raise _Unresolvable("no top-level call to setup() found")
+
+        return self.setup_kwargs
+
+    def execute(self, statements: List[ast.stmt]) -> None:
+        for statement in statements:
+            self.execute_statement(statement)
+
+    def execute_statement(self, statement: ast.stmt) -> None:
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                name = alias.asname or alias.name.split(".")[0]
+                if alias.name in ("setuptools", "distutils.core"):
+                    self.setup_modules.add(alias.asname or alias.name)
+                elif alias.name == "os":
+                    self.os_names.add(name)
+                elif alias.name == "os.path" and alias.asname:
+                    self.os_path_names.add(alias.asname)
+                elif alias.name == "os.path":
+                    self.os_names.add("os")
+
+        elif isinstance(statement, ast.ImportFrom):
+            for alias in statement.names:
+                name = alias.asname or alias.name
+                if statement.module in ("setuptools", "distutils.core"):
+                    if alias.name == "setup":
+                        self.setup_names.add(name)
+                elif statement.module == "os" and alias.name == "path":
+                    self.os_path_names.add(name)
+
+        elif isinstance(statement, ast.Assign):
+            self.forget_mutations(statement.value)
+            value = self.try_evaluate(statement.value)
+            for target in statement.targets:
+                self.bind(target, value)
+
+        elif isinstance(statement, ast.AnnAssign):
+            if statement.value is not None:
+                self.forget_mutations(statement.value)
+                self.bind(statement.target, self.try_evaluate(statement.value))
+
+        elif isinstance(statement, ast.AugAssign):
+            self.execute_aug_assign(statement)
+
+        elif isinstance(statement, ast.Expr):
+            self.execute_expression(statement.value)
+
+        elif isinstance(statement, ast.With):
+            for item in statement.items:
+                self.forget_mutations(item.context_expr)
+                value = self.try_evaluate(item.context_expr)
+                if item.optional_vars is not None:
+                    self.bind(item.optional_vars, value)
+
+            self.execute(statement.body)
+
+        elif isinstance(statement, ast.If) and self.is_main_guard(
+            statement.test
+        ):
+            self.execute(statement.body)
+
+        elif isinstance(
+            statement,
+            (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef),
+        ):
+            # Definitions do not run anything by themselves. We do not
+            # follow calls into them, so a `setup()` inside a function
+            # is only found if the function is never called (and then
+            # it doesn't matter) or it makes us bail out below.
+            self.unbind_name(statement.name, "defined as a function/class")
+            if self.contains_setup_call(statement):
+                raise _Unresolvable("setup() is called from a function")
+
+        elif isinstance(statement, (ast.Pass, ast.Assert)):
+            pass
+
+        else:
+            # Control flow (if/for/while/try) we can't reason about. Any
+            # name touched in there is no longer known, and a setup()
+            # call in there means we can't know the arguments.
+            for node in ast.walk(statement):
+                if isinstance(node, ast.Name) and isinstance(
+                    node.ctx, (ast.Store, ast.Del)
+                ):
+                    self.unbind_name(node.id, "assigned conditionally")
+
+            self.forget_mutations(statement)
+
+            if self.contains_setup_call(statement):
+                raise _Unresolvable("setup() is called conditionally")
+
+    def execute_aug_assign(self, statement: ast.AugAssign) -> None:
+        if not isinstance(statement.target, ast.Name):
+            return
+
+        name = statement.target.id
+        try:
+            current = self.lookup(name)
+            value = self.evaluate(statement.value)
+            if not isinstance(statement.op, ast.Add):
+                raise _Unresolvable("only += is supported")
+
+            self.env[name] = current + value
+        except (_Unresolvable, TypeError) as err:
+            self.unbind_name(name, str(err))
+
+    def execute_expression(self, node: ast.expr) -> None:
+        if not isinstance(node, ast.Call):
+            return
+
+        if self.is_setup_callee(node.func):
+            if self.setup_kwargs is not None:
+                raise _Unresolvable("setup() is called more than once")
+
+            self.setup_kwargs = self.evaluate_setup_call(node)
+            return
+
+        # Track in-place mutation of lists we know about, such
+        # as `requirements.append("django")`.
+        func = node.func
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and func.attr in ("append", "extend", "insert", "update")
+        ):
+            name = func.value.id
+            try:
+                target = self.lookup(name)
+                args = [self.evaluate(arg) for arg in node.args]
+                getattr(target, func.attr)(*args)
+            except (_Unresolvable, AttributeError, TypeError) as err:
+                self.unbind_name(name, str(err))
+            return
+
+        self.forget_mutations(node)
+
+    def evaluate_setup_call(self, node: ast.Call) -> Dict[str, Any]:
+        kwargs = {}
+
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                value = self.evaluate(keyword.value)
+                if not isinstance(value, dict):
+                    raise _Unresolvable("**kwargs is not a dict")
+
+                kwargs.update(
+                    {
+                        key: value
+                        for key, value in value.items()
+                        if key in setup_py_kwargs
+                    }
+                )
+
+            elif keyword.arg in setup_py_kwargs:
+                kwargs[keyword.arg] = self.evaluate(keyword.value)
+
+        install_requires = kwargs.get("install_requires")
+        if install_requires is not None and not _is_requirements_list(
+            install_requires
+        ):
+            raise _Unresolvable("install_requires is not a list of strings")
+
+        extras_require = kwargs.get("extras_require")
+        if extras_require is not None and not (
+            isinstance(extras_require, dict)
+            and all(
+                _is_requirements_list(requirements)
+                for requirements in extras_require.values()
+            )
+        ):
+            raise _Unresolvable("extras_require is not a dict of lists")
+
+        return kwargs
+
+    def try_evaluate(self, node: ast.expr) -> Any:
+        try:
+            return self.evaluate(node)
+        except (_Unresolvable,) + evaluation_errors as err:
+            return _Unbound(str(err))
+
+    def evaluate(self, node: ast.expr) -> Any:
+        if isinstance(node, ast.Name):
+            return self.lookup(node.id)
+
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            items = []
+            for element in node.elts:
+                if isinstance(element, ast.Starred):
+                    items.extend(self.evaluate(element.value))
+                else:
+                    items.append(self.evaluate(element))
+
+            if isinstance(node, ast.Tuple):
+                return tuple(items)
+
+            return items
+
+        if isinstance(node, ast.Dict):
+            result = {}
+            for key, value in zip(node.keys, node.values):
+                if key is None:
+                    result.update(self.evaluate(value))
+                else:
+                    result[self.evaluate(key)] = self.evaluate(value)
+
+            return result
+
+        if isinstance(node, ast.BinOp):
+            left = self.evaluate(node.left)
+            right = self.evaluate(node.right)
+
+            try:
+                if isinstance(node.op, ast.Add):
+                    return left + right
+                if isinstance(node.op, ast.Mod) and isinstance(left, str):
+                    return left % right
+            except TypeError as err:
+                raise _Unresolvable(str(err))
+
+            raise _Unresolvable("unsupported operator")
+
+        if isinstance(node, ast.BoolOp):
+            # Short-circuits and evaluates to one of the operands, like
+            # `requirements or []` does.
+            for value_node in node.values:
+                value = self.evaluate(value_node)
+                if bool(value) == isinstance(node.op, ast.Or):
+                    return value
+
+            return value
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return not self.evaluate(node.operand)
+
+        if isinstance(node, ast.Compare):
+            return self.evaluate_compare(node)
+
+        if isinstance(node, ast.Subscript):
+            return self.evaluate_subscript(node)
+
+        if isinstance(node, ast.JoinedStr):
+            return "".join(
+                str(self.evaluate(value.value))
+                if isinstance(value, ast.FormattedValue)
+                else self.evaluate(value)
+                for value in node.values
+            )
+
+        if isinstance(node, ast.ListComp):
+            return self.evaluate_list_comprehension(node)
+
+        if isinstance(node, ast.Call):
+            return self.evaluate_call(node)
+
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            raise _Unresolvable(
+                f"cannot statically resolve {type(node).__name__}"
+            )
+
+    def evaluate_compare(self, node: ast.Compare) -> bool:
+        operators = {
+            ast.Eq: lambda a, b: a == b,
+            ast.NotEq: lambda a, b: a != b,
+            ast.In: lambda a, b: a in b,
+            ast.NotIn: lambda a, b: a not in b,
+        }
+
+        left = self.evaluate(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            operator = operators.get(type(op))
+            if not operator:
+                raise _Unresolvable("unsupported comparison")
+
+            right = self.evaluate(comparator)
+            if not operator(left, right):
+                return False
+
+            left = right
+
+        return True
+
+    def evaluate_subscript(self, node: ast.Subscript) -> Any:
+        value = self.evaluate(node.value)
+
+        index = node.slice
+        # Python < 3.9 wraps plain subscripts in ast.Index
+        if type(index).__name__ == "Index":
+            index = index.value
+
+        try:
+            if isinstance(index, ast.Slice):
+                return value[
+                    slice(
+                        *[
+                            self.evaluate(part) if part else None
+                            for part in (index.lower, index.upper, index.step)
+                        ]
+                    )
+                ]
+
+            return value[self.evaluate(index)]
+        except (IndexError, KeyError, TypeError) as err:
+            raise _Unresolvable(str(err))
+
+    def evaluate_list_comprehension(self, node: ast.ListComp) -> List[Any]:
+        if len(node.generators) != 1:
+            raise _Unresolvable("nested comprehensions are not supported")
+
+        generator = node.generators[0]
+        if not isinstance(generator.target, ast.Name):
+            raise _Unresolvable("unsupported comprehension target")
+
+        iterable = self.evaluate(generator.iter)
+        if isinstance(iterable, _OpenedFile):
+            iterable = iterable.readlines()
+
+        name = generator.target.id
+        previous = self.env.get(name)
+
+        result = []
+        try:
+            for item in iterable:
+                self.env[name] = item
+                if all(self.evaluate(test) for test in generator.ifs):
+                    result.append(self.evaluate(node.elt))
+        finally:
+            self.env[name] = previous
+
+        return result
+
+    def evaluate_call(self, node: ast.Call) -> Any:
+        func = node.func
+
+        if isinstance(func, ast.Name) and func.id == "open":
+            return self.evaluate_open(node)
+
+        if node.keywords:
+            raise _Unresolvable("keyword arguments are not supported")
+
+        if isinstance(func, ast.Name):
+            args = [self.evaluate(arg) for arg in node.args]
+
+            if func.id in pure_functions and len(args) <= 1:
+                return {"list": list, "tuple": tuple, "sorted": sorted}[
+                    func.id
+                ](*args)
+
+            raise _Unresolvable(f"call to unknown function {func.id}()")
+
+        if not isinstance(func, ast.Attribute):
+            raise _Unresolvable("unsupported call")
+
+        if self.is_os_path_attribute(func.value):
+            args = [self.evaluate(arg) for arg in node.args]
+            if func.attr in ("join", "dirname", "abspath", "realpath"):
+                return getattr(os.path, func.attr)(*args)
+
+            raise _Unresolvable(f"unsupported call to os.path.{func.attr}")
+
+        target = self.evaluate(func.value)
+        args = [self.evaluate(arg) for arg in node.args]
+
+        if isinstance(target, _OpenedFile):
+            if func.attr in ("read", "readlines"):
+                return getattr(target, func.attr)()
+
+            raise _Unresolvable(f"unsupported file method {func.attr}()")
+
+        if func.attr not in safe_methods.get(type(target), []):
+            raise _Unresolvable(f"unsupported method {func.attr}()")
+
+        return getattr(target, func.attr)(*args)
+
+    def evaluate_open(self, node: ast.Call) -> "_OpenedFile":
+        if len(node.args) > len(open_arguments):
+            raise _Unresolvable("open() with too many arguments")
+
+        arguments = dict(zip(open_arguments, node.args))
+        for keyword in node.keywords:
+            if keyword.arg not in open_arguments:
+                raise _Unresolvable(f"open() with {keyword.arg}=")
+
+            arguments[keyword.arg] = keyword.value
+
+        if "file" not in arguments:
+            raise _Unresolvable("open() without a path")
+
+        values = {
+            name: self.evaluate(value) for name, value in arguments.items()
+        }
+
+        # Only reading text, files opened in binary mode read bytes
+        mode = values.get("mode", "r")
+        if not isinstance(mode, str) or set(mode) - {"r", "t"}:
+            raise _Unresolvable(f"open() in mode {mode!r}")
+
+        for name in ("encoding", "errors"):
+            if not isinstance(values.get(name), (str, type(None))):
+                raise _Unresolvable(f"open() with a non-string {name}")
+
+        return _OpenedFile(
+            self.resolve_path(values["file"]),
+            values.get("encoding"),
+            values.get("errors"),
+        )
+
+    def resolve_path(self, path: Any) -> str:
+        if not isinstance(path, str):
+            raise _Unresolvable("open() with a non-string path")
+
+        path = os.path.join(self.directory, path)
+        if self.read_files is not None:
+            self.read_files.append(os.path.realpath(path))
+
+        return path
+
+    def lookup(self, name: str) -> Any:
+        if name not in self.env:
+            raise _Unresolvable(f"unknown name '{name}'")
+
+        value = self.env[name]
+        if isinstance(value, _Unbound):
+            raise _Unresolvable(f"'{name}' is {value.reason}")
+
+        return value
+
+    def bind(self, target: ast.expr, value: Any) -> None:
+        if isinstance(target, ast.Name):
+            self.env[target.id] = value
+            return
+
+        if isinstance(target, (ast.Tuple, ast.List)):
+            names = [
+                element.id
+                for element in target.elts
+                if isinstance(element, ast.Name)
+            ]
+
+            if not isinstance(value, _Unbound) and len(names) == len(
+                target.elts
+            ):
+                try:
+                    for name, item in zip(names, value):
+                        self.env[name] = item
+                    return
+                except TypeError:
+                    pass
+
+            for name in names:
+                self.unbind_name(name, "assigned from an unpacking")
+            return
+
+        # Assignments like `requirements["test"] = [...]` mutate an
+        # existing object, so whatever it was is no longer known.
+        for node in ast.walk(target):
+            if isinstance(node, ast.Name):
+                self.unbind_name(node.id, "mutated through a subscript")
+
+    def unbind_name(self, name: str, reason: str) -> None:
+        self.env[name] = _Unbound(reason)
+
+    def forget_mutations(self, node: ast.AST) -> None:
+        """Forgets names that a call in `node` could have mutated.
+
+        Anything passed to (or being the object of) a function we do not
+        evaluate ourselves might be modified by it.
+        """
+
+        pure_methods = {
+            method for methods in safe_methods.values() for method in methods
+        }
+
+        for call in ast.walk(node):
+            if not isinstance(call, ast.Call):
+                continue
+
+            func = call.func
+            if isinstance(func, ast.Name) and func.id in pure_functions:
+                continue
+
+            if isinstance(func, ast.Attribute):
+                if self.is_os_path_attribute(func.value):
+                    continue
+
+                if func.attr in pure_methods | {"read", "readlines"}:
+                    continue
+
+                if isinstance(func.value, ast.Name):
+                    self.unbind_name(func.value.id, "possibly mutated")
+
+            for arg in list(call.args) + [kw.value for kw in call.keywords]:
+                if isinstance(arg, ast.Name):
+                    self.unbind_name(arg.id, "possibly mutated")
+
+    def is_setup_callee(self, node: ast.expr) -> bool:
+        if isinstance(node, ast.Name):
+            return node.id in self.setup_names
+
+        if isinstance(node, ast.Attribute) and node.attr == "setup":
+            return self.dotted_name(node.value) in self.setup_modules
+
+        return False
+
+    def is_os_path_attribute(self, node: ast.expr) -> bool:
+        if isinstance(node, ast.Name):
+            return node.id in self.os_path_names
+
+        return (
+            isinstance(node, ast.Attribute)
+            and node.attr == "path"
+            and isinstance(node.value, ast.Name)
+            and node.value.id in self.os_names
+        )
+
+    def is_main_guard(self, node: ast.expr) -> bool:
+        return (
+            isinstance(node, ast.Compare)
+            and isinstance(node.left, ast.Name)
+            and node.left.id == "__name__"
+            and len(node.ops) == 1
+            and isinstance(node.ops[0], ast.Eq)
+            and self.try_evaluate(node.comparators[0]) == "__main__"
+        )
+
+    def contains_setup_call(self, statement: ast.stmt) -> bool:
+        return any(
+            isinstance(node, ast.Call) and self.is_setup_callee(node.func)
+            for node in ast.walk(statement)
+        )
+
+    @staticmethod
+    def dotted_name(node: ast.expr) -> Optional[str]:
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+
+        if not isinstance(node, ast.Name):
+            return None
+
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+
+
+def _is_requirements_list(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and all(
+        isinstance(item, str) for item in value
+    )
+
+
+def extract_setup_py_kwargs(
+    file_path: str, read_files: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Extracts `install_requires` and `extras_require` from a setup.py
+    without executing it.
+
+    The file is parsed into an AST and the module body is walked
+    top to bottom, keeping track of simple name bindings, list
+    concatenation, in-place list mutation and reads of files through
+    `open()` (relative to the setup.py, like when it would be executed).
+    The real paths of the files it opens are appended to `read_files`,
+    when specified.
+
+    Raises SetupPyStaticAnalysisError when the arguments cannot be
+    determined without running the code.
+    """
+
+    with open(file_path, "r") as fp:
+        source = fp.read()
+
+    try:
+        module = ast.parse(source, filename=file_path)
+        return _SetupPyEvaluator(file_path, read_files).run(module)
+    except SyntaxError as err:
+        raise SetupPyStaticAnalysisError(file_path, str(err))
+    except (_Unresolvable,) + evaluation_errors as err:
+        raise SetupPyStaticAnalysisError(file_path, str(err))
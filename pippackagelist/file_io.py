@@ -0,0 +1,58 @@
+import os
+import stat
+import tempfile
+
+from typing import Optional
+
+
+def read_text(file_path: str) -> Optional[str]:
+    """Reads the contents of a text file, None if it cannot be read."""
+
+    try:
+        with open(file_path, "r") as fp:
+            return fp.read()
+    except OSError:
+        return None
+
+
+def write_atomically(file_path: str, content: str) -> None:
+    """Replaces the contents of a text file, readers either see the
+    old contents or the new contents and never a partially written
+    file.
+
+    Existing files keep their permissions, new files get the default
+    permissions (according to the umask).
+    """
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+
+    try:
+        with os.fdopen(fd, "w") as fp:
+            fp.write(content)
+
+        # Temporary files are only readable by their owner
+        os.chmod(temp_path, _file_mode(file_path))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _file_mode(file_path: str) -> int:
+    """Gets the permissions the file has, or the ones a new file would
+    get when it doesn't exist."""
+
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        pass
+
+    # The only way to get the umask is to change it
+    umask = os.umask(0)
+    os.umask(umask)
+
+    return 0o666 & ~umask
@@ -0,0 +1,36 @@
+import os
+
+from .parse_pyproject_toml import _pyproject_toml_declares_dependencies
+from .parse_setup_cfg import _setup_cfg_declares_dependencies
+
+
+def find_package_metadata_file(setup_py_path: str) -> str:
+    """Finds the file to read the requirements of a local package from.
+
+    Declarative files are preferred over executing the setup.py: a
+    pyproject.toml that lists its dependencies (PEP 621), then a
+    setup.cfg that has `install_requires`. When the package has no
+    setup.py at all, whichever of those files exists is used.
+    """
+
+    if os.path.basename(setup_py_path) != "setup.py":
+        return setup_py_path
+
+    directory = os.path.dirname(setup_py_path)
+    pyproject_toml_path = os.path.join(directory, "pyproject.toml")
+    setup_cfg_path = os.path.join(directory, "setup.cfg")
+
+    if _pyproject_toml_declares_dependencies(pyproject_toml_path):
+        return pyproject_toml_path
+
+    if _setup_cfg_declares_dependencies(setup_cfg_path):
+        return setup_cfg_path
+
+    if os.path.exists(setup_py_path):
+        return setup_py_path
+
+    for file_path in (pyproject_toml_path, setup_cfg_path):
+        if os.path.exists(file_path):
+            return file_path
+
+    return setup_py_path
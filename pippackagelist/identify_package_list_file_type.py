@@ -4,10 +4,26 @@ import enum
 class PackageListFileType(enum.Enum):
     REQUIREMENTS_TXT = "requirements.txt"
     SETUP_PY = "setup.py"
+    PYPROJECT_TOML = "pyproject.toml"
+    SETUP_CFG = "setup.cfg"
+    PIPFILE_LOCK = "Pipfile.lock"
+    POETRY_LOCK = "poetry.lock"
 
 
 def identify_package_list_file_type(file_path: str) -> PackageListFileType:
     if file_path.endswith("setup.py"):
         return PackageListFileType.SETUP_PY
 
+    if file_path.endswith("pyproject.toml"):
+        return PackageListFileType.PYPROJECT_TOML
+
+    if file_path.endswith("setup.cfg"):
+        return PackageListFileType.SETUP_CFG
+
+    if file_path.endswith("Pipfile.lock"):
+        return PackageListFileType.PIPFILE_LOCK
+
+    if file_path.endswith("poetry.lock"):
+        return PackageListFileType.POETRY_LOCK
+
     return PackageListFileType.REQUIREMENTS_TXT
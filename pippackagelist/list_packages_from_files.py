@@ -1,6 +1,23 @@
-from collections import defaultdict
-from typing import Generator, List
+import enum
+import itertools
+import os
+import time
 
+from collections import defaultdict, deque
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .constraint_index import ConstraintIndex, prescan_constraint_files
 from .entry import (
     RequirementsConstraintsEntry,
     RequirementsEditableEntry,
@@ -12,116 +29,657 @@ from .entry import (
     RequirementsVCSPackageEntry,
     RequirementsWheelPackageEntry,
 )
-from .error import ConstraintWithoutNameError
+from .error import RequirementsIncludeCycleError
+from .find_package_metadata_file import find_package_metadata_file
 from .identify_package_list_file_type import (
     PackageListFileType,
     identify_package_list_file_type,
 )
+from .parse_pipfile_lock import parse_pipfile_lock
+from .parse_poetry_lock import parse_poetry_lock
+from .parse_pyproject_toml import parse_pyproject_toml
 from .parse_requirements_txt import parse_requirements_txt
-from .parse_setup_py import parse_setup_py
+from .parse_setup_cfg import parse_setup_cfg
+from .parse_setup_py import SetupPyMode, parse_setup_py
+
+# Caching, worker processes, threads and observing a run are imported
+# when they're used, listing a small file mostly takes starting up.
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor, Future
+
+    from .parse_cache import ParseCache
+    from .parse_memo import ParseMemo
+    from .parse_session import ParseSession
+    from .requirements_graph import RequirementsGraph
+    from .run_observer import RunObserver
+    from .setup_py_worker_pool import SetupPyWorkerPool
+
+
+# Identifies a file in the include graph, setup.py files are included
+# with a specific set of extras
+_IncludeKey = Tuple[str, Tuple[str, ...]]
+
+
+def _find_include_path(
+    edges: Dict[_IncludeKey, List[_IncludeKey]],
+    start: _IncludeKey,
+    end: _IncludeKey,
+) -> Optional[List[_IncludeKey]]:
+    """Finds a path from `start` to `end` through the include graph."""
+
+    parents = {start: None}
+    stack = [start]
+
+    while stack:
+        key = stack.pop()
+        if key == end:
+            path = []
+            while key is not None:
+                path.append(key)
+                key = parents[key]
+
+            return list(reversed(path))
+
+        for included_key in edges.get(key, []):
+            if included_key not in parents:
+                parents[included_key] = key
+                stack.append(included_key)
+
+    return None
+
+
+class _PendingFile:
+    """A file that was included, but which entries were not consumed yet.
+
+    Files can be parsed ahead of time on a thread pool while the
+    entries of the files before it are being consumed.
+
+    A file that is included again (when re-emitting includes) is
+    pending with the `original` it was first included as. Whichever of
+    the two is consumed first parses the file, the other one emits the
+    entries that were remembered.
+    """
+
+    def __init__(
+        self,
+        key: _IncludeKey,
+        parse: Callable[[], Iterable[RequirementsEntry]],
+        *,
+        prefetchable: bool = True,
+        remember: bool = False,
+        original: Optional["_PendingFile"] = None,
+        read_files: Optional[List[str]] = None,
+    ) -> None:
+        self.key = key
+        self.parse = parse
+        self.prefetchable = prefetchable and original is None
+        self.remember = remember
+        self.original = original
+        # Other files that `parse` read, complete once it's consumed
+        self.read_files = read_files
+
+        # All entries, once they were consumed
+        self.memo: Optional[List[RequirementsEntry]] = None
+
+        self.future: Optional["Future"] = None
+
+    def prefetch(self, executor: "Executor") -> None:
+        if self.future is None and self.prefetchable:
+            self.future = executor.submit(lambda: list(self.parse()))
+
+    def cancel(self) -> None:
+        if self.future is not None:
+            self.future.cancel()
+
+    def entries(self) -> Iterable[RequirementsEntry]:
+        if self.original is not None:
+            return self.original.entries()
+
+        if self.memo is not None:
+            return self.memo
+
+        return self._consume()
+
+    def _consume(self) -> Generator[RequirementsEntry, None, None]:
+        if self.future is not None:
+            entries = self.future.result()
+        else:
+            entries = self.parse()
+
+        memo = []
+        for entry in entries:
+            if self.remember:
+                memo.append(entry)
+
+            yield entry
+
+        if self.remember:
+            self.memo = memo
+
+
+def _observe_parse(
+    observer: Optional["RunObserver"],
+    kind: str,
+    file_path: str,
+    parse: Callable[[], Iterable[RequirementsEntry]],
+    line_counts: Optional[List[int]] = None,
+) -> Callable[[], Iterable[RequirementsEntry]]:
+    """See `run_observer._observe_parse`, which is only imported when
+    there is an observer."""
+
+    if not observer:
+        return parse
+
+    from . import run_observer
+
+    return run_observer._observe_parse(
+        observer, kind, file_path, parse, line_counts
+    )
+
+
+def _observe_stage(
+    observer: Optional["RunObserver"],
+    stage: str,
+    generator: Callable[
+        [Iterable[RequirementsEntry]], Iterable[RequirementsEntry]
+    ],
+    entries: Iterable[RequirementsEntry],
+) -> Iterable[RequirementsEntry]:
+    """See `run_observer._observe_stage`, which is only imported when
+    there is an observer."""
+
+    if not observer:
+        return generator(entries)
+
+    from . import run_observer
+
+    return run_observer._observe_stage(observer, stage, generator, entries)
+
+
+def _parse_requirements_txt(
+    file_path: str,
+    cache: Optional[Union["ParseCache", "ParseMemo"]],
+    keep_line_text: bool = True,
+    observer: Optional["RunObserver"] = None,
+    memory_map: bool = True,
+) -> Iterable[RequirementsEntry]:
+    line_counts: List[int] = []
+
+    def _parse():
+        return parse_requirements_txt(
+            file_path, keep_line_text, line_counts, memory_map
+        )
+
+    parse = _observe_parse(
+        observer,
+        PackageListFileType.REQUIREMENTS_TXT.value,
+        file_path,
+        _parse,
+        line_counts,
+    )
+
+    if cache:
+        return cache.get_or_parse(
+            PackageListFileType.REQUIREMENTS_TXT.value,
+            file_path,
+            [],
+            parse,
+            variant=keep_line_text,
+        )
+
+    return parse()
 
 
 def _list_packages_from_files(
-    file_paths: List[str],
+    file_paths: Iterable[str],
     *,
     recurse_recursive: bool = False,
     recurse_editable: bool = False,
     recurse_path: bool = False,
-    remove_editable: bool = False,
-    remove_recursive: bool = False,
-    remove_constraints: bool = False,
-    remove_vcs: bool = False,
-    remove_path: bool = False,
-    remove_wheel: bool = False,
-    remove_unversioned: bool = False,
-    remove_index_urls: bool = False,
+    reemit_includes: bool = False,
+    setup_py_mode: SetupPyMode = SetupPyMode.AUTO,
+    setup_py_pool: Optional["SetupPyWorkerPool"] = None,
+    cache: Optional[Union["ParseCache", "ParseMemo"]] = None,
+    executor: Optional["Executor"] = None,
+    prefetch_window: int = 0,
+    keep_line_text: bool = True,
+    memory_map: bool = True,
+    include_build_requires: bool = False,
+    include_dev_packages: bool = False,
+    graph: Optional["RequirementsGraph"] = None,
+    observer: Optional["RunObserver"] = None,
 ) -> Generator[RequirementsEntry, None, None]:
-    generators = []
-
-    for file_path in file_paths:
-        package_list_file_type = identify_package_list_file_type(file_path)
-        if package_list_file_type == PackageListFileType.REQUIREMENTS_TXT:
-            generators.append(parse_requirements_txt(file_path))
-        elif package_list_file_type == PackageListFileType.SETUP_PY:
-            generators.append(parse_setup_py(file_path))
-
-    while len(generators) > 0:
-        for requirement in generators[0]:
-            if isinstance(requirement, RequirementsRecursiveEntry):
-                if recurse_recursive:
-                    generators.append(
-                        parse_requirements_txt(requirement.absolute_path)
-                    )
-                elif not remove_recursive:
-                    yield requirement
-            elif isinstance(requirement, RequirementsConstraintsEntry):
-                if not remove_constraints:
+    def _parse_setup_py(
+        file_path: str, extras: List[str], read_files: List[str]
+    ):
+        def _parse():
+            if setup_py_pool:
+                return setup_py_pool.submit(
+                    file_path, extras, keep_line_text, read_files
+                )
+
+            return parse_setup_py(
+                file_path, extras, setup_py_mode, keep_line_text, read_files
+            )
+
+        parse = _observe_parse(
+            observer, PackageListFileType.SETUP_PY.value, file_path, _parse
+        )
+
+        if cache:
+            return cache.get_or_parse(
+                PackageListFileType.SETUP_PY.value,
+                file_path,
+                extras,
+                parse,
+                variant=(keep_line_text, setup_py_mode.value),
+                read_files=read_files,
+            )
+
+        return parse()
+
+    def _parse_declarative(
+        file_path: str,
+        extras: List[str],
+        file_type: PackageListFileType,
+        read_files: List[str],
+    ):
+        def _parse():
+            if file_type == PackageListFileType.PYPROJECT_TOML:
+                return parse_pyproject_toml(
+                    file_path,
+                    extras,
+                    include_build_requires,
+                    keep_line_text,
+                    read_files,
+                )
+
+            return parse_setup_cfg(
+                file_path, extras, keep_line_text, read_files
+            )
+
+        parse = _observe_parse(observer, file_type.value, file_path, _parse)
+
+        if cache:
+            return cache.get_or_parse(
+                file_type.value,
+                file_path,
+                extras,
+                parse,
+                variant=(keep_line_text, include_build_requires),
+                read_files=read_files,
+            )
+
+        return parse()
+
+    def _parse_lock_file(file_path: str, file_type: PackageListFileType):
+        def _parse():
+            if file_type == PackageListFileType.PIPFILE_LOCK:
+                return parse_pipfile_lock(file_path, include_dev_packages)
+
+            return parse_poetry_lock(file_path, include_dev_packages)
+
+        parse = _observe_parse(observer, file_type.value, file_path, _parse)
+
+        if cache:
+            return cache.get_or_parse(
+                file_type.value,
+                file_path,
+                [],
+                parse,
+                variant=include_dev_packages,
+            )
+
+        return parse()
+
+    # Every file is only parsed once. When re-emitting includes, the
+    # file is kept around so its entries can be emitted again.
+    visited: Dict[_IncludeKey, Optional[_PendingFile]] = {}
+    edges: Dict[_IncludeKey, List[_IncludeKey]] = defaultdict(list)
+
+    # The files that were specified are listed before any of the files
+    # they include. They're pulled from `file_paths` lazily, so that
+    # it can be a stream of paths.
+    roots = iter(file_paths)
+    pending_roots: Deque[_PendingFile] = deque()
+    pending: Deque[_PendingFile] = deque()
+
+    def _prefetch() -> None:
+        if not executor:
+            return
+
+        for pending_file in itertools.islice(
+            itertools.chain(pending_roots, pending), prefetch_window
+        ):
+            pending_file.prefetch(executor)
+
+    def _include(
+        parent_key: Optional[_IncludeKey],
+        file_path: str,
+        extras: List[str],
+        parse: Callable[[], Iterable[RequirementsEntry]],
+        *,
+        prefetchable: bool = True,
+        entry: Optional[RequirementsEntry] = None,
+        read_files: Optional[List[str]] = None,
+    ) -> None:
+        key = (os.path.realpath(file_path), tuple(sorted(extras)))
+        queue = pending if parent_key else pending_roots
+
+        if graph is not None:
+            graph.add_include(parent_key, key, file_path, extras, entry)
+
+        if key in visited:
+            # Only files that were already visited have outgoing edges
+            # and can therefore be part of a cycle.
+            cycle = parent_key and _find_include_path(edges, key, parent_key)
+            if cycle:
+                raise RequirementsIncludeCycleError(
+                    [path for path, _ in cycle + [key]]
+                )
+
+            if parent_key:
+                edges[parent_key].append(key)
+
+            if reemit_includes:
+                # The original can still be pending, roots are only
+                # included as they are needed.
+                queue.append(
+                    _PendingFile(key, parse, original=visited[key])
+                )
+                _prefetch()
+
+            return
+
+        if parent_key:
+            edges[parent_key].append(key)
+
+        if observer:
+            observer.file_included(
+                file_path, parent_key[0] if parent_key else None
+            )
+
+        pending_file = _PendingFile(
+            key,
+            parse,
+            prefetchable=prefetchable,
+            remember=reemit_includes,
+            read_files=read_files,
+        )
+        visited[key] = pending_file if reemit_includes else None
+        queue.append(pending_file)
+        _prefetch()
+
+    def _include_requirements_txt(parent_key, file_path, entry=None):
+        # Files can be parsed on other threads while a setup.py is
+        # executed, which changes the working directory.
+        absolute_path = os.path.abspath(file_path)
+
+        _include(
+            parent_key,
+            file_path,
+            [],
+            lambda: _parse_requirements_txt(
+                absolute_path, cache, keep_line_text, observer, memory_map
+            ),
+            entry=entry,
+        )
+
+    def _include_setup_py(parent_key, file_path, extras=[], entry=None):
+        # Files that are read through open(), a change to any of them
+        # changes the entries
+        read_files: List[str] = []
+
+        if setup_py_pool:
+            # Start evaluating in a worker process right away, the
+            # returned generator waits for the result.
+            entries = _parse_setup_py(file_path, extras, read_files)
+            _include(
+                parent_key,
+                file_path,
+                extras,
+                lambda: entries,
+                entry=entry,
+                read_files=read_files,
+            )
+            return
+
+        # Executing a setup.py changes the working directory of the
+        # whole process, only do that on this thread.
+        absolute_path = os.path.abspath(file_path)
+        _include(
+            parent_key,
+            file_path,
+            extras,
+            lambda: _parse_setup_py(absolute_path, extras, read_files),
+            prefetchable=setup_py_mode == SetupPyMode.STATIC,
+            entry=entry,
+            read_files=read_files,
+        )
+
+    def _include_declarative(
+        parent_key, file_path, extras, file_type, entry=None
+    ):
+        # Files that are referred to by `file:`
+        read_files: List[str] = []
+
+        absolute_path = os.path.abspath(file_path)
+        _include(
+            parent_key,
+            file_path,
+            extras,
+            lambda: _parse_declarative(
+                absolute_path, extras, file_type, read_files
+            ),
+            entry=entry,
+            read_files=read_files,
+        )
+
+    def _include_lock_file(parent_key, file_path, file_type):
+        absolute_path = os.path.abspath(file_path)
+        _include(
+            parent_key,
+            file_path,
+            [],
+            lambda: _parse_lock_file(absolute_path, file_type),
+        )
+
+    def _include_package(parent_key, file_path, extras, entry):
+        # Prefer reading pyproject.toml or setup.cfg over executing
+        # the setup.py of local packages.
+        file_path = find_package_metadata_file(file_path)
+
+        file_type = identify_package_list_file_type(file_path)
+        if file_type == PackageListFileType.SETUP_PY:
+            _include_setup_py(parent_key, file_path, extras, entry)
+        else:
+            _include_declarative(
+                parent_key, file_path, extras, file_type, entry
+            )
+
+    def _include_roots() -> None:
+        # Keep enough roots queued up to prefetch them
+        while len(pending_roots) < max(prefetch_window, 1):
+            file_path = next(roots, None)
+            if file_path is None:
+                return
+
+            package_list_file_type = identify_package_list_file_type(file_path)
+            if package_list_file_type == PackageListFileType.REQUIREMENTS_TXT:
+                _include_requirements_txt(None, file_path)
+            elif package_list_file_type == PackageListFileType.SETUP_PY:
+                _include_setup_py(None, file_path)
+            elif package_list_file_type in (
+                PackageListFileType.PIPFILE_LOCK,
+                PackageListFileType.POETRY_LOCK,
+            ):
+                _include_lock_file(None, file_path, package_list_file_type)
+            else:
+                _include_declarative(
+                    None, file_path, [], package_list_file_type
+                )
+
+    try:
+        while True:
+            _include_roots()
+
+            if pending_roots:
+                pending_file = pending_roots.popleft()
+            elif pending:
+                pending_file = pending.popleft()
+            else:
+                break
+
+            key = pending_file.key
+
+            _prefetch()
+
+            for requirement in pending_file.entries():
+                if graph is not None:
+                    graph.add_entry(key, requirement)
+
+                if observer:
+                    observer.entry_read(requirement)
+
+                if isinstance(requirement, RequirementsRecursiveEntry):
+                    if recurse_recursive:
+                        _include_requirements_txt(
+                            key, requirement.absolute_path, requirement
+                        )
+                    else:
+                        yield requirement
+                elif isinstance(requirement, RequirementsConstraintsEntry):
+                    if graph is not None:
+                        # Constraint files are not traversed, they're
+                        # recorded but their entries are not.
+                        graph.add_include(
+                            key,
+                            (requirement.absolute_path, ()),
+                            requirement.absolute_path,
+                            [],
+                            requirement,
+                        )
+
                     yield requirement
-            elif isinstance(requirement, RequirementsEditableEntry):
-                if recurse_editable:
-                    generators.append(
-                        parse_setup_py(
+                elif isinstance(requirement, RequirementsEditableEntry):
+                    if recurse_editable:
+                        _include_package(
+                            key,
                             requirement.resolved_absolute_path,
                             requirement.extras,
+                            requirement,
                         )
-                    )
-                elif not remove_editable:
-                    yield requirement
-            elif isinstance(requirement, RequirementsIndexURLEntry):
-                if not remove_index_urls:
-                    yield requirement
-            elif isinstance(requirement, RequirementsVCSPackageEntry):
-                if not remove_vcs:
-                    yield requirement
-            elif isinstance(requirement, RequirementsPathPackageEntry):
-                if recurse_path:
-                    generators.append(
-                        parse_setup_py(
+                    else:
+                        yield requirement
+                elif isinstance(requirement, RequirementsPathPackageEntry):
+                    if recurse_path:
+                        _include_package(
+                            key,
                             requirement.resolved_absolute_path,
                             requirement.extras,
+                            requirement,
                         )
-                    )
-                elif not remove_path:
-                    yield requirement
-            elif isinstance(requirement, RequirementsWheelPackageEntry):
-                if not remove_wheel:
-                    yield requirement
-            elif isinstance(requirement, RequirementsPackageEntry):
-                if remove_unversioned and not requirement.version:
-                    continue
+                    else:
+                        yield requirement
                 else:
                     yield requirement
-            else:
-                yield requirement
 
-        generators = generators[1:]
+            if graph is not None and pending_file.read_files:
+                graph.add_read_files(key, pending_file.read_files)
+    finally:
+        # Stop prefetching files nobody is going to look at
+        for pending_file in itertools.chain(pending_roots, pending):
+            pending_file.cancel()
+
+
+def _remove_requirements(
+    generator: Iterable[RequirementsEntry],
+    *,
+    remove_editable: bool = False,
+    remove_recursive: bool = False,
+    remove_constraints: bool = False,
+    remove_vcs: bool = False,
+    remove_path: bool = False,
+    remove_wheel: bool = False,
+    remove_unversioned: bool = False,
+    remove_index_urls: bool = False,
+) -> Generator[RequirementsEntry, None, None]:
+    """Drops the kinds of requirements that are not wanted in the list.
+
+    Entries that were recursed into never make it this far, so this
+    only affects the -r, -e and path entries that were not followed.
+    """
+
+    for requirement in generator:
+        if isinstance(requirement, RequirementsRecursiveEntry):
+            if remove_recursive:
+                continue
+        elif isinstance(requirement, RequirementsConstraintsEntry):
+            if remove_constraints:
+                continue
+        elif isinstance(requirement, RequirementsEditableEntry):
+            if remove_editable:
+                continue
+        elif isinstance(requirement, RequirementsIndexURLEntry):
+            if remove_index_urls:
+                continue
+        elif isinstance(requirement, RequirementsVCSPackageEntry):
+            if remove_vcs:
+                continue
+        elif isinstance(requirement, RequirementsPathPackageEntry):
+            if remove_path:
+                continue
+        elif isinstance(requirement, RequirementsWheelPackageEntry):
+            if remove_wheel:
+                continue
+        elif isinstance(requirement, RequirementsPackageEntry):
+            if remove_unversioned and not requirement.version:
+                continue
+
+        yield requirement
+
+
+class DedupeMode(enum.Enum):
+    # Entries that render to the same line
+    EXACT = "exact"
+    # Entries that are the same after normalizing names (PEP 503)
+    SEMANTIC = "semantic"
 
 
 def _dedupe_requirements(
-    generator: Generator[RequirementsEntry, None, None]
+    generator: Generator[RequirementsEntry, None, None],
+    mode: DedupeMode = DedupeMode.EXACT,
+    observer: Optional["RunObserver"] = None,
 ) -> Generator[RequirementsEntry, None, None]:
-    """Removes exact duplicates from the list of requirements.
+    """Removes duplicates from the list of requirements.
 
     Duplicates can happen as multiple files are merged together and they
     all reefer to the same dependency. De-duping should have no impact
     on the final result, it just makes the list easier to browse.
+
+    The first occurrence of each requirement is yielded as soon as it is
+    seen, only the identities of the requirements are kept around.
     """
 
-    unique_requirements = []
-    unique_requirements_strings = set()
+    semantic = mode == DedupeMode.SEMANTIC
+    seen_identities = set()
+
     for requirement in generator:
-        if str(requirement) in unique_requirements_strings:
+        identity = requirement.identity(semantic)
+        if identity in seen_identities:
+            if observer:
+                observer.duplicate_dropped(requirement)
             continue
 
-        unique_requirements.append(requirement)
-        unique_requirements_strings.add(str(requirement))
-
-    for requirement in unique_requirements:
+        seen_identities.add(identity)
         yield requirement
 
 
 def _inline_constraints(
-    generator: Generator[RequirementsEntry, None, None]
+    generator: Generator[RequirementsEntry, None, None],
+    constraint_index: ConstraintIndex,
+    prescanned: bool = False,
+    observer: Optional["RunObserver"] = None,
 ) -> Generator[RequirementsEntry, None, None]:
     """Inlines constraints specified in constraint.txt files (specified by -c).
 
@@ -138,37 +696,106 @@ def _inline_constraints(
         * No nesting
         * No editables
         * All entries must have a name
+
+    A -c entry applies to the whole list, including the requirements
+    that came before it. When all constraint files were found up front
+    (`prescanned`), requirements are inlined as they come in. Otherwise,
+    the whole list has to be read before anything can be inlined.
     """
 
+    def _inline(requirement):
+        package_name = requirement.package_name()
+        if not package_name:
+            return [requirement]
+
+        constraints = constraint_index.get(package_name)
+        if not constraints:
+            return [requirement]
+
+        if observer:
+            observer.constraint_applied(requirement, constraints)
+
+        return constraints
+
+    if prescanned:
+        for requirement in generator:
+            if isinstance(requirement, RequirementsConstraintsEntry):
+                constraint_index.add(requirement.absolute_path)
+                continue
+
+            for inlined_requirement in _inline(requirement):
+                yield inlined_requirement
+
+        return
+
     requirements = []
-    constraints = defaultdict(list)
 
     for requirement in generator:
-        if not isinstance(requirement, RequirementsConstraintsEntry):
+        if isinstance(requirement, RequirementsConstraintsEntry):
+            constraint_index.add(requirement.absolute_path)
+        else:
             requirements.append(requirement)
-            continue
 
-        for constraint in parse_requirements_txt(requirement.absolute_path):
-            if constraint.package_name() is None:
-                raise ConstraintWithoutNameError(constraint)
+    for requirement in requirements:
+        for inlined_requirement in _inline(requirement):
+            yield inlined_requirement
 
-            constraints[constraint.package_name()].append(constraint)
 
-    for requirement in requirements:
-        if not requirement.package_name():
-            yield requirement
-            continue
+def _filter_requirements(
+    generator: Iterable[RequirementsEntry],
+    *,
+    constraint_index: Optional[ConstraintIndex] = None,
+    prescanned: bool = False,
+    dedupe: bool = False,
+    dedupe_mode: DedupeMode = DedupeMode.EXACT,
+    observer: Optional["RunObserver"] = None,
+    **remove_options: bool,
+) -> Generator[RequirementsEntry, None, None]:
+    """Turns everything that was read into the list that was asked
+    for: drops unwanted requirements, inlines constraints (when a
+    `constraint_index` is specified) and drops duplicates.
 
-        requirement_constraints = constraints.get(requirement.package_name())
-        if requirement_constraints:
-            for constraint in requirement_constraints:
-                yield constraint
-        else:
-            yield requirement
+    Only looks at the entries, so the same entries can be filtered in
+    different ways without reading any file again.
+    """
+
+    if constraint_index is not None:
+        # The -c entries are consumed by inlining them
+        remove_options = dict(remove_options, remove_constraints=False)
+
+    generator = _observe_stage(
+        observer,
+        "remove",
+        lambda entries: _remove_requirements(entries, **remove_options),
+        generator,
+    )
+
+    if constraint_index is not None:
+        generator = _observe_stage(
+            observer,
+            "inline_constraints",
+            lambda entries: _inline_constraints(
+                entries, constraint_index, prescanned, observer
+            ),
+            generator,
+        )
+
+    if dedupe:
+        generator = _observe_stage(
+            observer,
+            "dedupe",
+            lambda entries: _dedupe_requirements(
+                entries, dedupe_mode, observer
+            ),
+            generator,
+        )
+
+    for requirement in generator:
+        yield requirement
 
 
 def list_packages_from_files(
-    file_paths: List[str],
+    file_paths: Iterable[str],
     *,
     recurse_recursive: bool = False,
     recurse_editable: bool = False,
@@ -183,12 +810,186 @@ def list_packages_from_files(
     remove_unversioned: bool = False,
     remove_index_urls: bool = False,
     dedupe: bool = False,
+    dedupe_mode: DedupeMode = DedupeMode.EXACT,
+    reemit_includes: bool = False,
+    setup_py_mode: SetupPyMode = SetupPyMode.AUTO,
+    setup_py_workers: int = 0,
+    setup_py_timeout: Optional[float] = None,
+    setup_py_memory_limit: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    cache_max_size: int = 256 * 1024 * 1024,
+    jobs: int = 1,
+    keep_line_text: bool = True,
+    memory_map: bool = True,
+    include_build_requires: bool = False,
+    include_dev_packages: bool = False,
+    session: Optional["ParseSession"] = None,
+    graph: Optional["RequirementsGraph"] = None,
+    observer: Optional["RunObserver"] = None,
 ) -> Generator[RequirementsEntry, None, None]:
-    generator = _list_packages_from_files(
+    """Lists all packages in the specified requirements.txt, setup.py,
+    pyproject.toml, setup.cfg, Pipfile.lock and poetry.lock files.
+
+    Each file is parsed at most once. A file that is included more than
+    once only has its entries emitted the first time, unless
+    `reemit_includes` is set. Cyclic includes raise a
+    RequirementsIncludeCycleError.
+
+    When recursing into local packages (-e and paths), their
+    pyproject.toml or setup.cfg is read instead of their setup.py, if
+    that's where the dependencies are declared. Requirements of the
+    build system in pyproject.toml files are only listed with
+    `include_build_requires`.
+
+    Only the main packages of Pipfile.lock and poetry.lock files are
+    listed, unless `include_dev_packages` is set.
+
+    With `dedupe`, requirements that were already emitted are dropped.
+    `dedupe_mode` controls whether differently spelled names of the
+    same package count as duplicates.
+
+    With `inline_constraints`, every constraints file is parsed once and
+    shared by all -c entries that refer to it. When multiple constraint
+    files constrain the same package, the file that is referred to
+    first wins.
+
+    When `setup_py_workers` is larger than zero, setup.py files are
+    evaluated concurrently by a pool of worker processes. Each one is
+    limited to `setup_py_timeout` seconds and `setup_py_memory_limit`
+    bytes of memory. Limits are only enforced when using workers.
+
+    When `cache_dir` is specified, parsed files are cached in that
+    directory and are only parsed again once they changed.
+
+    A `session` shares parsed files, setup.py workers and threads with
+    other calls, for listing many (overlapping) sets of files in one
+    process. It takes the place of the setup_py_*, cache_* and `jobs`
+    options.
+
+    Each entry points back to the file and line it came from. Without
+    `keep_line_text`, the text of the line is not kept around, which
+    saves a lot of memory for very large lists.
+
+    Large requirements files are memory-mapped. A file that is truncated
+    while it's mapped crashes the process, without `memory_map` files
+    are read into memory instead, e.g. when files can change while
+    they're listed.
+
+    With `jobs` larger than one, upcoming files are read and parsed on a
+    pool of threads while the entries of earlier files are consumed. The
+    order of the output is not affected.
+
+    Every file that is read and the entry that included it are recorded
+    in `graph`, when specified (see `build_requirements_graph`).
+
+    An `observer` is told about every file that is parsed, how long
+    that took and what happened to the entries (see `RunObserver`).
+    """
+
+    setup_py_pool = None
+    cache = None
+    executor = None
+
+    if session:
+        setup_py_mode = session.setup_py_mode
+        setup_py_pool = session.setup_py_pool
+        cache = session.memo
+        executor = session.executor
+        jobs = session.jobs
+    else:
+        if setup_py_workers > 0:
+            from .setup_py_worker_pool import SetupPyWorkerPool
+
+            setup_py_pool = SetupPyWorkerPool(
+                setup_py_workers,
+                mode=setup_py_mode,
+                timeout=setup_py_timeout,
+                memory_limit=setup_py_memory_limit,
+            )
+
+        if cache_dir:
+            from .parse_cache import ParseCache
+
+            cache = ParseCache(cache_dir, cache_max_size)
+
+        if jobs > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=jobs)
+
+    constraint_index = None
+    constraint_files = None
+    if inline_constraints:
+        if not session:
+            from .parse_memo import ParseMemo
+
+            # The files that are parsed to find the -c entries are
+            # listed afterwards, without parsing them again.
+            cache = ParseMemo(cache)
+
+        def _parse_requirements(file_path):
+            return _parse_requirements_txt(
+                file_path, cache, keep_line_text, observer, memory_map
+            )
+
+        # Find all -c entries up front, so that requirements can be
+        # inlined as soon as they are listed.
+        file_paths = list(file_paths)
+
+        start = time.perf_counter()
+        constraint_files = prescan_constraint_files(
+            file_paths,
+            recurse_recursive=recurse_recursive,
+            recurse_editable=recurse_editable,
+            recurse_path=recurse_path,
+            include_dev_packages=include_dev_packages,
+            memory_map=memory_map,
+            setup_py_mode=setup_py_mode,
+            parse=_parse_requirements,
+        )
+        if observer:
+            from .run_observer import StageTiming
+
+            end = time.perf_counter()
+            observer.stage_finished(
+                StageTiming(
+                    stage="prescan_constraints",
+                    start=start,
+                    end=end,
+                    duration=end - start,
+                )
+            )
+
+        constraint_index = ConstraintIndex(_parse_requirements)
+        for constraint_file in constraint_files or []:
+            constraint_index.add(constraint_file)
+
+    traversal = _list_packages_from_files(
         file_paths,
         recurse_recursive=recurse_recursive,
         recurse_editable=recurse_editable,
         recurse_path=recurse_path,
+        reemit_includes=reemit_includes,
+        setup_py_mode=setup_py_mode,
+        setup_py_pool=setup_py_pool,
+        cache=cache,
+        executor=executor,
+        prefetch_window=jobs * 2,
+        keep_line_text=keep_line_text,
+        memory_map=memory_map,
+        include_build_requires=include_build_requires,
+        include_dev_packages=include_dev_packages,
+        graph=graph,
+        observer=observer,
+    )
+
+    # Produces the entries itself, rather than consuming any
+    generator = _observe_stage(observer, "traverse", lambda _: traversal, ())
+
+    generator = _filter_requirements(
+        generator,
+        constraint_index=constraint_index,
+        prescanned=constraint_files is not None,
         remove_editable=remove_editable,
         remove_recursive=remove_recursive,
         remove_constraints=remove_constraints,
@@ -197,13 +998,18 @@ def list_packages_from_files(
         remove_wheel=remove_wheel,
         remove_unversioned=remove_unversioned,
         remove_index_urls=remove_index_urls,
+        dedupe=dedupe,
+        dedupe_mode=dedupe_mode,
+        observer=observer,
     )
 
-    if inline_constraints:
-        generator = _inline_constraints(generator)
-
-    if dedupe:
-        generator = _dedupe_requirements(generator)
+    try:
+        for requirement in generator:
+            yield requirement
+    finally:
+        # The workers of a session outlive this list
+        if executor and not session:
+            executor.shutdown(wait=True)
 
-    for requirement in generator:
-        yield requirement
+        if setup_py_pool and not session:
+            setup_py_pool.shutdown()
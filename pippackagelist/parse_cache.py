@@ -0,0 +1,307 @@
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from typing import Callable, Hashable, Iterable, List, Optional, Tuple
+
+from .entry import RequirementsEntry
+
+# Bump when the way cache files are stored changes
+cache_format_version = 2
+
+# Stat information recorded less than this many nanoseconds after the file
+# was last modified is not trusted. The file could be modified again within
+# the same mtime tick without the size changing.
+racy_stat_window_ns = 2 * 1000 * 1000 * 1000
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_version() -> str:
+    """Fingerprints the source code of this package.
+
+    Any change to the parsing code invalidates all cached entries
+    without having to remember to bump a version number.
+    """
+
+    digest = hashlib.sha256(str(cache_format_version).encode())
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for file_name in sorted(os.listdir(package_dir)):
+        if not file_name.endswith(".py"):
+            continue
+
+        with open(os.path.join(package_dir, file_name), "rb") as fp:
+            digest.update(file_name.encode())
+            digest.update(fp.read())
+
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Persistent on-disk cache of parsed requirements files.
+
+    Entries are keyed by the real path of the file, its size, mtime,
+    the hash of its contents, the requested extras and the version of
+    this tool. When the size and mtime of a file match what was seen
+    last time, the file isn't read at all.
+
+    The cache directory can be shared by multiple processes. All
+    files are written atomically and unreadable files are treated as
+    cache misses. When the cache grows beyond `max_size` bytes, the
+    least recently used entries are removed.
+
+    Files that were read to parse the file (by a `file:` in a
+    setup.cfg, for example) are recorded along with the hash of their
+    contents, a change to any of them is a miss. Only the files read by
+    setup.py files that could be analyzed statically are known, those
+    that are executed are not invalidated when the files they read
+    change.
+    """
+
+    def __init__(self, directory: str, max_size: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+
+        self.stats_directory = os.path.join(directory, "stats")
+        self.entries_directory = os.path.join(directory, "entries")
+
+        os.makedirs(self.stats_directory, exist_ok=True)
+        os.makedirs(self.entries_directory, exist_ok=True)
+
+        self.size: Optional[int] = None
+        self.size_lock = threading.Lock()
+
+    def get_or_parse(
+        self,
+        kind: str,
+        file_path: str,
+        extras: List[str],
+        parse: Callable[[], Iterable[RequirementsEntry]],
+        variant: Hashable = None,
+        read_files: Optional[List[str]] = None,
+    ) -> Iterable[RequirementsEntry]:
+        """Gets the parsed entries for the specified file from the cache,
+        or parses them using `parse` and caches the result.
+
+        Files parsed with different options are cached separately by
+        passing a different `variant`.
+
+        `parse` appends the real paths of the other files it reads to
+        `read_files`. When the entries come from the cache, the files
+        that were recorded are appended instead.
+        """
+
+        real_path = os.path.realpath(file_path)
+
+        try:
+            stat = os.stat(real_path)
+        except OSError:
+            # Let the parser raise a proper error
+            return parse()
+
+        base_key = self._key(
+            kind, real_path, sorted(extras), variant, _tool_version()
+        )
+        stat_path = os.path.join(self.stats_directory, base_key)
+
+        content_hash = None
+        recorded_stat = self._read(stat_path)
+        if recorded_stat and self._is_stat_match(stat, recorded_stat):
+            content_hash = recorded_stat[2]
+            entries = self._read_entries(
+                self._entries_path(base_key, content_hash), read_files
+            )
+            if entries is not None:
+                return entries
+
+        if not content_hash:
+            content_hash = self._hash_file(real_path)
+
+        entries_path = self._entries_path(base_key, content_hash)
+        entries = self._read_entries(entries_path, read_files)
+
+        if entries is None:
+            return self._store(
+                parse(),
+                entries_path,
+                stat_path,
+                stat,
+                content_hash,
+                read_files,
+            )
+
+        self._write_stat(stat_path, stat, content_hash)
+        return entries
+
+    def _store(
+        self,
+        entries_iterable: Iterable[RequirementsEntry],
+        entries_path: str,
+        stat_path: str,
+        stat: os.stat_result,
+        content_hash: str,
+        read_files: Optional[List[str]],
+    ) -> Iterable[RequirementsEntry]:
+        entries = []
+
+        # Stream the entries while parsing and only store them once
+        # the file was parsed without errors.
+        for entry in entries_iterable:
+            entries.append(entry)
+            yield entry
+
+        dependencies = [
+            (path, self._hash_dependency(path))
+            for path in dict.fromkeys(read_files or [])
+        ]
+
+        self._write(entries_path, (entries, dependencies))
+        self._write_stat(stat_path, stat, content_hash)
+
+    def _read_entries(
+        self, entries_path: str, read_files: Optional[List[str]]
+    ) -> Optional[List[RequirementsEntry]]:
+        record = self._read(entries_path)
+        if record is None:
+            return None
+
+        entries, dependencies = record
+        for path, content_hash in dependencies:
+            if self._hash_dependency(path) != content_hash:
+                return None
+
+        if read_files is not None:
+            read_files.extend(path for path, _ in dependencies)
+
+        return entries
+
+    def _write_stat(
+        self, stat_path: str, stat: os.stat_result, content_hash: str
+    ) -> None:
+        self._write(
+            stat_path,
+            (stat.st_size, stat.st_mtime_ns, content_hash, time.time_ns()),
+        )
+
+    @staticmethod
+    def _is_stat_match(stat: os.stat_result, recorded: Tuple) -> bool:
+        size, mtime_ns, content_hash, recorded_at_ns = recorded
+
+        return (
+            stat.st_size == size
+            and stat.st_mtime_ns == mtime_ns
+            and recorded_at_ns - mtime_ns > racy_stat_window_ns
+        )
+
+    def _entries_path(self, base_key: str, content_hash: str) -> str:
+        return os.path.join(
+            self.entries_directory, self._key(base_key, content_hash)
+        )
+
+    @staticmethod
+    def _key(*parts) -> str:
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    @classmethod
+    def _hash_dependency(cls, path: str) -> Optional[str]:
+        # A file that is missing can appear, that's a change too
+        try:
+            return cls._hash_file(path)
+        except OSError:
+            return None
+
+    def _read(self, path: str):
+        try:
+            with open(path, "rb") as fp:
+                value = pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt or written by an incompatible version, either
+            # way it's a miss and it will be overwritten.
+            return None
+
+        # Reading an entry marks it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return value
+
+    def _write(self, path: str, value) -> None:
+        # Imported here, runs that only read from the cache skip it
+        import tempfile
+
+        directory = os.path.dirname(path)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+        with self.size_lock:
+            self._track_size(size)
+
+    def _track_size(self, added_size: int) -> None:
+        if self.size is None:
+            self.size = sum(size for _, _, size in self._list_files())
+        else:
+            self.size += added_size
+
+        if self.size > self.max_size:
+            self._evict()
+
+    def _evict(self) -> None:
+        files = sorted(self._list_files())
+
+        # Evict down to 90% so we don't have to evict on every write
+        target_size = self.max_size * 0.9
+        self.size = sum(size for _, _, size in files)
+
+        for _, path, size in files:
+            if self.size <= target_size:
+                break
+
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+
+            self.size -= size
+
+    def _list_files(self) -> List[Tuple[float, str, int]]:
+        files = []
+
+        for directory in (self.stats_directory, self.entries_directory):
+            with os.scandir(directory) as it:
+                for dir_entry in it:
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+
+                    files.append((stat.st_mtime, dir_entry.path, stat.st_size))
+
+        return files
@@ -0,0 +1,171 @@
+import os
+import threading
+
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .entry import RequirementsEntry
+from .parse_cache import ParseCache
+
+# Files that decide which file the requirements of a local package are
+# read from, a change to any of them can change the choice.
+package_metadata_file_names = ["setup.py", "setup.cfg", "pyproject.toml"]
+
+# Size, modification time and inode of a file, None if it didn't exist
+_FileSignature = Optional[Tuple[int, int, int]]
+
+
+def _file_signature(real_path: str) -> _FileSignature:
+    try:
+        stat = os.stat(real_path)
+    except OSError:
+        return None
+
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+class ParseMemo:
+    """In-memory memo of parsed files, for repeatedly listing the same
+    set of files while only some of them change.
+
+    Can be used in place of a `ParseCache`. Every file that is parsed
+    through it is remembered along with its size and modification
+    time, `poll` finds the ones that changed since and forgets their
+    entries, so the next run parses them again. When a `cache` is
+    specified, files that are not memoized are looked up in it first.
+
+    The files that were read to parse a file (see
+    `ParseCache.get_or_parse`) are tracked as well, a change to any of
+    them forgets the entries of the file that read them.
+    """
+
+    def __init__(self, cache: Optional[ParseCache] = None) -> None:
+        self.cache = cache
+
+        self.entries: Dict[Hashable, List[RequirementsEntry]] = {}
+        self.read_files: Dict[Hashable, List[str]] = {}
+        self.signatures: Dict[str, _FileSignature] = {}
+
+        self.lock = threading.Lock()
+
+    def get_or_parse(
+        self,
+        kind: str,
+        file_path: str,
+        extras: List[str],
+        parse: Callable[[], Iterable[RequirementsEntry]],
+        variant: Hashable = None,
+        read_files: Optional[List[str]] = None,
+    ) -> Iterable[RequirementsEntry]:
+        real_path = os.path.realpath(file_path)
+        key = (kind, real_path, tuple(sorted(extras)), variant)
+
+        with self.lock:
+            entries = self.entries.get(key)
+            if entries is not None:
+                if read_files is not None:
+                    read_files.extend(self.read_files.get(key, []))
+
+                return entries
+
+        # Recorded before parsing, a change while parsing is noticed
+        # by the next poll.
+        self.watch(real_path)
+
+        if kind in package_metadata_file_names:
+            for file_name in package_metadata_file_names:
+                self.watch(
+                    os.path.join(os.path.dirname(real_path), file_name)
+                )
+
+        if self.cache:
+            entries_iterable = self.cache.get_or_parse(
+                kind, file_path, extras, parse, variant, read_files
+            )
+        else:
+            entries_iterable = parse()
+
+        return self._store(key, entries_iterable, read_files)
+
+    def watch(self, file_path: str) -> None:
+        """Starts tracking the specified file, if it isn't already."""
+
+        real_path = os.path.realpath(file_path)
+
+        with self.lock:
+            if real_path not in self.signatures:
+                self.signatures[real_path] = _file_signature(real_path)
+
+    def poll(self) -> Set[str]:
+        """Finds the tracked files that changed (or appeared or were
+        removed) since they were parsed and forgets their entries.
+
+        Returns the real paths of the files that changed.
+        """
+
+        with self.lock:
+            signatures = list(self.signatures.items())
+
+        changed_signatures = {}
+        for real_path, signature in signatures:
+            new_signature = _file_signature(real_path)
+            if new_signature != signature:
+                changed_signatures[real_path] = new_signature
+
+        if changed_signatures:
+            with self.lock:
+                self.signatures.update(changed_signatures)
+
+            self.forget(changed_signatures.keys())
+
+        return set(changed_signatures.keys())
+
+    def forget(self, real_paths: Iterable[str]) -> None:
+        """Forgets the entries of the specified files, they are parsed
+        again the next time they are needed."""
+
+        real_paths = set(real_paths)
+
+        with self.lock:
+            for key in list(self.entries.keys()):
+                if key[1] in real_paths or not real_paths.isdisjoint(
+                    self.read_files.get(key, [])
+                ):
+                    del self.entries[key]
+                    self.read_files.pop(key, None)
+
+    def file_paths(self) -> List[str]:
+        """Lists the real paths of all tracked files."""
+
+        with self.lock:
+            return list(self.signatures.keys())
+
+    def _store(
+        self,
+        key: Hashable,
+        entries_iterable: Iterable[RequirementsEntry],
+        read_files: Optional[List[str]],
+    ) -> Iterable[RequirementsEntry]:
+        entries = []
+
+        # Stream the entries while parsing and only memoize them once
+        # the file was parsed without errors.
+        for entry in entries_iterable:
+            entries.append(entry)
+            yield entry
+
+        # Only known once the file was parsed
+        for read_path in read_files or []:
+            self.watch(read_path)
+
+        with self.lock:
+            self.entries[key] = entries
+            self.read_files[key] = list(dict.fromkeys(read_files or []))
@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import sys
+
+from typing import Any, Dict, Generator, Optional
+
+from .entry import (
+    RequirementsEntry,
+    RequirementsEntrySource,
+    RequirementsPackageEntry,
+)
+from .error import DeclarativeMetadataError
+from .parse_requirements_list import (
+    parse_direct_ref_requirements_entry,
+    parse_editable_requirements_entry,
+    parse_path_requirements_entry,
+    parse_vcs_requirements_entry,
+    parse_wheel_requirements_entry,
+)
+
+# Versions are written as a specifier, e.g. "==1.0"
+version_regex = re.compile(r"^\s*(===|==|~=|!=|>=|<=|>|<)\s*(.+?)\s*$")
+
+vcs_keys = ["git", "hg", "svn", "bzr"]
+
+
+def parse_pipfile_lock(
+    file_path: str, include_dev: bool = False
+) -> Generator[RequirementsEntry, None, None]:
+    """Lists the packages locked in a Pipfile.lock.
+
+    Packages in the `develop` section are only listed when
+    `include_dev` is set. Packages that come from a VCS, a local
+    path or a URL are listed like they would be in a requirements.txt.
+    """
+
+    with open(file_path, "r") as fp:
+        try:
+            lock = json.load(fp)
+        except ValueError as err:
+            raise DeclarativeMetadataError(file_path, str(err))
+
+    source = RequirementsEntrySource(
+        path=sys.intern(os.path.realpath(file_path)),
+        line=None,
+        line_number=None,
+    )
+
+    sections = ["default"]
+    if include_dev:
+        sections.append("develop")
+
+    for section in sections:
+        for name, package in (lock.get(section) or {}).items():
+            yield _parse_locked_package(source, name, package)
+
+
+def _parse_locked_package(
+    source: RequirementsEntrySource, name: str, package: Dict[str, Any]
+) -> RequirementsEntry:
+    extras = list(package.get("extras") or [])
+    markers = package.get("markers") or None
+    if markers:
+        markers = sys.intern(markers)
+
+    for vcs in vcs_keys:
+        if vcs not in package:
+            continue
+
+        uri = package[vcs]
+        ref = package.get("ref")
+        return parse_vcs_requirements_entry(
+            source,
+            f"{vcs}+{uri}" + (f"@{ref}" if ref else "") + f"#egg={name}",
+            extras,
+            markers,
+        )
+
+    if "path" in package:
+        if package.get("editable"):
+            return parse_editable_requirements_entry(
+                source, "-e " + package["path"], extras
+            )
+
+        return parse_path_requirements_entry(source, package["path"], extras)
+
+    if "file" in package:
+        if package["file"].endswith(".whl"):
+            return parse_wheel_requirements_entry(
+                source, package["file"], extras, markers
+            )
+
+        return parse_direct_ref_requirements_entry(
+            source, f"{name} @ {package['file']}", extras, markers
+        )
+
+    operator, version = _parse_version(package.get("version"))
+
+    return RequirementsPackageEntry(
+        source=source,
+        name=sys.intern(name),
+        extras=extras,
+        operator=operator,
+        version=version,
+        markers=markers,
+        hashes=tuple(package.get("hashes") or ()),
+    )
+
+
+def _parse_version(version: Optional[str]):
+    match = version_regex.match(version or "")
+    if not match:
+        return None, None
+
+    return match.group(1), sys.intern(match.group(2))
@@ -0,0 +1,150 @@
+import os
+import sys
+
+from typing import Any, Dict, Generator, List, Optional
+
+from .entry import (
+    RequirementsEntry,
+    RequirementsEntrySource,
+    RequirementsPackageEntry,
+)
+from .error import DeclarativeMetadataError
+from .parse_pyproject_toml import _tomllib
+from .parse_requirements_list import (
+    parse_direct_ref_requirements_entry,
+    parse_editable_requirements_entry,
+    parse_path_requirements_entry,
+    parse_vcs_requirements_entry,
+)
+
+main_group = "main"
+
+
+def parse_poetry_lock(
+    file_path: str, include_dev: bool = False
+) -> Generator[RequirementsEntry, None, None]:
+    """Lists the packages locked in a poetry.lock.
+
+    Only packages in the main group are listed, unless `include_dev` is
+    set. Lock files written by Poetry versions that don't record groups
+    at all are listed in full. Hashes are read from both the current
+    (`files` per package) and the legacy (`[metadata.files]`) format.
+    """
+
+    tomllib = _tomllib()
+
+    with open(file_path, "rb") as fp:
+        try:
+            lock = tomllib.load(fp)
+        except tomllib.TOMLDecodeError as err:
+            raise DeclarativeMetadataError(file_path, str(err))
+
+    source = RequirementsEntrySource(
+        path=sys.intern(os.path.realpath(file_path)),
+        line=None,
+        line_number=None,
+    )
+
+    legacy_files = (lock.get("metadata") or {}).get("files") or {}
+
+    for package in lock.get("package") or []:
+        groups = _package_groups(package)
+        if not include_dev and groups is not None:
+            if main_group not in groups:
+                continue
+
+            groups = [main_group]
+
+        files = package.get("files")
+        if files is None:
+            files = legacy_files.get(package["name"]) or []
+
+        yield _parse_locked_package(
+            source, package, _package_markers(package, groups), files
+        )
+
+
+def _package_groups(package: Dict[str, Any]) -> Optional[List[str]]:
+    if "groups" in package:
+        return package["groups"]
+
+    # Before groups, packages were either "main" or "dev"
+    if "category" in package:
+        return [package["category"]]
+
+    return None
+
+
+def _package_markers(
+    package: Dict[str, Any], groups: Optional[List[str]]
+) -> Optional[str]:
+    markers = package.get("markers")
+    if not isinstance(markers, dict):
+        return sys.intern(markers) if markers else None
+
+    # Markers that differ per group, the package is needed if any of
+    # the listed groups needs it.
+    group_markers = []
+    for group in groups if groups is not None else markers.keys():
+        if group not in markers:
+            return None
+
+        if markers[group] not in group_markers:
+            group_markers.append(markers[group])
+
+    if len(group_markers) == 1:
+        return sys.intern(group_markers[0])
+
+    return " or ".join(f"({group_marker})" for group_marker in group_markers)
+
+
+def _parse_locked_package(
+    source: RequirementsEntrySource,
+    package: Dict[str, Any],
+    markers: Optional[str],
+    files: List[Dict[str, str]],
+) -> RequirementsEntry:
+    name = package["name"]
+
+    package_source = package.get("source") or {}
+    source_type = package_source.get("type")
+    url = package_source.get("url")
+
+    if source_type == "git":
+        ref = package_source.get("resolved_reference") or package_source.get(
+            "reference"
+        )
+        return parse_vcs_requirements_entry(
+            source,
+            f"git+{url}" + (f"@{ref}" if ref else "") + f"#egg={name}",
+            [],
+            markers,
+        )
+
+    if source_type == "directory":
+        if package.get("develop"):
+            return parse_editable_requirements_entry(source, "-e " + url, [])
+
+        return parse_path_requirements_entry(source, url, [])
+
+    if source_type == "file":
+        path = os.path.realpath(
+            os.path.join(os.path.dirname(source.path), url)
+        )
+        return parse_direct_ref_requirements_entry(
+            source, f"{name} @ file://{path}", [], markers
+        )
+
+    if source_type == "url":
+        return parse_direct_ref_requirements_entry(
+            source, f"{name} @ {url}", [], markers
+        )
+
+    return RequirementsPackageEntry(
+        source=source,
+        name=sys.intern(name),
+        operator="==",
+        version=sys.intern(package["version"]),
+        markers=markers,
+        hashes=tuple(file["hash"] for file in files if file.get("hash")),
+    )
@@ -0,0 +1,150 @@
+import os
+import sys
+
+from typing import Any, Dict, Generator, List, Optional
+
+from .canonicalize_package_name import canonicalize_package_name
+from .entry import RequirementsEntry, RequirementsEntrySource
+from .error import DeclarativeMetadataError
+from .parse_requirements_list import parse_requirements_list
+from .parse_requirements_txt import parse_requirements_txt
+
+
+def parse_pyproject_toml(
+    file_path: str,
+    extras: List[str] = [],
+    include_build_requires: bool = False,
+    keep_line_text: bool = True,
+    read_files: Optional[List[str]] = None,
+) -> Generator[RequirementsEntry, None, None]:
+    """Lists the requirements declared in a pyproject.toml (PEP 621).
+
+    Dependencies that are marked as dynamic are only understood when
+    they are read from requirements files by setuptools
+    (`[tool.setuptools.dynamic]`). The real paths of those files are
+    appended to `read_files`, when specified. Requirements of the build
+    backend (`[build-system] requires`) are only listed when
+    `include_build_requires` is set.
+    """
+
+    pyproject = _read_pyproject_toml(file_path)
+
+    project = pyproject.get("project")
+    if not isinstance(project, dict):
+        raise DeclarativeMetadataError(file_path, "no [project] table")
+
+    source = RequirementsEntrySource(
+        path=sys.intern(os.path.realpath(file_path)),
+        line=None,
+        line_number=None,
+    )
+
+    dynamic = project.get("dynamic") or []
+    dynamic_config = (
+        pyproject.get("tool", {}).get("setuptools", {}).get("dynamic", {})
+    )
+
+    def _parse_dynamic(config: Any, field_name: str):
+        if not isinstance(config, dict) or "file" not in config:
+            raise DeclarativeMetadataError(
+                file_path, f"{field_name} are dynamic"
+            )
+
+        file_names = config["file"]
+        if isinstance(file_names, str):
+            file_names = [file_names]
+
+        for file_name in file_names:
+            requirements_path = os.path.join(
+                os.path.dirname(file_path), file_name
+            )
+            if read_files is not None:
+                read_files.append(os.path.realpath(requirements_path))
+
+            for requirement in parse_requirements_txt(
+                requirements_path, keep_line_text
+            ):
+                yield requirement
+
+    if "dependencies" in dynamic:
+        for requirement in _parse_dynamic(
+            dynamic_config.get("dependencies"), "dependencies"
+        ):
+            yield requirement
+    else:
+        for requirement in parse_requirements_list(
+            source, project.get("dependencies") or [], keep_line_text
+        ):
+            yield requirement
+
+    selected_extras = {canonicalize_package_name(extra) for extra in extras}
+
+    if "optional-dependencies" in dynamic:
+        optional_dependencies = dynamic_config.get("optional-dependencies")
+        for extra_name, config in (optional_dependencies or {}).items():
+            if canonicalize_package_name(extra_name) not in selected_extras:
+                continue
+
+            for requirement in _parse_dynamic(
+                config, "optional-dependencies"
+            ):
+                yield requirement
+    else:
+        optional_dependencies = project.get("optional-dependencies") or {}
+        for extra_name, requirements in optional_dependencies.items():
+            if canonicalize_package_name(extra_name) not in selected_extras:
+                continue
+
+            for requirement in parse_requirements_list(
+                source, requirements, keep_line_text
+            ):
+                yield requirement
+
+    if include_build_requires:
+        build_system = pyproject.get("build-system") or {}
+        for requirement in parse_requirements_list(
+            source, build_system.get("requires") or [], keep_line_text
+        ):
+            yield requirement
+
+
+def _tomllib() -> Any:
+    # Only imported once a TOML file is actually read
+    try:
+        import tomllib
+    except ImportError:  # pragma: no cover, Python < 3.11
+        import tomli as tomllib
+
+    return tomllib
+
+
+def _read_pyproject_toml(file_path: str) -> Dict[str, Any]:
+    tomllib = _tomllib()
+
+    with open(file_path, "rb") as fp:
+        try:
+            return tomllib.load(fp)
+        except tomllib.TOMLDecodeError as err:
+            raise DeclarativeMetadataError(file_path, str(err))
+
+
+def _pyproject_toml_declares_dependencies(file_path: str) -> bool:
+    """Gets whether the pyproject.toml lists its dependencies itself,
+    rather than leaving them up to the setup.py."""
+
+    try:
+        pyproject = _read_pyproject_toml(file_path)
+    except (OSError, DeclarativeMetadataError):
+        return False
+
+    project = pyproject.get("project")
+    if not isinstance(project, dict):
+        return False
+
+    if "dependencies" not in (project.get("dynamic") or []):
+        return True
+
+    dynamic_config = (
+        pyproject.get("tool", {}).get("setuptools", {}).get("dynamic", {})
+    )
+    return "file" in (dynamic_config.get("dependencies") or {})
@@ -1,7 +1,8 @@
 import os
 import re
+import sys
 
-from typing import Generator, List, Optional, Tuple
+from typing import Generator, Iterable, List, Match, Optional, Tuple
 from urllib.parse import urlparse
 
 from .entry import (
@@ -48,76 +49,151 @@ vcs_protocols_regex = r"^(%s)" % "|".join(
     [re.escape(protocol) for protocol in vcs_protocols]
 )
 
+# Matches a single non-blank, non-comment line and classifies it by the
+# group that matched its prefix. Used to scan a whole buffer in one go.
+# Lines ending in a backslash continue on the next line.
+line_regex = re.compile(
+    r"^[ \t]*"
+    r"(?=[^\s#])"
+    r"(?:"
+    r"(?P<recursive>-r)"
+    r"|(?P<constraints>-c)"
+    r"|(?P<editable>-e)"
+    r"|(?P<path>\./)"
+    r"|(?P<index_url>-i)"
+    r"|(?P<vcs>%s)"
+    r"|(?P<wheel>(?:http|https|file)://(?=.+.whl))"
+    r")?"
+    r"(?:.*\\\r?\n)*"
+    r".*$" % "|".join(re.escape(protocol) for protocol in vcs_protocols),
+    re.MULTILINE,
+)
+
+extras_regex = re.compile(r"\[.*\]")
+
+continuation_regex = re.compile(r"\\\r?\n")
+
+# Comments can follow a requirement, the # has to be preceded by
+# whitespace so that URL fragments (#egg=) aren't mistaken for one.
+comment_regex = re.compile(r"\s+#.*$")
+
+hash_option_regex = re.compile(r"--hash[= ](\S+)")
+
+# A pinned package, as written by pip-compile. These make up almost all
+# of the lines in compiled files and are parsed in one go.
+pinned_package_regex = re.compile(
+    r"(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)"
+    r"(?:\[(?P<extras>[^\]]*)\])?"
+    r"==(?P<version>[^\s;=][^\s;]*)"
+    r"(?: ?; ?(?P<markers>[^-]*?))?"
+    r"(?P<hashes>(?: --hash[= ]\S+)*)$"
+)
+
 
 class RequirementsEntryParseError(RuntimeError):
     pass
 
 
 def parse_requirements_list(
-    source: Optional[RequirementsEntrySource], lines: List[str]
+    source: Optional[RequirementsEntrySource],
+    lines: Iterable[str],
+    keep_line_text: bool = True,
 ) -> Generator[RequirementsEntry, None, None]:
-
     for index, line in enumerate(lines):
-        stripped_line = _clean_line(line)
+        match = line_regex.match(line)
+        if not match:
+            continue
+
+        yield _parse_line(source, index + 1, match, keep_line_text)
+
 
-        if not len(stripped_line) or stripped_line.startswith("#"):
+def parse_requirements_lines(
+    source: Optional[RequirementsEntrySource],
+    lines: Iterable[Tuple[int, str]],
+    keep_line_text: bool = True,
+) -> Generator[RequirementsEntry, None, None]:
+    """Parses lines along with their line numbers, as they come from
+    `read_requirements_lines`."""
+
+    for line_number, line in lines:
+        match = line_regex.match(line)
+        if not match:
             continue
 
-        line_source = None
-        if source:
-            line_source = RequirementsEntrySource(
-                path=source.path, line=stripped_line, line_number=index + 1
-            )
+        yield _parse_line(source, line_number, match, keep_line_text)
 
-        requirement, extras, markers, options = _split_requirement_and_markers(
-            stripped_line
-        )
 
-        if requirement.startswith("-r"):
-            yield parse_recursive_requirements_entry(
-                line_source, requirement, extras, markers, options,
-            )
+def parse_requirements_buffer(
+    source: Optional[RequirementsEntrySource],
+    buffer: str,
+    keep_line_text: bool = True,
+) -> Generator[RequirementsEntry, None, None]:
+    """Parses the contents of an entire requirements file.
 
-        elif requirement.startswith("-c"):
-            yield parse_constraints_requirements_entry(
-                line_source, requirement, extras, markers, options,
-            )
+    Blank lines and comments are skipped by the scanner without ever
+    getting to Python code.
 
-        elif requirement.startswith("-e"):
-            yield parse_editable_requirements_entry(
-                line_source, requirement, extras, markers, options,
-            )
+    Without `keep_line_text`, the sources of the entries only point to
+    the file and line number, not the text of the line.
+    """
 
-        elif requirement.startswith("./"):
-            yield parse_path_requirements_entry(
-                line_source, requirement, extras, markers, options,
-            )
+    line_number = 1
+    position = 0
 
-        elif requirement.startswith("-i"):
-            yield parse_index_url_requirements_entry(
-                line_source, requirement, extras, markers, options
-            )
+    for match in line_regex.finditer(buffer):
+        line_number += buffer.count("\n", position, match.start())
+        position = match.start()
 
-        elif re.match(vcs_protocols_regex, requirement):
-            yield parse_vcs_requirements_entry(
-                line_source, requirement, extras, markers, options
-            )
+        yield _parse_line(source, line_number, match, keep_line_text)
 
-        elif "@" in requirement:
-            yield parse_direct_ref_requirements_entry(
-                line_source, requirement, extras, markers, options,
-            )
 
-        elif re.match(r"^(http|https|file)://(.+).whl", requirement):
-            yield parse_wheel_requirements_entry(
-                line_source, requirement, extras, markers, options,
-            )
+def _parse_line(
+    source: Optional[RequirementsEntrySource],
+    line_number: int,
+    match: Match,
+    keep_line_text: bool = True,
+) -> RequirementsEntry:
+    line = match.group(0).strip()
+
+    if "\n" in line:
+        line = continuation_regex.sub("", line)
+
+    if "#" in line:
+        line = comment_regex.sub("", line)
+
+    # Collapse runs of whitespace, but don't copy the line if there
+    # aren't any (which is almost always)
+    if "  " in line or "\t" in line:
+        line = " ".join(line.split())
+
+    line_source = None
+    if source:
+        line_source = RequirementsEntrySource(
+            path=source.path,
+            line=line if keep_line_text else None,
+            line_number=line_number,
+        )
 
-        else:
-            yield parse_package_requirements_entry(
-                line_source, requirement, extras, markers, options
+    kind = match.lastgroup
+    if kind is None:
+        pinned_match = pinned_package_regex.match(line)
+        if pinned_match:
+            return parse_pinned_package_requirements_entry(
+                line_source, pinned_match
             )
 
+    requirement, extras, markers, options = _split_line(line)
+
+    if kind is None or kind == "wheel":
+        if "@" in requirement:
+            kind = "direct_ref"
+        elif kind is None:
+            kind = "package"
+
+    return entry_parsers[kind](
+        line_source, requirement, extras, markers, options
+    )
+
 
 def parse_recursive_requirements_entry(
     source: RequirementsEntrySource,
@@ -127,9 +203,7 @@ def parse_recursive_requirements_entry(
     options: Optional[str] = None,
 ) -> RequirementsRecursiveEntry:
     original_path = _clean_line(requirement.lstrip("-r"))
-    absolute_path = os.path.realpath(
-        os.path.join(os.path.dirname(source.path), original_path)
-    )
+    absolute_path = _real_path(source, original_path)
 
     return RequirementsRecursiveEntry(
         source=source, original_path=original_path, absolute_path=absolute_path,
@@ -144,9 +218,7 @@ def parse_constraints_requirements_entry(
     options: Optional[str] = None,
 ) -> RequirementsConstraintsEntry:
     original_path = _clean_line(requirement.lstrip("-c"))
-    absolute_path = os.path.realpath(
-        os.path.join(os.path.dirname(source.path), original_path)
-    )
+    absolute_path = _real_path(source, original_path)
 
     return RequirementsConstraintsEntry(
         source=source, original_path=original_path, absolute_path=absolute_path,
@@ -166,12 +238,8 @@ def parse_editable_requirements_entry(
     if not original_path.endswith(".py"):
         resolved_path = os.path.join(original_path, "setup.py")
 
-    absolute_path = os.path.realpath(
-        os.path.join(os.path.dirname(source.path), original_path)
-    )
-    resolved_absolute_path = os.path.realpath(
-        os.path.join(os.path.dirname(source.path), resolved_path)
-    )
+    absolute_path = _real_path(source, original_path)
+    resolved_absolute_path = _real_path(source, resolved_path)
 
     return RequirementsEditableEntry(
         source=source,
@@ -197,12 +265,8 @@ def parse_path_requirements_entry(
     if not original_path.endswith(".py"):
         resolved_path = os.path.join(original_path, "setup.py")
 
-    absolute_path = os.path.realpath(
-        os.path.join(os.path.dirname(source.path), original_path)
-    )
-    resolved_absolute_path = os.path.realpath(
-        os.path.join(os.path.dirname(source.path), resolved_path)
-    )
+    absolute_path = _real_path(source, original_path)
+    resolved_absolute_path = _real_path(source, resolved_path)
 
     return RequirementsPathPackageEntry(
         source=source,
@@ -308,7 +372,7 @@ def parse_direct_ref_requirements_entry(
     options: Optional[str] = None,
 ) -> RequirementsDirectRefEntry:
     name, uri = requirement.split("@")
-    name = name.strip()
+    name = sys.intern(name.strip())
     uri = uri.strip()
 
     return RequirementsDirectRefEntry(
@@ -323,6 +387,11 @@ def parse_package_requirements_entry(
     markers: Optional[str] = None,
     options: Optional[str] = None,
 ) -> RequirementsPackageEntry:
+    hashes = ()
+    if options and "--hash" in options:
+        hashes = tuple(hash_option_regex.findall(options))
+        options = _clean_line(hash_option_regex.sub("", options)) or None
+
     operators = ["==", ">=", ">", "<=", "<"]
     for operator in operators:
         parts = requirement.split(operator)
@@ -331,63 +400,105 @@ def parse_package_requirements_entry(
 
         return RequirementsPackageEntry(
             source=source,
-            name=parts[0],
+            name=sys.intern(parts[0]),
             operator=operator,
-            version=parts[1],
+            version=sys.intern(parts[1]),
             markers=markers,
             extras=extras,
             options=options,
+            hashes=hashes,
         )
 
     return RequirementsPackageEntry(
         source=source,
-        name=requirement,
+        name=sys.intern(requirement),
         extras=extras,
         markers=markers,
         options=options,
+        hashes=hashes,
     )
 
 
-def _clean_line(line: str) -> str:
-    return (
-        line.strip()
-        .replace("\n", "")
-        .replace("\r", "")
-        .replace("  ", " ")
-        .replace("  ", " ")
+def parse_pinned_package_requirements_entry(
+    source: RequirementsEntrySource, match: Match
+) -> RequirementsPackageEntry:
+    extras = []
+    if match.group("extras") is not None:
+        extras = [extra.strip() for extra in match.group("extras").split(",")]
+
+    markers = match.group("markers")
+    if markers:
+        markers = sys.intern(markers)
+
+    hashes = ()
+    if match.group("hashes"):
+        hashes = tuple(hash_option_regex.findall(match.group("hashes")))
+
+    return RequirementsPackageEntry(
+        source=source,
+        name=sys.intern(match.group("name")),
+        extras=extras,
+        operator="==",
+        version=sys.intern(match.group("version")),
+        markers=markers or None,
+        hashes=hashes,
     )
 
 
-def _split_requirement_and_markers(
-    line: str,
-) -> Tuple[str, List[str], Optional[str], Optional[str]]:
-    requirement = []
-    requirement_parts = line.split(" ")
-    for index, part in enumerate(requirement_parts):
-        if index > 0 and part.startswith("-"):
-            break
+def _real_path(source: RequirementsEntrySource, path: str) -> str:
+    # The same files tend to be referred to from many places
+    return sys.intern(
+        os.path.realpath(os.path.join(os.path.dirname(source.path), path))
+    )
 
-        requirement.append(part)
 
-    requirement = " ".join(requirement)
-    options = line[line.index(requirement) + len(requirement):].strip() or None
+def _clean_line(line: str) -> str:
+    return " ".join(line.split())
+
+
+def _split_line(
+    line: str,
+) -> Tuple[str, List[str], Optional[str], Optional[str]]:
+    # Everything after the first word (that isn't the first) starting
+    # with a dash is an option, e.g. --hash or --install-option
+    options = None
+    options_index = line.find(" -")
+    if options_index >= 0:
+        options = line[options_index + 1 :]
+        requirement = line[:options_index]
+    else:
+        requirement = line
 
     markers = None
     if ";" in requirement:
-        requirement, markers = requirement.split(";")
+        requirement, markers = requirement.split(";", 1)
 
         requirement = requirement.strip()
-        markers = markers.strip()
+        markers = sys.intern(markers.strip())
 
     extras = []
-    extras_match = re.search(re.compile(r"\[.*\]"), requirement)
-    if extras_match:
-        matched_text = extras_match[0]
+    if "[" in requirement:
+        extras_match = extras_regex.search(requirement)
+        if extras_match:
+            matched_text = extras_match[0]
 
-        requirement = requirement.replace(matched_text, "")
-        extras = [
-            extra.strip()
-            for extra in matched_text.strip("[").strip("]").strip().split(",")
-        ]
+            requirement = requirement.replace(matched_text, "")
+            extras = [
+                extra.strip()
+                for extra in matched_text.strip("[]").strip().split(",")
+            ]
 
     return requirement, extras, markers, options
+
+
+entry_parsers = {
+    "recursive": parse_recursive_requirements_entry,
+    "constraints": parse_constraints_requirements_entry,
+    "editable": parse_editable_requirements_entry,
+    "path": parse_path_requirements_entry,
+    "index_url": parse_index_url_requirements_entry,
+    "vcs": parse_vcs_requirements_entry,
+    "direct_ref": parse_direct_ref_requirements_entry,
+    "wheel": parse_wheel_requirements_entry,
+    "package": parse_package_requirements_entry,
+}
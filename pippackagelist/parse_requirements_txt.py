@@ -1,18 +1,27 @@
 import os
+import sys
 
-from typing import Generator
+from typing import Generator, List, Optional
 
 from .entry import RequirementsEntry, RequirementsEntrySource
-from .parse_requirements_list import parse_requirements_list
+from .parse_requirements_list import parse_requirements_lines
+from .read_requirements_lines import read_requirements_lines
 
 
 def parse_requirements_txt(
     file_path: str,
+    keep_line_text: bool = True,
+    line_counts: Optional[List[int]] = None,
+    memory_map: bool = True,
 ) -> Generator[RequirementsEntry, None, None]:
+    # All entries share the same path
     source = RequirementsEntrySource(
-        path=os.path.realpath(file_path), line=None, line_number=None
+        path=sys.intern(os.path.realpath(file_path)),
+        line=None,
+        line_number=None,
     )
 
-    with open(file_path, "r") as fp:
-        for requirement in parse_requirements_list(source, fp.readlines()):
-            yield requirement
+    lines = read_requirements_lines(file_path, line_counts, memory_map)
+
+    for requirement in parse_requirements_lines(source, lines, keep_line_text):
+        yield requirement
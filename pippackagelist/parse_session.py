@@ -0,0 +1,98 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from .parse_cache import ParseCache
+from .parse_memo import ParseMemo
+from .parse_setup_py import SetupPyMode
+from .setup_py_worker_pool import SetupPyWorkerPool
+
+# Options of `list_packages_from_files` that a session takes the place of
+session_option_names = [
+    "setup_py_mode",
+    "setup_py_workers",
+    "setup_py_timeout",
+    "setup_py_memory_limit",
+    "cache_dir",
+    "cache_max_size",
+    "jobs",
+]
+
+
+class ParseSession:
+    """Parsed files and workers that are shared by multiple calls to
+    `list_packages_from_files`.
+
+    Every file is parsed once per session, no matter how many of the
+    lists include it, until `memo.poll` notices that it changed. The
+    setup.py worker processes and the threads that parse files ahead
+    of time are started once and re-used, until the session is closed.
+    """
+
+    def __init__(
+        self,
+        *,
+        setup_py_mode: SetupPyMode = SetupPyMode.AUTO,
+        setup_py_workers: int = 0,
+        setup_py_timeout: Optional[float] = None,
+        setup_py_memory_limit: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_size: int = 256 * 1024 * 1024,
+        jobs: int = 1,
+    ) -> None:
+        self.setup_py_mode = setup_py_mode
+        self.jobs = jobs
+
+        cache = None
+        if cache_dir:
+            cache = ParseCache(cache_dir, cache_max_size)
+
+        self.memo = ParseMemo(cache)
+
+        self.setup_py_pool: Optional[SetupPyWorkerPool] = None
+        if setup_py_workers > 0:
+            self.setup_py_pool = SetupPyWorkerPool(
+                setup_py_workers,
+                mode=setup_py_mode,
+                timeout=setup_py_timeout,
+                memory_limit=setup_py_memory_limit,
+            )
+
+        self.executor: Optional[Executor] = None
+        if jobs > 1:
+            self.executor = ThreadPoolExecutor(max_workers=jobs)
+
+    @classmethod
+    def from_options(
+        cls, options: Dict[str, Any]
+    ) -> Tuple["ParseSession", Dict[str, Any]]:
+        """Creates a session from the options meant for
+        `list_packages_from_files`.
+
+        Returns the session and the options that are left.
+        """
+
+        session_options = {
+            name: value
+            for name, value in options.items()
+            if name in session_option_names
+        }
+        other_options = {
+            name: value
+            for name, value in options.items()
+            if name not in session_option_names
+        }
+
+        return cls(**session_options), other_options
+
+    def close(self) -> None:
+        if self.executor:
+            self.executor.shutdown(wait=True)
+
+        if self.setup_py_pool:
+            self.setup_py_pool.shutdown()
+
+    def __enter__(self) -> "ParseSession":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,105 @@
+import configparser
+import os
+import sys
+
+from typing import Generator, List, Optional
+
+from .canonicalize_package_name import canonicalize_package_name
+from .entry import RequirementsEntry, RequirementsEntrySource
+from .error import DeclarativeMetadataError
+from .parse_requirements_list import parse_requirements_list
+from .parse_requirements_txt import parse_requirements_txt
+
+
+def parse_setup_cfg(
+    file_path: str,
+    extras: List[str] = [],
+    keep_line_text: bool = True,
+    read_files: Optional[List[str]] = None,
+) -> Generator[RequirementsEntry, None, None]:
+    """Lists the requirements declared in the [options] section of a
+    setup.cfg (install_requires and extras_require).
+
+    Like setuptools, values can be a list with one requirement per line,
+    separated by semicolons or read from files with `file:`. The real
+    paths of those files are appended to `read_files`, when specified.
+    """
+
+    config = _read_setup_cfg(file_path)
+
+    source = RequirementsEntrySource(
+        path=sys.intern(os.path.realpath(file_path)),
+        line=None,
+        line_number=None,
+    )
+
+    def _parse_value(value: str):
+        if value.strip().startswith("file:"):
+            file_names = value.strip()[len("file:") :].split(",")
+            for file_name in file_names:
+                requirements_path = os.path.join(
+                    os.path.dirname(file_path), file_name.strip()
+                )
+                if read_files is not None:
+                    read_files.append(os.path.realpath(requirements_path))
+
+                for requirement in parse_requirements_txt(
+                    requirements_path, keep_line_text
+                ):
+                    yield requirement
+            return
+
+        for requirement in parse_requirements_list(
+            source, _parse_list(value), keep_line_text
+        ):
+            yield requirement
+
+    install_requires = config.get("options", "install_requires", fallback="")
+    for requirement in _parse_value(install_requires):
+        yield requirement
+
+    if not config.has_section("options.extras_require"):
+        return
+
+    selected_extras = {canonicalize_package_name(extra) for extra in extras}
+
+    for extra_name, value in config.items("options.extras_require"):
+        if canonicalize_package_name(extra_name) not in selected_extras:
+            continue
+
+        for requirement in _parse_value(value):
+            yield requirement
+
+
+def _read_setup_cfg(file_path: str) -> configparser.ConfigParser:
+    # No interpolation, requirements can contain % (e.g. in URLs)
+    config = configparser.ConfigParser(interpolation=None)
+
+    try:
+        with open(file_path, "r") as fp:
+            config.read_file(fp)
+    except configparser.Error as err:
+        raise DeclarativeMetadataError(file_path, str(err))
+
+    return config
+
+
+def _parse_list(value: str) -> List[str]:
+    if "\n" in value:
+        items = value.splitlines()
+    else:
+        items = value.split(";")
+
+    return [item.strip() for item in items if item.strip()]
+
+
+def _setup_cfg_declares_dependencies(file_path: str) -> bool:
+    """Gets whether the setup.cfg lists the dependencies, rather than
+    leaving them up to the setup.py."""
+
+    try:
+        config = _read_setup_cfg(file_path)
+    except (OSError, DeclarativeMetadataError):
+        return False
+
+    return config.has_option("options", "install_requires")
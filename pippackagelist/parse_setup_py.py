@@ -1,37 +1,76 @@
+import builtins
+import contextlib
+import contextvars
+import enum
 import os
+import sys
+import threading
 
-from typing import Generator, List
-
-import setuptools
+from typing import Any, Callable, Dict, Generator, List, Optional
 
 from .entry import RequirementsEntry, RequirementsEntrySource
+from .error import SetupPyStaticAnalysisError
+from .extract_setup_py_kwargs import extract_setup_py_kwargs
 from .parse_requirements_list import parse_requirements_list
 
 
+# The keyword arguments of setup() calls made by the setup.py that is
+# being executed in the current context, None outside of executing one.
+_captured_setup_kwargs = contextvars.ContextVar(
+    "captured_setup_kwargs", default=None
+)
+
+# The working directory and setup() are the same for all threads, only
+# one setup.py is executed at a time. Other threads still see the
+# working directory change while one is executed.
+_exec_lock = threading.RLock()
+
+
+class SetupPyMode(enum.Enum):
+    # Only look at the AST, fail if the requirements cannot be resolved
+    STATIC = "static"
+    # Always execute the setup.py
+    EXEC = "exec"
+    # Look at the AST, execute the setup.py if that doesn't work out
+    AUTO = "auto"
+
+
 def parse_setup_py(
-    file_path: str, extras: List[str] = []
+    file_path: str,
+    extras: List[str] = [],
+    mode: SetupPyMode = SetupPyMode.AUTO,
+    keep_line_text: bool = True,
+    read_files: Optional[List[str]] = None,
 ) -> Generator[RequirementsEntry, None, None]:
-    setup_kwargs = {}
+    """Lists the requirements of a setup.py, the `install_requires`
+    and the `extras_require` of the specified extras.
 
-    def _setup_proxy(*args, **kwargs):
-        setup_kwargs.update(dict(kwargs))
+    The real paths of the files that the setup.py reads are appended to
+    `read_files`, when specified. Only the files read by a setup.py
+    that could be analyzed statically are known.
+    """
 
-    setuptools.setup = _setup_proxy
+    setup_kwargs = _read_setup_kwargs(file_path, mode, read_files)
 
-    original_cwd = os.getcwd()
-    os.chdir(os.path.dirname(file_path))
+    for requirement in _parse_setup_kwargs(
+        file_path, setup_kwargs, extras, keep_line_text
+    ):
+        yield requirement
 
-    try:
-        with open(file_path, "r") as fp:
-            exec(fp.read(), globals())
-    finally:
-        os.chdir(original_cwd)
 
+def _parse_setup_kwargs(
+    file_path: str,
+    setup_kwargs: Dict[str, Any],
+    extras: List[str],
+    keep_line_text: bool = True,
+) -> Generator[RequirementsEntry, None, None]:
     source = RequirementsEntrySource(
-        path=os.path.realpath(file_path), line=None, line_number=None
+        path=sys.intern(os.path.realpath(file_path)),
+        line=None,
+        line_number=None,
     )
 
-    requirements = setup_kwargs.get("install_requires") or []
+    requirements = list(setup_kwargs.get("install_requires") or [])
 
     extras_require = setup_kwargs.get("extras_require") or {}
     for extra_name, extra_requirements in extras_require.items():
@@ -40,5 +79,94 @@ def parse_setup_py(
 
         requirements.extend(extra_requirements)
 
-    for requirement in parse_requirements_list(source, requirements):
+    for requirement in parse_requirements_list(
+        source, requirements, keep_line_text
+    ):
         yield requirement
+
+
+def _read_setup_kwargs(
+    file_path: str,
+    mode: SetupPyMode,
+    read_files: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    if mode != SetupPyMode.EXEC:
+        try:
+            return extract_setup_py_kwargs(file_path, read_files)
+        except SetupPyStaticAnalysisError:
+            if mode == SetupPyMode.STATIC:
+                raise
+
+    return _exec_setup_py(file_path)
+
+
+def _setup_proxy(setup: Callable[..., Any]) -> Callable[..., Any]:
+    def _setup(*args, **kwargs):
+        setup_kwargs = _captured_setup_kwargs.get()
+        if setup_kwargs is None:
+            # Not called by the setup.py being executed, e.g. by
+            # another thread.
+            return setup(*args, **kwargs)
+
+        setup_kwargs.update(kwargs)
+
+    return _setup
+
+
+@contextlib.contextmanager
+def _capture_setup(setup_kwargs: Dict[str, Any]) -> Generator[None, None, None]:
+    """Records the keyword arguments of setup() calls made in this
+    context into `setup_kwargs`, both of setuptools and distutils,
+    rather than running setup()."""
+
+    # Takes a while to import, most setup.py files never get executed
+    import setuptools
+
+    modules: List[Any] = [setuptools]
+    try:
+        import distutils.core
+
+        modules.append(distutils.core)
+    except ImportError:  # pragma: no cover, Python >= 3.12
+        pass
+
+    originals = [(module, module.setup) for module in modules]
+    token = _captured_setup_kwargs.set(setup_kwargs)
+
+    try:
+        for module, setup in originals:
+            module.setup = _setup_proxy(setup)
+
+        yield
+    finally:
+        for module, setup in originals:
+            module.setup = setup
+
+        _captured_setup_kwargs.reset(token)
+
+
+def _exec_setup_py(file_path: str) -> Dict[str, Any]:
+    file_path = os.path.abspath(file_path)
+
+    with open(file_path, "r") as fp:
+        code = compile(fp.read(), file_path, "exec")
+
+    setup_kwargs: Dict[str, Any] = {}
+
+    # Runs like `python setup.py` would, in a namespace of its own
+    namespace: Dict[str, Any] = {
+        "__name__": "__main__",
+        "__file__": file_path,
+        "__builtins__": builtins,
+    }
+
+    with _exec_lock, _capture_setup(setup_kwargs):
+        original_cwd = os.getcwd()
+        os.chdir(os.path.dirname(file_path))
+
+        try:
+            exec(code, namespace)
+        finally:
+            os.chdir(original_cwd)
+
+    return setup_kwargs
@@ -0,0 +1,97 @@
+import locale
+import mmap
+import os
+import re
+
+from typing import Generator, List, Optional, Tuple
+
+# A line that is not blank and not a comment, including the lines it
+# continues on when it ends in a backslash
+content_line_regex = re.compile(
+    rb"^[ \t]*[^\s#](?:.*\\\r?\n)*.*$", re.MULTILINE
+)
+
+continuation_regex = re.compile(rb"\\\r?\n")
+
+# Smaller files are read into memory, mapping them costs more than it
+# saves
+memory_map_min_size = 1024 * 1024
+
+
+def _count_newlines(buffer: bytes, start: int, end: int) -> int:
+    """Counts the newlines between `start` and `end`, without copying
+    that part of the buffer."""
+
+    count = 0
+    position = buffer.find(b"\n", start, end)
+
+    while position != -1:
+        count += 1
+        position = buffer.find(b"\n", position + 1, end)
+
+    return count
+
+
+def read_requirements_lines(
+    file_path: str,
+    line_counts: Optional[List[int]] = None,
+    memory_map: bool = True,
+) -> Generator[Tuple[int, str], None, None]:
+    """Reads the lines of a requirements file that are not blank and not
+    a comment, along with their line numbers.
+
+    Lines ending in a backslash are joined with the next line, the line
+    number is that of the first line.
+
+    Large files are memory-mapped and scanned as bytes. Only the lines
+    that are yielded are decoded, so memory use does not grow with the
+    size of the file. A process that maps a file crashes when the file
+    is truncated while it's read, without `memory_map`, files are always
+    read into memory instead (e.g. when they're being watched).
+
+    Once the whole file was read, the number of lines it has is appended
+    to `line_counts`.
+    """
+
+    encoding = locale.getpreferredencoding(False)
+
+    with open(file_path, "rb") as fp:
+        buffer = None
+
+        if memory_map and os.fstat(fp.fileno()).st_size >= memory_map_min_size:
+            try:
+                buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Pipes and the like cannot be mapped
+                pass
+
+        if buffer is None:
+            buffer = fp.read()
+
+        try:
+            line_number = 1
+            position = 0
+
+            for match in content_line_regex.finditer(buffer):
+                start = match.start()
+                line_number += _count_newlines(buffer, position, start)
+                position = start
+
+                line = match.group(0)
+                if b"\n" in line:
+                    line = continuation_regex.sub(b"", line)
+
+                yield line_number, line.decode(encoding)
+
+            if line_counts is not None:
+                lines = line_number - 1
+                lines += _count_newlines(buffer, position, len(buffer))
+
+                # The last line doesn't have to end in a newline
+                if buffer[-1:] not in (b"", b"\n"):
+                    lines += 1
+
+                line_counts.append(lines)
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
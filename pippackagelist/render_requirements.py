@@ -0,0 +1,167 @@
+import enum
+import json
+import os
+import sys
+
+from typing import Dict, Hashable, Iterable, List, Optional, TextIO
+
+from .entry import (
+    RequirementsConstraintsEntry,
+    RequirementsDirectRefEntry,
+    RequirementsEditableEntry,
+    RequirementsEntry,
+    RequirementsIndexURLEntry,
+    RequirementsPackageEntry,
+    RequirementsPathPackageEntry,
+    RequirementsRecursiveEntry,
+    RequirementsVCSPackageEntry,
+    RequirementsWheelPackageEntry,
+)
+
+# Output is collected and written in chunks of at least this many
+# characters, rather than line by line.
+default_chunk_size = 64 * 1024
+
+entry_kinds = {
+    RequirementsRecursiveEntry: "recursive",
+    RequirementsConstraintsEntry: "constraints",
+    RequirementsEditableEntry: "editable",
+    RequirementsIndexURLEntry: "index_url",
+    RequirementsVCSPackageEntry: "vcs",
+    RequirementsPathPackageEntry: "path",
+    RequirementsWheelPackageEntry: "wheel",
+    RequirementsDirectRefEntry: "direct_ref",
+    RequirementsPackageEntry: "package",
+}
+
+# Entries that have a path that needs to be made relative when rendered
+path_entry_types = {
+    RequirementsRecursiveEntry,
+    RequirementsConstraintsEntry,
+    RequirementsEditableEntry,
+    RequirementsPathPackageEntry,
+}
+
+
+class RenderFormat(enum.Enum):
+    # One requirement per line, like a requirements.txt file
+    TEXT = "text"
+    # A JSON array with an object per requirement
+    JSON = "json"
+
+
+class RelativePathCache:
+    """Makes absolute paths relative to a fixed base directory.
+
+    Most paths point into a small number of directories, the relative
+    path of each directory is only computed once.
+    """
+
+    def __init__(self, base_dir: str) -> None:
+        self.base_dir = os.path.abspath(base_dir)
+        self.directories: Dict[str, str] = {}
+
+    def __call__(self, path: str) -> str:
+        directory, name = os.path.split(path)
+
+        # Parents of the base directory don't end in their name
+        if not name or self.base_dir.startswith(path):
+            return os.path.relpath(path, self.base_dir)
+
+        relative_directory = self.directories.get(directory)
+        if relative_directory is None:
+            relative_directory = os.path.relpath(directory, self.base_dir)
+            self.directories[directory] = relative_directory
+
+        if relative_directory == ".":
+            return name
+
+        return os.path.join(relative_directory, name)
+
+
+def render_requirements(
+    entries: Iterable[RequirementsEntry],
+    *,
+    base_dir: Optional[str] = None,
+    fmt: RenderFormat = RenderFormat.TEXT,
+    out: Optional[TextIO] = None,
+    chunk_size: int = default_chunk_size,
+) -> int:
+    """Writes the specified entries to `out` (stdout by default).
+
+    Paths are rendered relative to `base_dir`, which defaults to the
+    current working directory at the time of the call. Entries are
+    written as they come in, in chunks of at least `chunk_size`
+    characters.
+
+    Returns the number of entries that were written.
+    """
+
+    if out is None:
+        out = sys.stdout
+
+    relpath = RelativePathCache(base_dir or os.getcwd())
+
+    # The same files tend to be referred to many times. Other entries
+    # are cheaper to render than to look up.
+    rendered_lines: Dict[Hashable, str] = {}
+
+    def _render(entry: RequirementsEntry) -> str:
+        if type(entry) not in path_entry_types:
+            return entry.render(relpath)
+
+        identity = entry.identity()
+
+        line = rendered_lines.get(identity)
+        if line is None:
+            line = entry.render(relpath)
+            rendered_lines[identity] = line
+
+        return line
+
+    def _render_json(entry: RequirementsEntry) -> str:
+        source = None
+        if entry.source:
+            source = {
+                "path": relpath(entry.source.path),
+                "line_number": entry.source.line_number,
+            }
+
+        return json.dumps(
+            {
+                "kind": entry_kinds.get(type(entry)),
+                "requirement": _render(entry),
+                "package_name": entry.package_name(),
+                "source": source,
+            }
+        )
+
+    chunk: List[str] = []
+    chunk_length = 0
+    count = 0
+
+    if fmt == RenderFormat.JSON:
+        out.write("[")
+
+    for entry in entries:
+        if fmt == RenderFormat.JSON:
+            line = ("\n  " if not count else ",\n  ") + _render_json(entry)
+        else:
+            line = _render(entry) + "\n"
+
+        chunk.append(line)
+        chunk_length += len(line)
+        count += 1
+
+        if chunk_length >= chunk_size:
+            out.write("".join(chunk))
+            chunk.clear()
+            chunk_length = 0
+
+    out.write("".join(chunk))
+
+    if fmt == RenderFormat.JSON:
+        out.write("\n]\n" if count else "]\n")
+
+    out.flush()
+    return count
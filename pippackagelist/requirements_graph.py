@@ -0,0 +1,288 @@
+import enum
+import os
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from .canonicalize_package_name import canonicalize_package_name
+from .entry import (
+    RequirementsConstraintsEntry,
+    RequirementsEditableEntry,
+    RequirementsEntry,
+    RequirementsPathPackageEntry,
+    RequirementsRecursiveEntry,
+)
+
+# Identifies a file in the graph, setup.py and similar files are
+# included with a specific set of extras
+RequirementsGraphKey = Tuple[str, Tuple[str, ...]]
+
+
+class RequirementsGraphEdgeKind(enum.Enum):
+    RECURSIVE = "recursive"
+    CONSTRAINTS = "constraints"
+    EDITABLE = "editable"
+    PATH = "path"
+
+
+edge_kinds = {
+    RequirementsRecursiveEntry: RequirementsGraphEdgeKind.RECURSIVE,
+    RequirementsConstraintsEntry: RequirementsGraphEdgeKind.CONSTRAINTS,
+    RequirementsEditableEntry: RequirementsGraphEdgeKind.EDITABLE,
+    RequirementsPathPackageEntry: RequirementsGraphEdgeKind.PATH,
+}
+
+
+@dataclass
+class RequirementsGraphNode:
+    key: RequirementsGraphKey
+    # As it was first included, the real path is the first part of the key
+    file_path: str
+    extras: List[str]
+    entries: List[RequirementsEntry] = field(default_factory=list)
+    # Other files that were read to get the entries, e.g. the files a
+    # setup.py opens or the `file:` entries of a setup.cfg
+    read_files: List[str] = field(default_factory=list)
+
+    @property
+    def real_path(self) -> str:
+        return self.key[0]
+
+
+@dataclass
+class RequirementsGraphEdge:
+    source: RequirementsGraphKey
+    target: RequirementsGraphKey
+    kind: RequirementsGraphEdgeKind
+    # The entry in the source file that includes the target
+    entry: RequirementsEntry
+
+
+class RequirementsGraph:
+    """The files that make up a list of requirements and how they
+    include each other.
+
+    Edges point from the including file to the included file and are
+    typed by the kind of entry that includes it (-r, -c, -e or a
+    path). Incoming edges, the roots every file can be reached from
+    and the files every package appears in are indexed by `index`, so
+    that questions about the graph don't require traversing it.
+    """
+
+    def __init__(self) -> None:
+        self.roots: List[RequirementsGraphKey] = []
+        self.root_keys: Set[RequirementsGraphKey] = set()
+        self.nodes: Dict[RequirementsGraphKey, RequirementsGraphNode] = {}
+        self.edges: List[RequirementsGraphEdge] = []
+
+        self.outgoing: Dict[
+            RequirementsGraphKey, List[RequirementsGraphEdge]
+        ] = defaultdict(list)
+        self.incoming: Dict[
+            RequirementsGraphKey, List[RequirementsGraphEdge]
+        ] = defaultdict(list)
+
+        self.keys_by_path: Dict[str, List[RequirementsGraphKey]] = {}
+        self.keys_by_read_file: Dict[str, List[RequirementsGraphKey]] = {}
+        self.entries_by_package: Dict[
+            str, List[Tuple[RequirementsGraphKey, RequirementsEntry]]
+        ] = defaultdict(list)
+
+        # Roots each file can be reached from, through any edge and
+        # without going through constraint files.
+        self.roots_by_node: Dict[
+            RequirementsGraphKey, Set[RequirementsGraphKey]
+        ] = {}
+        self.requiring_roots_by_node: Dict[
+            RequirementsGraphKey, Set[RequirementsGraphKey]
+        ] = {}
+
+    def add_include(
+        self,
+        parent_key: Optional[RequirementsGraphKey],
+        key: RequirementsGraphKey,
+        file_path: str,
+        extras: List[str],
+        entry: Optional[RequirementsEntry] = None,
+    ) -> None:
+        """Adds a file, as a root or as included by `entry` in the file
+        identified by `parent_key`."""
+
+        if key not in self.nodes:
+            self.nodes[key] = RequirementsGraphNode(
+                key=key, file_path=file_path, extras=list(extras)
+            )
+            self.keys_by_path.setdefault(key[0], []).append(key)
+
+        if parent_key is None:
+            if key not in self.root_keys:
+                self.roots.append(key)
+                self.root_keys.add(key)
+            return
+
+        edge = RequirementsGraphEdge(
+            source=parent_key,
+            target=key,
+            kind=edge_kinds[type(entry)],
+            entry=entry,
+        )
+
+        self.edges.append(edge)
+        self.outgoing[parent_key].append(edge)
+        self.incoming[key].append(edge)
+
+    def add_entry(
+        self, key: RequirementsGraphKey, entry: RequirementsEntry
+    ) -> None:
+        self.nodes[key].entries.append(entry)
+
+        package_name = entry.package_name()
+        if package_name:
+            self.entries_by_package[
+                canonicalize_package_name(package_name)
+            ].append((key, entry))
+
+    def add_read_files(
+        self, key: RequirementsGraphKey, file_paths: Iterable[str]
+    ) -> None:
+        """Records the other files that were read to get the entries of
+        the file identified by `key`, by their real paths."""
+
+        node = self.nodes[key]
+
+        for file_path in file_paths:
+            if file_path in node.read_files:
+                continue
+
+            node.read_files.append(file_path)
+            self.keys_by_read_file.setdefault(file_path, []).append(key)
+
+    def index(self) -> None:
+        """Computes which roots every file can be reached from."""
+
+        self.roots_by_node = self._reachable_roots(
+            {kind for kind in RequirementsGraphEdgeKind}
+        )
+        self.requiring_roots_by_node = self._reachable_roots(
+            {
+                kind
+                for kind in RequirementsGraphEdgeKind
+                if kind != RequirementsGraphEdgeKind.CONSTRAINTS
+            }
+        )
+
+    def package_entries(
+        self, package_name: str
+    ) -> List[Tuple[RequirementsGraphKey, RequirementsEntry]]:
+        """Lists the entries for the specified package (by any spelling
+        of its name) and the files they are in."""
+
+        return self.entries_by_package.get(
+            canonicalize_package_name(package_name), []
+        )
+
+    def roots_requiring(self, package_name: str) -> List[str]:
+        """Lists the root files that pull in the specified package.
+
+        Constraint files don't pull in packages, occurrences that can
+        only be reached through a -c entry are not taken into account.
+        """
+
+        roots = set()
+        for key, _ in self.package_entries(package_name):
+            roots.update(self.requiring_roots_by_node.get(key, ()))
+
+        return self._root_paths(roots)
+
+    def affected_roots(self, file_path: str) -> List[str]:
+        """Lists the root files whose list changes when the specified
+        file changes."""
+
+        real_path = os.path.realpath(file_path)
+
+        roots = set()
+        for keys_by_path in (self.keys_by_path, self.keys_by_read_file):
+            for key in keys_by_path.get(real_path, []):
+                roots.update(self.roots_by_node.get(key, ()))
+
+        return self._root_paths(roots)
+
+    def why(
+        self, package_name: str
+    ) -> List[Tuple[List[RequirementsGraphEdge], RequirementsEntry]]:
+        """Explains how the specified package ends up in the list.
+
+        For every entry of the package and every root file that pulls it
+        in, returns the shortest chain of includes from that root to the
+        file the entry is in, along with the entry.
+        """
+
+        explanations = []
+
+        for key, entry in self.package_entries(package_name):
+            chains = self._chains_from_roots(key)
+            for root_key in self.roots:
+                if root_key in chains:
+                    explanations.append((chains[root_key], entry))
+
+        return explanations
+
+    def _chains_from_roots(
+        self, key: RequirementsGraphKey
+    ) -> Dict[RequirementsGraphKey, List[RequirementsGraphEdge]]:
+        """Finds the shortest chain of edges from every root that
+        reaches the specified file, by walking the incoming edges."""
+
+        chains: Dict[RequirementsGraphKey, List[RequirementsGraphEdge]] = {
+            key: []
+        }
+        queue: Deque[RequirementsGraphKey] = deque([key])
+
+        while queue:
+            current_key = queue.popleft()
+
+            for edge in self.incoming.get(current_key, []):
+                if edge.kind == RequirementsGraphEdgeKind.CONSTRAINTS:
+                    continue
+
+                if edge.source not in chains:
+                    chains[edge.source] = [edge] + chains[current_key]
+                    queue.append(edge.source)
+
+        return {
+            root_key: chain
+            for root_key, chain in chains.items()
+            if root_key in self.root_keys
+        }
+
+    def _reachable_roots(
+        self, kinds: Set[RequirementsGraphEdgeKind]
+    ) -> Dict[RequirementsGraphKey, Set[RequirementsGraphKey]]:
+        roots_by_node: Dict[
+            RequirementsGraphKey, Set[RequirementsGraphKey]
+        ] = defaultdict(set)
+
+        for root_key in self.roots:
+            roots_by_node[root_key].add(root_key)
+
+            queue: Deque[RequirementsGraphKey] = deque([root_key])
+            while queue:
+                key = queue.popleft()
+
+                for edge in self.outgoing.get(key, []):
+                    if edge.kind not in kinds:
+                        continue
+
+                    if root_key not in roots_by_node[edge.target]:
+                        roots_by_node[edge.target].add(root_key)
+                        queue.append(edge.target)
+
+        return dict(roots_by_node)
+
+    def _root_paths(self, roots: Set[RequirementsGraphKey]) -> List[str]:
+        return [
+            self.nodes[root_key].file_path
+            for root_key in self.roots
+            if root_key in roots
+        ]
@@ -0,0 +1,354 @@
+import threading
+import time
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    TypeVar,
+)
+
+from .entry import RequirementsEntry
+from .render_requirements import entry_kinds
+
+T = TypeVar("T")
+
+
+@dataclass
+class FileParseTiming:
+    kind: str
+    file_path: str
+    # When the first entry was asked for and when the last one was
+    # produced, the duration only covers producing the entries.
+    start: float
+    end: float
+    duration: float
+    entries: int
+    # Only known for the kinds that are read line by line, e.g.
+    # requirements.txt
+    lines: Optional[int]
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    start: float
+    end: float
+    duration: float
+
+
+class RunObserver:
+    """Is told what happens while a list is built, e.g. to collect
+    statistics (see `RunStatistics`) or to find out where time goes.
+
+    Every method does nothing by default, override the ones you're
+    interested in. Files can be parsed on multiple threads (see `jobs`
+    of `list_packages_from_files`), `file_parsed` is called on the
+    thread that parsed the file and has to be thread-safe.
+
+    Times are in seconds, `start` and `end` are `time.perf_counter`
+    values.
+    """
+
+    def file_included(
+        self, file_path: str, parent_path: Optional[str]
+    ) -> None:
+        """A file that was not listed before was included by another
+        file, or is one of the files that were specified when there's
+        no `parent_path`.
+
+        It's parsed once the entries before it were listed, or earlier
+        when files are parsed on multiple threads.
+        """
+
+    def file_parsed(self, timing: FileParseTiming) -> None:
+        """A file was parsed, rather than taken from a cache.
+
+        `kind` is the type of the file (e.g. requirements.txt or
+        setup.py). For a setup.py that is evaluated by a worker
+        process, the duration is the time spent waiting for it. The
+        number of lines is only known for requirements files.
+        """
+
+    def entry_read(self, entry: RequirementsEntry) -> None:
+        """An entry was read from one of the files, including the -r, -e
+        and path entries that are recursed into."""
+
+    def duplicate_dropped(self, entry: RequirementsEntry) -> None:
+        """An entry was dropped because it was already listed."""
+
+    def constraint_applied(
+        self,
+        entry: RequirementsEntry,
+        constraints: List[RequirementsEntry],
+    ) -> None:
+        """An entry was replaced by the constraints for its package."""
+
+    def stage_finished(self, timing: StageTiming) -> None:
+        """A stage of building the list is done.
+
+        Stages consume the entries of the stage before them, so their
+        start and end nest. The duration only covers the stage itself,
+        not the stages it consumes entries from. Reading and parsing the
+        files is part of the "traverse" stage.
+        """
+
+
+class RunObserverGroup(RunObserver):
+    """Tells multiple observers what happens."""
+
+    def __init__(self, observers: List[RunObserver]) -> None:
+        self.observers = observers
+
+    def file_included(
+        self, file_path: str, parent_path: Optional[str]
+    ) -> None:
+        for observer in self.observers:
+            observer.file_included(file_path, parent_path)
+
+    def file_parsed(self, timing: FileParseTiming) -> None:
+        for observer in self.observers:
+            observer.file_parsed(timing)
+
+    def entry_read(self, entry: RequirementsEntry) -> None:
+        for observer in self.observers:
+            observer.entry_read(entry)
+
+    def duplicate_dropped(self, entry: RequirementsEntry) -> None:
+        for observer in self.observers:
+            observer.duplicate_dropped(entry)
+
+    def constraint_applied(
+        self,
+        entry: RequirementsEntry,
+        constraints: List[RequirementsEntry],
+    ) -> None:
+        for observer in self.observers:
+            observer.constraint_applied(entry, constraints)
+
+    def stage_finished(self, timing: StageTiming) -> None:
+        for observer in self.observers:
+            observer.stage_finished(timing)
+
+
+class RunStatistics(RunObserver):
+    """Collects counters and per-file timings of one or more runs."""
+
+    def __init__(self) -> None:
+        self.files_parsed: Counter = Counter()
+        self.lines_scanned = 0
+        self.entries_read: Counter = Counter()
+        self.duplicates_dropped = 0
+        self.constraints_applied = 0
+        self.stage_durations: Counter = Counter()
+        self.file_timings: List[FileParseTiming] = []
+
+        self.lock = threading.Lock()
+
+    def file_parsed(self, timing: FileParseTiming) -> None:
+        with self.lock:
+            self.files_parsed[timing.kind] += 1
+            self.lines_scanned += timing.lines or 0
+            self.file_timings.append(timing)
+
+    def entry_read(self, entry: RequirementsEntry) -> None:
+        self.entries_read[entry_kinds.get(type(entry), "other")] += 1
+
+    def duplicate_dropped(self, entry: RequirementsEntry) -> None:
+        self.duplicates_dropped += 1
+
+    def constraint_applied(
+        self,
+        entry: RequirementsEntry,
+        constraints: List[RequirementsEntry],
+    ) -> None:
+        self.constraints_applied += 1
+
+    def stage_finished(self, timing: StageTiming) -> None:
+        self.stage_durations[timing.stage] += timing.duration
+
+    def slowest_files(
+        self, count: int, kind: Optional[str] = None
+    ) -> List[FileParseTiming]:
+        """Lists the files that took the longest to parse, optionally
+        only the ones of the specified kind."""
+
+        with self.lock:
+            timings = [
+                timing
+                for timing in self.file_timings
+                if kind is None or timing.kind == kind
+            ]
+
+        return sorted(timings, key=lambda timing: -timing.duration)[:count]
+
+    def render_summary(self, out: TextIO, top: int = 10) -> None:
+        """Writes a human readable summary to `out`."""
+
+        parse_time = sum(timing.duration for timing in self.file_timings)
+
+        out.write(
+            "files parsed: %d (%s)\n"
+            % (
+                sum(self.files_parsed.values()),
+                _format_counter(self.files_parsed),
+            )
+        )
+        out.write(f"lines scanned: {self.lines_scanned}\n")
+        out.write(
+            "entries read: %d (%s)\n"
+            % (
+                sum(self.entries_read.values()),
+                _format_counter(self.entries_read),
+            )
+        )
+        out.write(f"duplicates dropped: {self.duplicates_dropped}\n")
+        out.write(f"constraints applied: {self.constraints_applied}\n")
+        out.write(f"time parsing files: {parse_time:.3f}s\n")
+
+        for stage, duration in self.stage_durations.items():
+            out.write(f"time in {stage}: {duration:.3f}s\n")
+
+        slowest_setup_py = self.slowest_files(top, kind="setup.py")
+        if slowest_setup_py:
+            out.write("slowest setup.py files:\n")
+
+        for timing in slowest_setup_py:
+            out.write(f"  {timing.duration:.3f}s {timing.file_path}\n")
+
+
+def _format_counter(counter: Counter) -> str:
+    return ", ".join(f"{name}: {count}" for name, count in counter.items())
+
+
+class _TimedIterator(Iterator[T]):
+    """Keeps track of how much time is spent getting the next item."""
+
+    def __init__(self, iterable: Iterable[T]) -> None:
+        self.iterator = iter(iterable)
+        self.time = 0.0
+
+    def __iter__(self) -> "_TimedIterator[T]":
+        return self
+
+    def __next__(self) -> T:
+        start = time.perf_counter()
+        try:
+            return next(self.iterator)
+        finally:
+            self.time += time.perf_counter() - start
+
+
+def _observe_parse(
+    observer: Optional[RunObserver],
+    kind: str,
+    file_path: str,
+    parse: Callable[[], Iterable[RequirementsEntry]],
+    line_counts: Optional[List[int]] = None,
+) -> Callable[[], Iterable[RequirementsEntry]]:
+    """Wraps a function that parses a file, so that the observer is told
+    once the file was parsed.
+
+    A parser that reads the file line by line appends the number of
+    lines to `line_counts` (see `read_requirements_lines`).
+    """
+
+    if not observer:
+        return parse
+
+    def _observe(
+        entries: Iterable[RequirementsEntry],
+    ) -> Generator[RequirementsEntry, None, None]:
+        start = time.perf_counter()
+        timed_entries = _TimedIterator(entries)
+        count = 0
+
+        for entry in timed_entries:
+            count += 1
+            yield entry
+
+        observer.file_parsed(
+            FileParseTiming(
+                kind=kind,
+                file_path=file_path,
+                start=start,
+                end=time.perf_counter(),
+                duration=timed_entries.time,
+                entries=count,
+                lines=sum(line_counts) if line_counts is not None else None,
+            )
+        )
+
+    # `parse` is still called right away, that's how setup.py files
+    # start being evaluated by a worker before their entries are needed.
+    return lambda: _observe(parse())
+
+
+def _observe_stage(
+    observer: Optional[RunObserver],
+    stage: str,
+    generator: Callable[[Iterable[T]], Iterable[T]],
+    entries: Iterable[T],
+) -> Iterable[T]:
+    """Runs a stage that transforms entries, telling the observer how
+    much time was spent in it once all of its entries were consumed.
+
+    A stage that produces entries rather than transforming them is
+    passed no `entries`.
+    """
+
+    if not observer:
+        return generator(entries)
+
+    def _observe() -> Generator[T, None, None]:
+        start = time.perf_counter()
+        timed_entries = _TimedIterator(entries)
+        timed_output = _TimedIterator(generator(timed_entries))
+
+        for entry in timed_output:
+            yield entry
+
+        observer.stage_finished(
+            StageTiming(
+                stage=stage,
+                start=start,
+                end=time.perf_counter(),
+                duration=timed_output.time - timed_entries.time,
+            )
+        )
+
+    return _observe()
+
+
+def _observe_output(
+    observer: Optional[RunObserver],
+    stage: str,
+    write: Callable[[Iterable[T]], None],
+    entries: Iterable[T],
+) -> None:
+    """Writes entries, e.g. by rendering them, telling the observer how
+    much time was spent writing rather than producing the entries."""
+
+    if not observer:
+        write(entries)
+        return
+
+    start = time.perf_counter()
+    timed_entries = _TimedIterator(entries)
+    write(timed_entries)
+    end = time.perf_counter()
+
+    observer.stage_finished(
+        StageTiming(
+            stage=stage,
+            start=start,
+            end=end,
+            duration=end - start - timed_entries.time,
+        )
+    )
@@ -0,0 +1,241 @@
+import fnmatch
+import os
+import re
+
+from typing import Generator, Iterable, List, Optional, Pattern, Tuple
+
+from .find_package_metadata_file import find_package_metadata_file
+from .parse_pyproject_toml import _pyproject_toml_declares_dependencies
+from .parse_setup_cfg import _setup_cfg_declares_dependencies
+
+default_scan_include = [
+    "requirements*.txt",
+    "setup.py",
+    "setup.cfg",
+    "pyproject.toml",
+]
+
+# Files that can describe the same package, only the one that its
+# requirements are read from is picked up.
+_declares_dependencies = {
+    "setup.py": lambda file_path: True,
+    "setup.cfg": _setup_cfg_declares_dependencies,
+    "pyproject.toml": _pyproject_toml_declares_dependencies,
+}
+
+# Directories that never contain files we're interested in, these are
+# skipped without even looking inside them.
+default_scan_prune = [
+    ".git",
+    ".hg",
+    ".svn",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    ".mypy_cache",
+    ".pytest_cache",
+    "__pycache__",
+    "node_modules",
+    "site-packages",
+    "vendor",
+]
+
+
+def _translate_ignore_pattern(pattern: str) -> str:
+    """Translates a .gitignore-style glob into a regular expression."""
+
+    regex = ""
+    index = 0
+
+    while index < len(pattern):
+        char = pattern[index]
+
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+            continue
+
+        if pattern.startswith("/**", index) and index + 3 == len(pattern):
+            regex += "/.*"
+            index += 3
+            continue
+
+        if pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+            continue
+
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end < 0:
+                regex += re.escape(char)
+            else:
+                characters = pattern[index + 1 : end]
+                if characters.startswith("!"):
+                    characters = "^" + characters[1:]
+
+                regex += "[" + characters + "]"
+                index = end
+        else:
+            regex += re.escape(char)
+
+        index += 1
+
+    return regex
+
+
+class IgnorePatterns:
+    """Matches paths against a list of .gitignore-style patterns.
+
+    Supports `*`, `?`, `[...]`, `**`, anchoring with a leading `/` (or
+    any `/` in the middle of the pattern), directory-only patterns
+    with a trailing `/` and negation with a leading `!`. Like with
+    git, the last matching pattern wins.
+    """
+
+    def __init__(self, patterns: Iterable[str] = []) -> None:
+        self.patterns: List[Tuple[Pattern, bool, bool]] = []
+
+        for pattern in patterns:
+            self.add(pattern)
+
+    @classmethod
+    def from_files(
+        cls, file_paths: Iterable[str], patterns: Iterable[str] = []
+    ) -> "IgnorePatterns":
+        all_patterns = []
+        for file_path in file_paths:
+            with open(file_path, "r") as fp:
+                all_patterns.extend(fp.read().splitlines())
+
+        all_patterns.extend(patterns)
+        return cls(all_patterns)
+
+    def add(self, pattern: str) -> None:
+        pattern = pattern.rstrip()
+        if not pattern or pattern.startswith("#"):
+            return
+
+        negate = pattern.startswith("!")
+        if negate:
+            pattern = pattern[1:]
+
+        directory_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        regex = _translate_ignore_pattern(pattern.lstrip("/"))
+        if "/" not in pattern:
+            regex = "(?:.*/)?" + regex
+
+        self.patterns.append((re.compile(regex + "$"), negate, directory_only))
+
+    def is_ignored(self, relative_path: str, is_directory: bool) -> bool:
+        ignored = False
+
+        for regex, negate, directory_only in self.patterns:
+            if directory_only and not is_directory:
+                continue
+
+            if regex.match(relative_path):
+                ignored = not negate
+
+        return ignored
+
+
+def _is_package_requirements_file(file_path: str, include: Pattern) -> bool:
+    """Gets whether the requirements of the package in the directory of
+    the specified setup.py, setup.cfg or pyproject.toml are read from
+    it, rather than from one of the others (as long as that one would
+    be picked up as well)."""
+
+    if not _declares_dependencies[os.path.basename(file_path)](file_path):
+        return False
+
+    metadata_file_path = find_package_metadata_file(
+        os.path.join(os.path.dirname(file_path), "setup.py")
+    )
+    return metadata_file_path == file_path or not include.match(
+        os.path.basename(metadata_file_path)
+    )
+
+
+def scan_package_list_files(
+    directory: str,
+    *,
+    include: Iterable[str] = default_scan_include,
+    exclude: Optional[IgnorePatterns] = None,
+    prune: Iterable[str] = default_scan_prune,
+) -> Generator[str, None, None]:
+    """Finds requirements files in the specified directory.
+
+    File names are matched against the `include` globs. Directories
+    named in `prune` and virtual environments are skipped without
+    looking inside them. Anything matching the `exclude` patterns (in
+    .gitignore syntax, relative to `directory`) is skipped as well.
+
+    Of the setup.py, setup.cfg and pyproject.toml of a package, only
+    the one its requirements are read from is yielded. A setup.cfg or
+    pyproject.toml that only configures tools is skipped.
+
+    Paths are yielded as soon as they're found, in a stable order
+    (sorted by name, files before sub-directories).
+    """
+
+    include_regex = re.compile(
+        "|".join(fnmatch.translate(pattern) for pattern in include)
+    )
+    prune = set(prune)
+
+    stack = [""]
+    while stack:
+        relative_directory = stack.pop()
+
+        try:
+            with os.scandir(os.path.join(directory, relative_directory)) as it:
+                dir_entries = sorted(it, key=lambda dir_entry: dir_entry.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+        # Don't descend into virtual environments, whatever they're called
+        if relative_directory and any(
+            dir_entry.name == "pyvenv.cfg" for dir_entry in dir_entries
+        ):
+            continue
+
+        sub_directories = []
+
+        for dir_entry in dir_entries:
+            relative_path = relative_directory + dir_entry.name
+
+            # Symlinked directories are not followed, they could
+            # point back up the tree.
+            if dir_entry.is_dir(follow_symlinks=False):
+                if dir_entry.name in prune:
+                    continue
+
+                if exclude and exclude.is_ignored(relative_path, True):
+                    continue
+
+                sub_directories.append(relative_path + "/")
+                continue
+
+            if not include_regex.match(dir_entry.name):
+                continue
+
+            if exclude and exclude.is_ignored(relative_path, False):
+                continue
+
+            file_path = os.path.join(directory, relative_path)
+            if dir_entry.name in _declares_dependencies and (
+                not _is_package_requirements_file(file_path, include_regex)
+            ):
+                continue
+
+            yield file_path
+
+        stack.extend(reversed(sub_directories))
@@ -0,0 +1,203 @@
+import os
+import signal
+
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Dict, Generator, List, Optional
+
+from .entry import RequirementsEntry
+from .error import SetupPyTimeoutError, SetupPyWorkerError
+from .parse_setup_py import (
+    SetupPyMode,
+    _parse_setup_kwargs,
+    _read_setup_kwargs,
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover, not available on Windows
+    resource = None
+
+# Extra time the parent process waits for a result on top of the timeout
+# enforced inside the worker, in case the worker is stuck somewhere the
+# alarm signal cannot interrupt it.
+timeout_grace_period = 5.0
+
+
+class _WorkerTimeout(Exception):
+    pass
+
+
+def _initialize_worker(memory_limit: Optional[int], worker_pids: Any) -> None:
+    # Lets the parent process kill workers that are stuck
+    worker_pids.put(os.getpid())
+
+    if memory_limit and resource:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _raise_worker_timeout(signum, frame):
+    raise _WorkerTimeout()
+
+
+def _evaluate_setup_py(
+    file_path: str, mode: SetupPyMode, timeout: Optional[float]
+) -> Dict[str, Any]:
+    """Runs in the worker process.
+
+    Only the requirements (and the files that were read to get them)
+    are sent back to the parent process. The rest of the arguments
+    passed to `setup()` might not be picklable.
+    """
+
+    read_files: List[str] = []
+
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_worker_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        setup_kwargs = _read_setup_kwargs(file_path, mode, read_files)
+    except _WorkerTimeout:
+        raise SetupPyTimeoutError(file_path, timeout)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    extras_require = setup_kwargs.get("extras_require") or {}
+
+    return {
+        "install_requires": list(setup_kwargs.get("install_requires") or []),
+        "extras_require": {
+            str(name): list(requirements)
+            for name, requirements in extras_require.items()
+        },
+        "read_files": read_files,
+    }
+
+
+class SetupPyWorkerPool:
+    """Evaluates setup.py files concurrently in a pool of worker processes.
+
+    Workers are started through a fork server that has setuptools
+    pre-imported, so each worker doesn't pay for importing it. Each
+    evaluation is limited to `timeout` seconds and each worker process
+    to `memory_limit` bytes of address space. A worker that exits while
+    evaluating a setup.py (e.g. because it ran out of memory) raises a
+    `SetupPyWorkerError`.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        *,
+        mode: SetupPyMode = SetupPyMode.AUTO,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+    ) -> None:
+        self.mode = mode
+        self.timeout = timeout
+        self.has_stuck_workers = False
+
+        # Most runs never start workers, they don't import these
+        import multiprocessing
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(
+                ["setuptools", "pippackagelist.parse_setup_py"]
+            )
+        else:
+            context = multiprocessing.get_context("spawn")
+
+        # Every worker sends its pid once it started
+        self.worker_pids = context.SimpleQueue()
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(memory_limit, self.worker_pids),
+        )
+
+    def submit(
+        self,
+        file_path: str,
+        extras: List[str] = [],
+        keep_line_text: bool = True,
+        read_files: Optional[List[str]] = None,
+    ) -> Generator[RequirementsEntry, None, None]:
+        """Starts evaluating the specified setup.py in the background.
+
+        The evaluation starts right away. The returned generator blocks
+        until the result is available once it is first iterated. The
+        files the setup.py read are appended to `read_files` then.
+        """
+
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            future = self.executor.submit(
+                _evaluate_setup_py,
+                os.path.realpath(file_path),
+                self.mode,
+                self.timeout,
+            )
+        except BrokenProcessPool:
+            raise SetupPyWorkerError(file_path)
+
+        return self._wait_for(
+            future, file_path, extras, keep_line_text, read_files
+        )
+
+    def _wait_for(
+        self,
+        future: Future,
+        file_path: str,
+        extras: List[str],
+        keep_line_text: bool,
+        read_files: Optional[List[str]],
+    ) -> Generator[RequirementsEntry, None, None]:
+        timeout = None
+        if self.timeout:
+            timeout = self.timeout + timeout_grace_period
+
+        from concurrent.futures.process import BrokenProcessPool
+
+        try:
+            setup_kwargs = future.result(timeout=timeout)
+        except TimeoutError:
+            self.has_stuck_workers = True
+            raise SetupPyTimeoutError(file_path, self.timeout)
+        except BrokenProcessPool:
+            raise SetupPyWorkerError(file_path)
+
+        if read_files is not None:
+            read_files.extend(setup_kwargs["read_files"])
+
+        for requirement in _parse_setup_kwargs(
+            file_path, setup_kwargs, extras, keep_line_text
+        ):
+            yield requirement
+
+    def shutdown(self) -> None:
+        # A worker that didn't respond to the alarm would make us wait
+        # forever. There's no public API to kill the worker processes,
+        # they told us their pids when they started.
+        if self.has_stuck_workers:
+            while not self.worker_pids.empty():
+                try:
+                    os.kill(self.worker_pids.get(), signal.SIGTERM)
+                except OSError:
+                    # It already exited
+                    pass
+
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self) -> "SetupPyWorkerPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
@@ -0,0 +1,177 @@
+import itertools
+import json
+import os
+import threading
+import time
+
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, TextIO, Tuple
+
+from .run_observer import FileParseTiming, RunObserver, StageTiming
+
+
+class TraceRecorder(RunObserver):
+    """Records when files are parsed and when the stages of building
+    the list run, on which thread, so that it can be written as a trace
+    (see `write`) and viewed as a timeline in Perfetto or
+    chrome://tracing.
+
+    Every file is a span, within the spans of the stages that consume
+    its entries. An arrow points from the file that included it to
+    where it was parsed, which can be another thread when files are
+    parsed on multiple threads.
+    """
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self.thread_names: Dict[int, str] = {}
+
+        # Where the files that weren't parsed yet were included, by
+        # real path. A setup.py is parsed once for every set of extras.
+        self.includes: Dict[str, Deque[Tuple[float, int]]] = defaultdict(
+            deque
+        )
+        self.flow_ids = itertools.count(1)
+
+        self.lock = threading.Lock()
+
+    def file_included(
+        self, file_path: str, parent_path: Optional[str]
+    ) -> None:
+        if not parent_path:
+            return
+
+        with self.lock:
+            self.includes[os.path.realpath(file_path)].append(
+                (time.perf_counter(), self._thread_id())
+            )
+
+    def file_parsed(self, timing: FileParseTiming) -> None:
+        with self.lock:
+            thread_id = self._thread_id()
+            self._add_span(
+                timing.file_path,
+                timing.kind,
+                timing.start,
+                timing.end,
+                thread_id,
+                entries=timing.entries,
+                lines=timing.lines,
+                busy_ms=timing.duration * 1000,
+            )
+
+            includes = self.includes.get(os.path.realpath(timing.file_path))
+            if not includes:
+                return
+
+            include_time, include_thread_id = includes.popleft()
+            flow_id = next(self.flow_ids)
+
+            self._add_event(
+                "s",
+                "include",
+                "include",
+                include_time,
+                include_thread_id,
+                id=flow_id,
+            )
+            # Binds to the span the arrow points at, not the next one
+            self._add_event(
+                "f",
+                "include",
+                "include",
+                timing.start,
+                thread_id,
+                id=flow_id,
+                bp="e",
+            )
+
+    def stage_finished(self, timing: StageTiming) -> None:
+        with self.lock:
+            self._add_span(
+                timing.stage,
+                "stage",
+                timing.start,
+                timing.end,
+                self._thread_id(),
+                exclusive_ms=timing.duration * 1000,
+            )
+
+    def write(self, out: TextIO) -> None:
+        """Writes the trace in the Chrome Trace Event format."""
+
+        pid = os.getpid()
+
+        with self.lock:
+            metadata = [
+                {
+                    "ph": "M",
+                    "name": "process_name",
+                    "pid": pid,
+                    "args": {"name": "pip-package-list"},
+                }
+            ] + [
+                {
+                    "ph": "M",
+                    "name": "thread_name",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": name},
+                }
+                for thread_id, name in self.thread_names.items()
+            ]
+
+            json.dump(
+                {
+                    "traceEvents": metadata + self.events,
+                    "displayTimeUnit": "ms",
+                },
+                out,
+            )
+
+    def _thread_id(self) -> int:
+        thread = threading.current_thread()
+        self.thread_names[thread.ident] = thread.name
+        return thread.ident
+
+    def _add_event(
+        self,
+        phase: str,
+        name: str,
+        category: str,
+        timestamp: float,
+        thread_id: int,
+        **fields: Any,
+    ) -> None:
+        self.events.append(
+            {
+                "ph": phase,
+                "name": name,
+                "cat": category,
+                # In microseconds since the recorder was created
+                "ts": (timestamp - self.origin) * 1000000,
+                "pid": os.getpid(),
+                "tid": thread_id,
+                **fields,
+            }
+        )
+
+    def _add_span(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        thread_id: int,
+        **args: Any,
+    ) -> None:
+        self._add_event(
+            "X",
+            name,
+            category,
+            start,
+            thread_id,
+            dur=(end - start) * 1000000,
+            args=args,
+        )
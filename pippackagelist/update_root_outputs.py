@@ -0,0 +1,232 @@
+import hashlib
+import io
+import json
+import os
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .file_io import read_text, write_atomically
+from .list_packages_from_files import list_packages_from_files
+from .parse_cache import _tool_version
+from .parse_memo import package_metadata_file_names
+from .parse_session import ParseSession
+from .render_requirements import RenderFormat, render_requirements
+from .requirements_graph import RequirementsGraph
+
+# Name of the file in the output directory that records which files
+# each root was built from
+index_file_name = ".pip-package-list-index.json"
+
+# Bump when the format of the index file changes
+index_format_version = 1
+
+# Options that don't affect the list itself, changing them doesn't
+# require re-building every root
+_non_output_options = {
+    "cache_dir",
+    "cache_max_size",
+    "jobs",
+    "observer",
+    "setup_py_workers",
+    "setup_py_timeout",
+    "setup_py_memory_limit",
+}
+
+
+class RootClosureIndex:
+    """Records the files the list of each root was built from.
+
+    Stored next to the outputs, so that a later run can tell which
+    roots are affected by a set of changed files without reading any
+    of them. Roots built with different options or by a different
+    version of this tool are never considered up to date.
+    """
+
+    def __init__(self, file_path: str, fingerprint: str) -> None:
+        self.file_path = file_path
+        self.fingerprint = fingerprint
+        self.closures: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def load(cls, file_path: str, fingerprint: str) -> "RootClosureIndex":
+        index = cls(file_path, fingerprint)
+
+        try:
+            with open(file_path, "r") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return index
+
+        if not isinstance(data, dict):
+            return index
+
+        if data.get("version") != index_format_version:
+            return index
+
+        if data.get("fingerprint") != fingerprint:
+            return index
+
+        index.closures = {
+            root_path: set(closure)
+            for root_path, closure in (data.get("roots") or {}).items()
+        }
+        return index
+
+    def save(self) -> None:
+        write_atomically(
+            self.file_path,
+            json.dumps(
+                {
+                    "version": index_format_version,
+                    "fingerprint": self.fingerprint,
+                    "roots": {
+                        root_path: sorted(closure)
+                        for root_path, closure in sorted(
+                            self.closures.items()
+                        )
+                    },
+                },
+                indent=2,
+            ),
+        )
+
+    def is_affected(self, root_path: str, changed_paths: Set[str]) -> bool:
+        closure = self.closures.get(os.path.realpath(root_path))
+        if closure is None:
+            return True
+
+        return not closure.isdisjoint(changed_paths)
+
+    def forget(self, root_path: str) -> None:
+        self.closures.pop(os.path.realpath(root_path), None)
+
+    def set_closure(self, root_path: str, closure: Iterable[str]) -> None:
+        self.closures[os.path.realpath(root_path)] = set(closure)
+
+
+def _fingerprint(fmt: RenderFormat, options: Dict[str, Any]) -> str:
+    output_options = {
+        name: value
+        for name, value in options.items()
+        if name not in _non_output_options
+    }
+
+    return hashlib.sha256(
+        repr(
+            (_tool_version(), fmt.value, sorted(output_options.items()))
+        ).encode()
+    ).hexdigest()
+
+
+def _closure(graph: RequirementsGraph) -> Set[str]:
+    closure = set()
+
+    for node in graph.nodes.values():
+        closure.add(node.real_path)
+
+        # Which of these is read can change when any of them changes
+        if os.path.basename(node.real_path) in package_metadata_file_names:
+            directory = os.path.dirname(node.real_path)
+            for file_name in package_metadata_file_names:
+                closure.add(os.path.join(directory, file_name))
+
+        # Files read by a setup.py or referred to by setup.cfg (file:)
+        # and pyproject.toml
+        closure.update(node.read_files)
+
+    return closure
+
+
+def root_output_path(output_dir: str, root_path: str) -> str:
+    """Gets the path the list of the specified root is written to.
+
+    The output directory mirrors the directory structure of the roots,
+    relative to the current working directory.
+    """
+
+    relative_path = os.path.relpath(os.path.abspath(root_path))
+    if relative_path.startswith(os.pardir):
+        relative_path = os.path.abspath(root_path).lstrip(os.sep)
+
+    return os.path.join(output_dir, relative_path)
+
+
+def update_root_outputs(
+    root_paths: Iterable[str],
+    output_dir: str,
+    *,
+    changed_files: Optional[Iterable[str]] = None,
+    fmt: RenderFormat = RenderFormat.TEXT,
+    **kwargs,
+) -> List[str]:
+    """Writes the list of each of the specified roots to its own file in
+    `output_dir`.
+
+    When `changed_files` is specified, only the roots that include one
+    of those files (through -r, -c, -e and path entries, as recorded by
+    the previous run) are listed again. Roots that weren't listed
+    before, or with other options, are always listed. Output files are
+    only written when their contents change.
+
+    Files that are shared by multiple roots are only parsed once. Any
+    other keyword arguments are passed on to `list_packages_from_files`.
+
+    Returns the paths of the output files that were written.
+    """
+
+    index = RootClosureIndex.load(
+        os.path.join(output_dir, index_file_name),
+        _fingerprint(fmt, kwargs),
+    )
+
+    changed_paths = None
+    if changed_files is not None:
+        changed_paths = {
+            os.path.realpath(file_path) for file_path in changed_files
+        }
+
+    session, kwargs = ParseSession.from_options(kwargs)
+    written_paths = []
+
+    try:
+        for root_path in root_paths:
+            output_path = root_output_path(output_dir, root_path)
+
+            if (
+                changed_paths is not None
+                and os.path.exists(output_path)
+                and not index.is_affected(root_path, changed_paths)
+            ):
+                continue
+
+            # Until it was listed successfully, the root is affected
+            # by any change.
+            index.forget(root_path)
+
+            graph = RequirementsGraph()
+            buffer = io.StringIO()
+
+            render_requirements(
+                list_packages_from_files(
+                    [root_path], session=session, graph=graph, **kwargs
+                ),
+                fmt=fmt,
+                out=buffer,
+            )
+
+            index.set_closure(root_path, _closure(graph))
+
+            if read_text(output_path) != buffer.getvalue():
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                write_atomically(output_path, buffer.getvalue())
+                written_paths.append(output_path)
+    finally:
+        session.close()
+
+        # Keep what was learned about the roots that were listed
+        # before one of them failed.
+        os.makedirs(output_dir, exist_ok=True)
+        index.save()
+
+    return written_paths
+
@@ -0,0 +1,72 @@
+import io
+import sys
+import time
+
+from typing import Generator, List
+
+from .file_io import write_atomically
+from .list_packages_from_files import list_packages_from_files
+from .parse_session import ParseSession
+from .render_requirements import RenderFormat, render_requirements
+
+default_poll_interval = 0.5
+
+
+def watch_package_list_files(
+    file_paths: List[str],
+    output_path: str,
+    *,
+    fmt: RenderFormat = RenderFormat.TEXT,
+    poll_interval: float = default_poll_interval,
+    **kwargs,
+) -> Generator[bool, None, None]:
+    """Lists the packages in the specified files and writes them to
+    `output_path` every time one of the files changes.
+
+    The files that were read (including the ones that were included by
+    -r, -c, -e and path entries) are polled every `poll_interval`
+    seconds. Only the files that changed are parsed again, everything
+    else comes from memory. The output file is replaced atomically and
+    only when the list actually changed.
+
+    Yields after every update, True if the output file was written.
+    Errors are reported on stderr and the files are watched for the
+    next change. Any other keyword arguments are passed on to
+    `list_packages_from_files`.
+    """
+
+    session, kwargs = ParseSession.from_options(kwargs)
+    output = None
+
+    with session:
+        while True:
+            buffer = io.StringIO()
+
+            try:
+                render_requirements(
+                    # Files can be truncated while they're read, which
+                    # crashes a process that has them mapped
+                    list_packages_from_files(
+                        file_paths, session=session, memory_map=False, **kwargs
+                    ),
+                    fmt=fmt,
+                    out=buffer,
+                )
+            except Exception as err:
+                print(f"error: {err}", file=sys.stderr)
+                yield False
+            else:
+                if buffer.getvalue() != output:
+                    output = buffer.getvalue()
+                    write_atomically(output_path, output)
+                    yield True
+                else:
+                    yield False
+
+            # Files that are specified, but don't exist yet are watched
+            # too
+            for file_path in file_paths:
+                session.memo.watch(file_path)
+
+            while not session.memo.poll():
+                time.sleep(poll_interval)
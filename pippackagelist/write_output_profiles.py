@@ -0,0 +1,200 @@
+import io
+import json
+import os
+
+from dataclasses import dataclass, fields
+from typing import Any, Iterable, List
+
+from .constraint_index import ConstraintIndex
+from .error import OutputProfilesError
+from .file_io import read_text, write_atomically
+from .list_packages_from_files import (
+    DedupeMode,
+    _filter_requirements,
+    _parse_requirements_txt,
+    list_packages_from_files,
+)
+from .parse_session import ParseSession
+from .render_requirements import RenderFormat, render_requirements
+
+
+@dataclass
+class OutputProfile:
+    """A variant of the list and the file it is written to."""
+
+    output_path: str
+    inline_constraints: bool = False
+    remove_editable: bool = False
+    remove_recursive: bool = False
+    remove_constraints: bool = False
+    remove_vcs: bool = False
+    remove_path: bool = False
+    remove_wheel: bool = False
+    remove_unversioned: bool = False
+    remove_index_urls: bool = False
+    dedupe: bool = False
+    dedupe_mode: DedupeMode = DedupeMode.EXACT
+
+
+# Options of `list_packages_from_files` that every profile sets itself
+output_option_names = [
+    field.name
+    for field in fields(OutputProfile)
+    if field.name != "output_path"
+]
+
+
+def read_output_profiles(
+    file_path: str, **defaults: Any
+) -> List[OutputProfile]:
+    """Reads a JSON object that maps output files to the options of the
+    list written to them, for example:
+
+        {
+            "lists/all.txt": {},
+            "lists/no-vcs.txt": {"remove-vcs": true, "remove-editable": true},
+            "lists/pinned.txt": {"remove-unversioned": true}
+        }
+
+    Options are named like the command line options. Options that a
+    profile doesn't set are taken from `defaults`. Relative paths are
+    relative to the directory the file is in.
+    """
+
+    try:
+        with open(file_path, "r") as fp:
+            data = json.load(fp)
+    except ValueError as err:
+        raise OutputProfilesError(file_path, str(err))
+
+    if not isinstance(data, dict):
+        raise OutputProfilesError(
+            file_path, "expected an object of output files to options"
+        )
+
+    directory = os.path.dirname(file_path)
+    profiles = []
+
+    for output_path, options in data.items():
+        if not isinstance(options, dict):
+            raise OutputProfilesError(
+                file_path,
+                f"expected an object of options for '{output_path}'",
+            )
+
+        profile_options = dict(defaults)
+
+        for name, value in options.items():
+            option_name = name.lstrip("-").replace("-", "_")
+            if option_name not in output_option_names:
+                raise OutputProfilesError(
+                    file_path,
+                    f"unknown option '{name}' for '{output_path}'",
+                )
+
+            if option_name == "dedupe_mode":
+                try:
+                    value = DedupeMode(value)
+                except ValueError:
+                    raise OutputProfilesError(
+                        file_path,
+                        f"invalid value for '{name}' for '{output_path}'",
+                    )
+
+                # Like --dedupe-mode, implies --dedupe
+                if "dedupe" not in options:
+                    profile_options["dedupe"] = True
+            elif not isinstance(value, bool):
+                raise OutputProfilesError(
+                    file_path,
+                    f"expected true or false for '{name}' for '{output_path}'",
+                )
+
+            profile_options[option_name] = value
+
+        profiles.append(
+            OutputProfile(
+                output_path=os.path.join(directory, output_path),
+                **profile_options,
+            )
+        )
+
+    return profiles
+
+
+def write_output_profiles(
+    file_paths: Iterable[str],
+    profiles: Iterable[OutputProfile],
+    *,
+    fmt: RenderFormat = RenderFormat.TEXT,
+    **kwargs,
+) -> List[str]:
+    """Lists the packages in the specified files once and writes a
+    variant of the list for every profile.
+
+    The files are read and traversed a single time, every profile only
+    filters the entries that were read (see `OutputProfile` for the
+    options it can set). Output files are only written when their
+    contents change. Any other keyword arguments are passed on to
+    `list_packages_from_files`.
+
+    Returns the paths of the output files that were written.
+    """
+
+    for name in output_option_names:
+        if name in kwargs:
+            raise TypeError(f"'{name}' has to be set on the profiles")
+
+    session, kwargs = ParseSession.from_options(kwargs)
+    keep_line_text = kwargs.get("keep_line_text", True)
+    written_paths = []
+
+    with session:
+        # Every profile needs all of them, usually several times
+        requirements = list(
+            list_packages_from_files(file_paths, session=session, **kwargs)
+        )
+
+        for profile in profiles:
+            constraint_index = None
+            if profile.inline_constraints:
+                constraint_index = ConstraintIndex(
+                    lambda file_path: _parse_requirements_txt(
+                        file_path,
+                        session.memo,
+                        keep_line_text,
+                        kwargs.get("observer"),
+                    )
+                )
+
+            buffer = io.StringIO()
+
+            render_requirements(
+                _filter_requirements(
+                    requirements,
+                    constraint_index=constraint_index,
+                    remove_editable=profile.remove_editable,
+                    remove_recursive=profile.remove_recursive,
+                    remove_constraints=profile.remove_constraints,
+                    remove_vcs=profile.remove_vcs,
+                    remove_path=profile.remove_path,
+                    remove_wheel=profile.remove_wheel,
+                    remove_unversioned=profile.remove_unversioned,
+                    remove_index_urls=profile.remove_index_urls,
+                    dedupe=profile.dedupe,
+                    dedupe_mode=profile.dedupe_mode,
+                    observer=kwargs.get("observer"),
+                ),
+                fmt=fmt,
+                out=buffer,
+            )
+
+            if read_text(profile.output_path) != buffer.getvalue():
+                directory = os.path.dirname(profile.output_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+
+                write_atomically(profile.output_path, buffer.getvalue())
+                written_paths.append(profile.output_path)
+
+    return written_paths
@@ -0,0 +1,102 @@
+import io
+import json
+import os
+
+from typing import Dict, Iterable, List, Mapping
+
+from .error import RootsManifestError
+from .file_io import read_text, write_atomically
+from .list_packages_from_files import list_packages_from_files
+from .parse_session import ParseSession
+from .render_requirements import RenderFormat, render_requirements
+
+
+def read_roots_manifest(file_path: str) -> Dict[str, List[str]]:
+    """Reads a manifest that maps output files to the files to list
+    in them.
+
+    The manifest is a JSON object, for example:
+
+        {
+            "api.txt": ["services/api/requirements.txt"],
+            "worker.txt": "services/worker/setup.py"
+        }
+
+    Relative paths are relative to the directory the manifest is in.
+    """
+
+    try:
+        with open(file_path, "r") as fp:
+            data = json.load(fp)
+    except ValueError as err:
+        raise RootsManifestError(file_path, str(err))
+
+    if not isinstance(data, dict):
+        raise RootsManifestError(
+            file_path, "expected an object of output files to input files"
+        )
+
+    directory = os.path.dirname(file_path)
+    roots = {}
+
+    for output_path, input_paths in data.items():
+        if isinstance(input_paths, str):
+            input_paths = [input_paths]
+
+        if not isinstance(input_paths, list) or not all(
+            isinstance(input_path, str) for input_path in input_paths
+        ):
+            raise RootsManifestError(
+                file_path,
+                f"expected a file or a list of files for '{output_path}'",
+            )
+
+        roots[os.path.join(directory, output_path)] = [
+            os.path.join(directory, input_path) for input_path in input_paths
+        ]
+
+    return roots
+
+
+def write_root_lists(
+    roots: Mapping[str, Iterable[str]],
+    *,
+    fmt: RenderFormat = RenderFormat.TEXT,
+    **kwargs,
+) -> List[str]:
+    """Lists the packages in each set of input files and writes them to
+    the output file they are mapped to.
+
+    All lists are built in a single process. Files that are included by
+    more than one of them are only parsed once and setup.py workers are
+    only started once. Output files are only written when their contents
+    change. Any other keyword arguments are passed on to
+    `list_packages_from_files`.
+
+    Returns the paths of the output files that were written.
+    """
+
+    session, kwargs = ParseSession.from_options(kwargs)
+    written_paths = []
+
+    with session:
+        for output_path, file_paths in roots.items():
+            buffer = io.StringIO()
+
+            render_requirements(
+                list_packages_from_files(
+                    list(file_paths), session=session, **kwargs
+                ),
+                fmt=fmt,
+                out=buffer,
+            )
+
+            if read_text(output_path) != buffer.getvalue():
+                directory = os.path.dirname(output_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+
+                write_atomically(output_path, buffer.getvalue())
+                written_paths.append(output_path)
+
+    return written_paths
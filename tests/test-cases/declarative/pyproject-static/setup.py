@@ -0,0 +1 @@
+raise RuntimeError("should not be executed")
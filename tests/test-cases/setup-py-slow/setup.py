@@ -0,0 +1,7 @@
+import time
+
+from setuptools import setup
+
+time.sleep(30)
+
+setup(name="slowpackage", install_requires=["django==1.0"])
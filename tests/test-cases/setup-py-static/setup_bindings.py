@@ -0,0 +1,16 @@
+from setuptools import find_packages, setup
+
+base_requirements = ["django==1.0", "cookie>=1.2"]
+test_requirements = ["pytest==2.0"]
+base_requirements.append("redis==3.0")
+
+with open("README.md") as fp:
+    README = fp.read()
+
+setup(
+    name="mypackage",
+    packages=find_packages(),
+    long_description=README,
+    install_requires=base_requirements + ["celery==4.0"],
+    extras_require={"test": test_requirements, "all": test_requirements + ["sphinx"]},
+)
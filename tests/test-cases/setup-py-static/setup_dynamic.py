@@ -0,0 +1,9 @@
+import sys
+
+from setuptools import setup
+
+requirements = ["django==1.0"]
+if sys.version_info < (3, 0):
+    requirements.append("futures==3.0")
+
+setup(name="mypackage", install_requires=requirements)
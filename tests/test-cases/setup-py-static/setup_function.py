@@ -0,0 +1,8 @@
+from setuptools import setup
+
+
+def get_requirements():
+    return ["django==1.0"]
+
+
+setup(name="mypackage", install_requires=get_requirements())
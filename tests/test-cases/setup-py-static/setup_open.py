@@ -0,0 +1,19 @@
+import os
+
+import setuptools
+
+here = os.path.abspath(os.path.dirname(__file__))
+
+with open(os.path.join(here, "requirements.txt")) as fp:
+    requirements = [
+        line.strip()
+        for line in fp.readlines()
+        if line.strip() and not line.startswith("#")
+    ]
+
+if __name__ == "__main__":
+    setuptools.setup(
+        name="mypackage",
+        install_requires=requirements,
+        extras_require={"docs": open("requirements-docs.txt").read().splitlines()},
+    )
@@ -0,0 +1,141 @@
+import os
+
+from pippackagelist.__main__ import main
+from pippackagelist.build_requirements_graph import build_requirements_graph
+from pippackagelist.requirements_graph import RequirementsGraphEdgeKind
+
+test_cases_path = os.path.join(os.path.dirname(__file__), "./test-cases")
+
+diamond_path = os.path.join(test_cases_path, "includes/diamond.txt")
+service_a_path = os.path.join(test_cases_path, "includes/service-a.txt")
+service_b_path = os.path.join(test_cases_path, "includes/service-b.txt")
+base_path = os.path.join(test_cases_path, "includes/common/base.txt")
+constraints_service_path = os.path.join(
+    test_cases_path, "constraints/service-1.txt"
+)
+constraints_path = os.path.join(
+    test_cases_path, "constraints/constraints-a.txt"
+)
+
+
+def _key(file_path, extras=()):
+    return (os.path.realpath(file_path), tuple(extras))
+
+
+def test_build_requirements_graph():
+    graph = build_requirements_graph([diamond_path, service_b_path])
+
+    assert graph.roots == [_key(diamond_path), _key(service_b_path)]
+    assert set(graph.nodes.keys()) == {
+        _key(diamond_path),
+        _key(service_a_path),
+        _key(service_b_path),
+        _key(base_path),
+    }
+
+    assert [
+        (edge.source, edge.target, edge.kind) for edge in graph.edges
+    ] == [
+        (
+            _key(diamond_path),
+            _key(service_a_path),
+            RequirementsGraphEdgeKind.RECURSIVE,
+        ),
+        (
+            _key(diamond_path),
+            _key(service_b_path),
+            RequirementsGraphEdgeKind.RECURSIVE,
+        ),
+        (
+            _key(service_b_path),
+            _key(base_path),
+            RequirementsGraphEdgeKind.RECURSIVE,
+        ),
+        (
+            _key(service_a_path),
+            _key(base_path),
+            RequirementsGraphEdgeKind.RECURSIVE,
+        ),
+    ]
+
+    assert [edge.source for edge in graph.incoming[_key(base_path)]] == [
+        _key(service_b_path),
+        _key(service_a_path),
+    ]
+
+    assert [str(entry) for entry in graph.nodes[_key(base_path)].entries] == [
+        "requests==2.0"
+    ]
+
+
+def test_requirements_graph_queries():
+    graph = build_requirements_graph(
+        [service_a_path, service_b_path, constraints_service_path]
+    )
+
+    assert graph.roots_requiring("Django") == [
+        service_a_path,
+        constraints_service_path,
+    ]
+    assert graph.roots_requiring("requests") == [
+        service_a_path,
+        service_b_path,
+    ]
+    assert graph.roots_requiring("celery") == []
+
+    assert graph.affected_roots(base_path) == [service_a_path, service_b_path]
+    assert graph.affected_roots(constraints_path) == [
+        constraints_service_path
+    ]
+
+
+def test_requirements_graph_why():
+    graph = build_requirements_graph([diamond_path])
+
+    explanations = graph.why("requests")
+    assert len(explanations) == 1
+
+    chain, entry = explanations[0]
+    assert [str(edge.entry) for edge in chain] == [
+        "-r " + os.path.relpath(service_a_path),
+        "-r " + os.path.relpath(base_path),
+    ]
+    assert str(entry) == "requests==2.0"
+    assert entry.source.path == os.path.realpath(base_path)
+
+
+def test_why_cli(capsys):
+    assert main(["why", "requests", diamond_path]) == 0
+
+    assert capsys.readouterr().out.splitlines() == [
+        f"{os.path.relpath(diamond_path)}:1: -r "
+        + os.path.relpath(service_a_path),
+        f"{os.path.relpath(service_a_path)}:1: -r "
+        + os.path.relpath(base_path),
+        f"{os.path.relpath(base_path)}:1: requests==2.0",
+    ]
+
+
+def test_why_cli_no_recurse_recursive(capsys):
+    argv = ["why", "requests", "--no-recurse-recursive", diamond_path]
+
+    assert main(argv) == 1
+    assert capsys.readouterr().out == ""
+
+
+def test_requirements_graph_read_files(tmp_path):
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package/setup.cfg").write_text(
+        "[options]\ninstall_requires = file: requirements.txt\n"
+    )
+    (tmp_path / "package/requirements.txt").write_text("")
+    (tmp_path / "requirements.txt").write_text("-e ./package\n")
+
+    root_path = str(tmp_path / "requirements.txt")
+    read_path = os.path.realpath(tmp_path / "package/requirements.txt")
+
+    graph = build_requirements_graph([root_path])
+
+    setup_cfg_key = _key(tmp_path / "package/setup.cfg")
+    assert graph.nodes[setup_cfg_key].read_files == [read_path]
+    assert graph.affected_roots(read_path) == [root_path]
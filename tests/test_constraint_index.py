@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from pippackagelist.constraint_index import (
+    ConstraintIndex,
+    prescan_constraint_files,
+)
+from pippackagelist.error import ConstraintWithoutNameError
+from pippackagelist.parse_requirements_txt import parse_requirements_txt
+from pippackagelist.parse_setup_py import SetupPyMode
+
+test_cases_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/constraints"
+)
+
+
+def test_constraint_index_parses_once():
+    parsed_file_paths = []
+
+    def _parse(file_path):
+        parsed_file_paths.append(file_path)
+        return parse_requirements_txt(file_path)
+
+    path = os.path.join(test_cases_path, "constraints-a.txt")
+
+    constraint_index = ConstraintIndex(_parse)
+    assert constraint_index.add(path)
+    assert not constraint_index.add(path)
+    assert not constraint_index.add(os.path.relpath(path))
+
+    assert parsed_file_paths == [os.path.realpath(path)]
+    assert path in constraint_index
+
+
+def test_constraint_index_normalizes_names():
+    constraint_index = ConstraintIndex()
+    constraint_index.add(os.path.join(test_cases_path, "constraints-a.txt"))
+
+    assert [str(c) for c in constraint_index.get("django")] == ["Django==1.0"]
+    assert [str(c) for c in constraint_index.get("Redis")] == [
+        'redis==3.0; python_version >= "3"',
+        'redis==2.0; python_version < "3"',
+    ]
+    assert constraint_index.get("celery") is None
+
+
+def test_constraint_index_first_file_wins():
+    constraint_index = ConstraintIndex()
+    constraint_index.add(os.path.join(test_cases_path, "constraints-a.txt"))
+    constraint_index.add(os.path.join(test_cases_path, "constraints-b.txt"))
+
+    assert [str(c) for c in constraint_index.get("django")] == ["Django==1.0"]
+    assert [str(c) for c in constraint_index.get("celery")] == ["celery==4.0"]
+
+
+def test_constraint_index_without_name():
+    constraint_index = ConstraintIndex()
+
+    with pytest.raises(ConstraintWithoutNameError):
+        constraint_index.add(os.path.join(test_cases_path, "invalid.txt"))
+
+
+def test_prescan_constraint_files():
+    file_paths = [
+        os.path.join(test_cases_path, "nested.txt"),
+        os.path.join(test_cases_path, "service-2.txt"),
+    ]
+
+    assert prescan_constraint_files(file_paths) == [
+        os.path.realpath(os.path.join(test_cases_path, "constraints-b.txt")),
+        os.path.realpath(os.path.join(test_cases_path, "constraints-a.txt")),
+    ]
+
+    # Roots are visited before the files they include
+    assert prescan_constraint_files(file_paths, recurse_recursive=True) == [
+        os.path.realpath(os.path.join(test_cases_path, "constraints-b.txt")),
+        os.path.realpath(os.path.join(test_cases_path, "constraints-a.txt")),
+    ]
+
+
+def test_prescan_constraint_files_dynamic_setup_py():
+    path = os.path.join(test_cases_path, "dynamic/setup.py")
+
+    assert prescan_constraint_files([path]) is None
+
+
+def test_prescan_constraint_files_exec_setup_py():
+    file_paths = [os.path.join(test_cases_path, "nested.txt")]
+
+    assert (
+        prescan_constraint_files(file_paths, setup_py_mode=SetupPyMode.EXEC)
+        is None
+    )
@@ -0,0 +1,213 @@
+import os
+
+import pytest
+
+from pippackagelist.error import SetupPyStaticAnalysisError
+from pippackagelist.extract_setup_py_kwargs import extract_setup_py_kwargs
+from pippackagelist.parse_setup_py import SetupPyMode, parse_setup_py
+
+test_cases_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/setup-py-static"
+)
+
+
+def test_extract_setup_py_kwargs_literal():
+    path = os.path.join(os.path.dirname(__file__), "./test-cases/setup.py")
+
+    assert extract_setup_py_kwargs(path) == {
+        "install_requires": [
+            "django==1.0",
+            "cookie>=1.2",
+            "-r ../test.txt",
+            "-e ..",
+        ]
+    }
+
+
+def test_extract_setup_py_kwargs_bindings():
+    path = os.path.join(test_cases_path, "setup_bindings.py")
+
+    assert extract_setup_py_kwargs(path) == {
+        "install_requires": [
+            "django==1.0",
+            "cookie>=1.2",
+            "redis==3.0",
+            "celery==4.0",
+        ],
+        "extras_require": {
+            "test": ["pytest==2.0"],
+            "all": ["pytest==2.0", "sphinx"],
+        },
+    }
+
+
+def test_extract_setup_py_kwargs_open():
+    path = os.path.join(test_cases_path, "setup_open.py")
+
+    assert extract_setup_py_kwargs(path) == {
+        "install_requires": ["django==1.0", "redis==3.0"],
+        "extras_require": {"docs": ["sphinx==1.0"]},
+    }
+
+
+@pytest.mark.parametrize(
+    "file_name", ["setup_dynamic.py", "setup_function.py"]
+)
+def test_extract_setup_py_kwargs_dynamic(file_name):
+    path = os.path.join(test_cases_path, file_name)
+
+    with pytest.raises(SetupPyStaticAnalysisError):
+        extract_setup_py_kwargs(path)
+
+
+def test_parse_setup_py_static_mode_fails_on_dynamic():
+    path = os.path.join(test_cases_path, "setup_dynamic.py")
+
+    with pytest.raises(SetupPyStaticAnalysisError):
+        list(parse_setup_py(path, mode=SetupPyMode.STATIC))
+
+
+@pytest.mark.parametrize("mode", [SetupPyMode.AUTO, SetupPyMode.EXEC])
+def test_parse_setup_py_falls_back_to_exec(mode):
+    path = os.path.join(test_cases_path, "setup_dynamic.py")
+
+    requirements = [str(req) for req in parse_setup_py(path, mode=mode)]
+    assert requirements == ["django==1.0"]
+
+
+@pytest.mark.parametrize("mode", list(SetupPyMode))
+def test_parse_setup_py_modes_agree(mode):
+    path = os.path.join(test_cases_path, "setup_bindings.py")
+
+    requirements = [
+        str(req) for req in parse_setup_py(path, ["test"], mode=mode)
+    ]
+    assert requirements == [
+        "django==1.0",
+        "cookie>=1.2",
+        "redis==3.0",
+        "celery==4.0",
+        "pytest==2.0",
+    ]
+
+
+@pytest.mark.parametrize("mode", list(SetupPyMode))
+def test_parse_setup_py_bool_operators(tmp_path, mode):
+    setup_py_path = tmp_path / "setup.py"
+    setup_py_path.write_text(
+        "from setuptools import setup\n\n"
+        "REQS = ['django', 'requests']\n"
+        "setup(install_requires=REQS or [], extras_require=None and {})\n"
+    )
+
+    requirements = [
+        str(requirement)
+        for requirement in parse_setup_py(str(setup_py_path), mode=mode)
+    ]
+    assert requirements == ["django", "requests"]
+
+
+@pytest.mark.parametrize(
+    "install_requires", ["'django'", "[1, 2]", "True", "{'a': 'b'}"]
+)
+def test_extract_setup_py_kwargs_not_a_list(tmp_path, install_requires):
+    setup_py_path = tmp_path / "setup.py"
+    setup_py_path.write_text(
+        "from setuptools import setup\n\n"
+        f"setup(install_requires={install_requires})\n"
+    )
+
+    with pytest.raises(SetupPyStaticAnalysisError):
+        extract_setup_py_kwargs(str(setup_py_path))
+
+
+@pytest.mark.parametrize(
+    "call,resolvable",
+    [
+        ("open(file='requirements.txt')", True),
+        ("open('requirements.txt', encoding='utf-8')", True),
+        ("open('requirements.txt', 'r', -1, 'utf-8')", True),
+        ("open()", False),
+        ("open(encoding='utf-8')", False),
+        ("open('requirements.txt', 'rb')", False),
+        ("open('requirements.txt', mode='rb')", False),
+        ("open('requirements.txt', newline='')", False),
+        ("open('requirements.txt', encoding='nope')", False),
+    ],
+)
+def test_extract_setup_py_kwargs_open_arguments(tmp_path, call, resolvable):
+    (tmp_path / "requirements.txt").write_text("django==1.0\n")
+
+    setup_py_path = tmp_path / "setup.py"
+    setup_py_path.write_text(
+        "from setuptools import setup\n\n"
+        f"setup(install_requires={call}.read().splitlines())\n"
+    )
+
+    if not resolvable:
+        with pytest.raises(SetupPyStaticAnalysisError):
+            extract_setup_py_kwargs(str(setup_py_path))
+        return
+
+    assert extract_setup_py_kwargs(str(setup_py_path)) == {
+        "install_requires": ["django==1.0"]
+    }
+
+
+@pytest.mark.parametrize(
+    "call,resolvable",
+    [
+        ("open('requirements.txt', encoding='utf-16')", True),
+        ("open('requirements.txt')", False),
+    ],
+)
+def test_extract_setup_py_kwargs_open_encoding(tmp_path, call, resolvable):
+    (tmp_path / "requirements.txt").write_text(
+        "django==1.0\n", encoding="utf-16"
+    )
+
+    setup_py_path = tmp_path / "setup.py"
+    setup_py_path.write_text(
+        "from setuptools import setup\n\n"
+        f"setup(install_requires={call}.read().splitlines())\n"
+    )
+
+    if not resolvable:
+        with pytest.raises(SetupPyStaticAnalysisError):
+            extract_setup_py_kwargs(str(setup_py_path))
+        return
+
+    assert extract_setup_py_kwargs(str(setup_py_path)) == {
+        "install_requires": ["django==1.0"]
+    }
+
+
+@pytest.mark.parametrize(
+    "install_requires",
+    [
+        "sorted(['django', 1])",
+        "{'test': ['pytest']}.get([])",
+        "['django'].index('redis')",
+        "'django'.split(1)",
+        "'django'.partition('')",
+    ],
+)
+def test_extract_setup_py_kwargs_evaluation_errors(tmp_path, install_requires):
+    setup_py_path = tmp_path / "setup.py"
+    setup_py_path.write_text(
+        "from setuptools import setup\n\n"
+        f"REQUIREMENTS = {install_requires}\n"
+        "setup(install_requires=REQUIREMENTS)\n"
+    )
+
+    with pytest.raises(SetupPyStaticAnalysisError):
+        extract_setup_py_kwargs(str(setup_py_path))
+
+    # Used directly as well as through a name
+    setup_py_path.write_text(
+        "from setuptools import setup\n\n"
+        f"setup(install_requires={install_requires})\n"
+    )
+
+    with pytest.raises(SetupPyStaticAnalysisError):
+        extract_setup_py_kwargs(str(setup_py_path))
@@ -0,0 +1,31 @@
+import os
+import stat
+
+from pippackagelist.file_io import read_text, write_atomically
+
+
+def test_write_atomically_permissions(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        write_atomically(str(tmp_path / "new.txt"), "django\n")
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(os.stat(tmp_path / "new.txt").st_mode) == 0o644
+
+    # Existing files keep their permissions
+    existing_path = tmp_path / "existing.txt"
+    existing_path.write_text("")
+    os.chmod(existing_path, 0o640)
+
+    write_atomically(str(existing_path), "django\n")
+
+    assert stat.S_IMODE(os.stat(existing_path).st_mode) == 0o640
+    assert existing_path.read_text() == "django\n"
+
+
+def test_read_text(tmp_path):
+    (tmp_path / "requirements.txt").write_text("django\n")
+
+    assert read_text(str(tmp_path / "requirements.txt")) == "django\n"
+    assert read_text(str(tmp_path / "missing.txt")) is None
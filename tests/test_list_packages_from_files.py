@@ -1,10 +1,31 @@
+import importlib
 import os
 
-from pippackagelist.list_packages_from_files import list_packages_from_files
+import pytest
+
+from pippackagelist.constraint_index import ConstraintIndex
+from pippackagelist.error import RequirementsIncludeCycleError
+from pippackagelist.list_packages_from_files import (
+    DedupeMode,
+    _dedupe_requirements,
+    _inline_constraints,
+    list_packages_from_files,
+)
+from pippackagelist.parse_requirements_txt import parse_requirements_txt
+from pippackagelist.parse_setup_py import SetupPyMode
 
 test_case_1_path = os.path.join(
     os.path.dirname(__file__), "./test-cases/list-1"
 )
+test_case_includes_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/includes"
+)
+test_case_constraints_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/constraints"
+)
+test_case_dedupe_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/dedupe"
+)
 
 
 def test_list_packages_from_files_from_requirements():
@@ -88,3 +109,375 @@ def test_list_packages_from_files_from_requirements_inline_constraints():
         "-i https://mypackages.com/repo",
         "mypackage==4.2.1",
     ]
+
+
+def test_list_packages_from_files_diamond_includes_once():
+    path = os.path.join(test_case_includes_path, "diamond.txt")
+
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            [path], recurse_recursive=True
+        )
+    ]
+
+    assert raw_requirements == ["django==1.0", "redis==2.0", "requests==2.0"]
+
+
+def test_list_packages_from_files_diamond_includes_reemit():
+    path = os.path.join(test_case_includes_path, "diamond.txt")
+
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            [path], recurse_recursive=True, reemit_includes=True
+        )
+    ]
+
+    assert raw_requirements == [
+        "django==1.0",
+        "redis==2.0",
+        "requests==2.0",
+        "requests==2.0",
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_list_packages_from_files_reemit_pending_root(tmp_path, jobs):
+    (tmp_path / "a.txt").write_text("-r base.txt\nflask\n")
+    (tmp_path / "b.txt").write_text("-r a2.txt\n")
+    (tmp_path / "base.txt").write_text("django\n")
+    (tmp_path / "a2.txt").write_text("x\n")
+
+    # base.txt is still waiting to be consumed as an include of a.txt
+    # when it's included again as a root
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            [
+                str(tmp_path / "a.txt"),
+                str(tmp_path / "b.txt"),
+                str(tmp_path / "base.txt"),
+            ],
+            recurse_recursive=True,
+            reemit_includes=True,
+            jobs=jobs,
+        )
+    ]
+
+    assert raw_requirements == ["flask", "django", "django", "x"]
+
+
+def test_list_packages_from_files_duplicate_root_files():
+    path = os.path.join(test_case_includes_path, "common/base.txt")
+
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files([path, path])
+    ]
+
+    assert raw_requirements == ["requests==2.0"]
+
+
+@pytest.mark.parametrize("reemit_includes", [False, True])
+def test_list_packages_from_files_include_cycle(reemit_includes):
+    path = os.path.join(test_case_includes_path, "cycle-1.txt")
+
+    with pytest.raises(RequirementsIncludeCycleError) as exc_info:
+        list(
+            list_packages_from_files(
+                [path],
+                recurse_recursive=True,
+                reemit_includes=reemit_includes,
+            )
+        )
+
+    assert [os.path.basename(path) for path in exc_info.value.cycle] == [
+        "cycle-1.txt",
+        "cycle-2.txt",
+        "cycle-3.txt",
+        "cycle-1.txt",
+    ]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(recurse_recursive=True, recurse_editable=True),
+        dict(recurse_recursive=True, reemit_includes=True),
+        dict(recurse_recursive=True, inline_constraints=True, dedupe=True),
+    ],
+)
+@pytest.mark.parametrize("setup_py_mode", list(SetupPyMode))
+def test_list_packages_from_files_jobs_preserves_order(options, setup_py_mode):
+    paths = [
+        os.path.join(test_case_1_path, "requirements.txt"),
+        os.path.join(test_case_includes_path, "diamond.txt"),
+    ]
+
+    expected = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            paths, setup_py_mode=setup_py_mode, **options
+        )
+    ]
+
+    actual = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            paths, setup_py_mode=setup_py_mode, jobs=4, **options
+        )
+    ]
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize("setup_py_mode", list(SetupPyMode))
+def test_list_packages_from_files_jobs_relative_paths(
+    tmp_path, monkeypatch, setup_py_mode
+):
+    monkeypatch.chdir(tmp_path)
+
+    # Already imported in a long running process, importing it takes
+    # longer than parsing all files ahead of time.
+    import setuptools  # noqa: F401
+
+    # Executing the setup.py changes the working directory while the
+    # other files are parsed ahead of time.
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package/setup.py").write_text(
+        "import time\n"
+        "from setuptools import setup\n\n"
+        "time.sleep(0.1)\n"
+        "setup(install_requires=['django==1.0'])\n"
+    )
+
+    paths = ["r1.txt", str(tmp_path / "package/setup.py")]
+    for index in range(1, 13):
+        (tmp_path / f"r{index}.txt").write_text(f"package{index}\n")
+        if index > 1:
+            paths.append(f"r{index}.txt")
+
+    requirements = list(
+        list_packages_from_files(
+            paths, setup_py_mode=setup_py_mode, jobs=4
+        )
+    )
+
+    assert [str(requirement) for requirement in requirements] == [
+        "package1",
+        "django==1.0",
+    ] + [f"package{index}" for index in range(2, 13)]
+
+
+@pytest.mark.parametrize(
+    "dedupe_mode,expected_requirements",
+    [
+        (
+            DedupeMode.EXACT,
+            [
+                "Django==1.0",
+                "django==1.0",
+                "zope.interface>=5.0",
+                "Zope-Interface>=5.0",
+                "celery[Redis,msgpack]==4.0",
+                "celery[msgpack,redis]==4.0",
+                "libs/mylib",
+            ],
+        ),
+        (
+            DedupeMode.SEMANTIC,
+            [
+                "Django==1.0",
+                "zope.interface>=5.0",
+                "celery[Redis,msgpack]==4.0",
+                "libs/mylib",
+            ],
+        ),
+    ],
+)
+def test_list_packages_from_files_dedupe(dedupe_mode, expected_requirements):
+    path = os.path.join(test_case_dedupe_path, "requirements.txt")
+
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            [path], dedupe=True, dedupe_mode=dedupe_mode
+        )
+    ]
+
+    assert raw_requirements == [
+        os.path.relpath(os.path.join(test_case_dedupe_path, requirement))
+        if requirement.startswith("libs/")
+        else requirement
+        for requirement in expected_requirements
+    ]
+
+
+def test_dedupe_requirements_streams():
+    path = os.path.join(test_case_dedupe_path, "requirements.txt")
+
+    def _generator():
+        for requirement in parse_requirements_txt(path):
+            yield requirement
+
+        pytest.fail("de-duping should not consume the whole list up front")
+
+    generator = _dedupe_requirements(_generator())
+    assert str(next(generator)) == "Django==1.0"
+
+
+@pytest.mark.parametrize("dynamic_setup_py", [False, True])
+def test_list_packages_from_files_shared_constraints(dynamic_setup_py):
+    file_paths = [
+        os.path.join(test_case_constraints_path, "service-1.txt"),
+        os.path.join(test_case_constraints_path, "service-2.txt"),
+    ]
+
+    # Constraints can't be found up front, falls back to reading
+    # everything before inlining.
+    if dynamic_setup_py:
+        file_paths.append(
+            os.path.join(test_case_constraints_path, "dynamic/setup.py")
+        )
+
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            file_paths, inline_constraints=True
+        )
+    ]
+
+    expected_requirements = [
+        "Django==1.0",
+        'redis==3.0; python_version >= "3"',
+        'redis==2.0; python_version < "3"',
+        "celery==4.0",
+        "Django==1.0",
+    ]
+    if dynamic_setup_py:
+        expected_requirements.append("Django==1.0")
+
+    assert raw_requirements == expected_requirements
+
+
+@pytest.mark.parametrize(
+    "setup_py_mode", [SetupPyMode.AUTO, SetupPyMode.EXEC]
+)
+def test_list_packages_from_files_inline_constraints_parses_once(
+    monkeypatch, setup_py_mode
+):
+    file_paths = [
+        os.path.join(test_case_constraints_path, "service-1.txt"),
+        os.path.join(test_case_constraints_path, "service-2.txt"),
+    ]
+
+    parsed_paths = []
+
+    def _count(module, name):
+        function = getattr(module, name)
+
+        def _function(file_path, *args, **kwargs):
+            parsed_paths.append(os.path.basename(file_path))
+            return function(file_path, *args, **kwargs)
+
+        monkeypatch.setattr(module, name, _function)
+
+    # The package exports functions with the same names as the modules,
+    # the prescan used to read the files separately.
+    _count(
+        importlib.import_module("pippackagelist.list_packages_from_files"),
+        "parse_requirements_txt",
+    )
+    _count(
+        importlib.import_module("pippackagelist.constraint_index"),
+        "read_requirements_lines",
+    )
+
+    requirements = list(
+        list_packages_from_files(
+            file_paths, inline_constraints=True, setup_py_mode=setup_py_mode
+        )
+    )
+
+    assert len(requirements) == 5
+    assert sorted(parsed_paths) == [
+        "constraints-a.txt",
+        "constraints-b.txt",
+        "service-1.txt",
+        "service-2.txt",
+    ]
+
+
+def test_inline_constraints_streams():
+    path = os.path.join(test_case_constraints_path, "service-2.txt")
+
+    constraint_index = ConstraintIndex()
+    constraint_index.add(
+        os.path.join(test_case_constraints_path, "constraints-a.txt")
+    )
+
+    def _generator():
+        for requirement in parse_requirements_txt(path):
+            yield requirement
+
+        pytest.fail("inlining should not consume the whole list up front")
+
+    generator = _inline_constraints(_generator(), constraint_index, True)
+    assert str(next(generator)) == "celery"
+
+
+def test_list_packages_from_files_prefers_declarative_metadata():
+    path = os.path.join(
+        os.path.dirname(__file__), "./test-cases/declarative/requirements.txt"
+    )
+
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            [path], recurse_editable=True
+        )
+    ]
+
+    # The setup.py files next to the pyproject.toml and setup.cfg
+    # files raise an error when executed.
+    assert raw_requirements == [
+        "django==1.0",
+        "redis>=2.0; python_version >= '3'",
+        "pytest==7.0",
+        "django==1.0",
+        'redis>=2.0; python_version >= "3"',
+        "sphinx==4.0",
+        "celery==4.0",
+        "pytest==7.0",
+        "requests==2.0",
+    ]
+
+
+def test_list_packages_from_files_lock_files():
+    test_cases_path = os.path.join(
+        os.path.dirname(__file__), "./test-cases/locks"
+    )
+
+    raw_requirements = [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            [
+                os.path.join(test_cases_path, "pipenv/Pipfile.lock"),
+                os.path.join(test_cases_path, "poetry-legacy/poetry.lock"),
+            ],
+            recurse_editable=True,
+            include_dev_packages=True,
+        )
+    ]
+
+    assert raw_requirements == [
+        "django==4.2.1; python_version >= '3.8' "
+        "--hash=sha256:aaaa --hash=sha256:bbbb",
+        "celery[redis]==5.3.0 --hash=sha256:cccc",
+        "git+https://github.com/example/mylib.git@0123abcd#egg=mylib",
+        "pytest==7.4.0 --hash=sha256:dddd",
+        "django==3.2.0 --hash=sha256:aaaa --hash=sha256:bbbb",
+        "pytest==6.2.0 --hash=sha256:dddd",
+        "requests==2.0",
+    ]
@@ -0,0 +1,78 @@
+import importlib
+import subprocess
+import sys
+import types
+
+import pippackagelist
+
+
+def test_package_exports():
+    # Importing a module doesn't hide the function of the same name
+    module = importlib.import_module("pippackagelist.render_requirements")
+
+    assert pippackagelist.render_requirements is module.render_requirements
+    assert pippackagelist.RenderFormat is module.RenderFormat
+
+    for name in pippackagelist.__all__:
+        assert not isinstance(
+            getattr(pippackagelist, name), types.ModuleType
+        )
+
+    assert set(pippackagelist.__all__) <= set(dir(pippackagelist))
+    assert set(pippackagelist.__all__) == set(pippackagelist._exports)
+
+    # The errors the listing functions raise can be caught
+    module = importlib.import_module("pippackagelist.error")
+    assert pippackagelist.SetupPyTimeoutError is module.SetupPyTimeoutError
+    assert (
+        pippackagelist.RequirementsIncludeCycleError
+        is module.RequirementsIncludeCycleError
+    )
+
+
+def test_package_imports_lazily(tmp_path):
+    (tmp_path / "requirements.txt").write_text("django==1.0\n")
+
+    # In a fresh process, this one already imported everything
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from pippackagelist.__main__ import main\n"
+            "main([sys.argv[1], '-o', sys.argv[2]])\n"
+            "print(' '.join(sorted(sys.modules)))\n",
+            str(tmp_path / "requirements.txt"),
+            str(tmp_path / "output.txt"),
+        ],
+        universal_newlines=True,
+    )
+
+    modules = output.split()
+    assert "pippackagelist.list_packages_from_files" in modules
+    for module in [
+        "setuptools",
+        "multiprocessing",
+        "concurrent.futures",
+        "tomllib",
+        "tempfile",
+        "pickle",
+    ]:
+        assert module not in modules
+
+    # Only needed by other modes and options of the command
+    for module in [
+        "build_requirements_graph",
+        "parse_cache",
+        "requirements_graph",
+        "run_observer",
+        "setup_py_worker_pool",
+        "trace_recorder",
+        "update_root_outputs",
+        "watch_package_list_files",
+        "write_output_profiles",
+        "write_root_lists",
+    ]:
+        assert f"pippackagelist.{module}" not in modules
+
+    assert (tmp_path / "output.txt").read_text() == "django==1.0\n"
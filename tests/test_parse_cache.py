@@ -0,0 +1,219 @@
+import os
+
+import pytest
+
+from pippackagelist.entry import RequirementsEntrySource
+from pippackagelist.error import SetupPyStaticAnalysisError
+from pippackagelist.list_packages_from_files import list_packages_from_files
+from pippackagelist.parse_cache import ParseCache
+from pippackagelist.parse_requirements_list import parse_requirements_list
+from pippackagelist.parse_setup_py import SetupPyMode
+
+test_case_1_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/list-1"
+)
+
+
+class CountingParser:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+
+        source = RequirementsEntrySource(path=self.file_path)
+        with open(self.file_path, "r") as fp:
+            return parse_requirements_list(source, fp.readlines())
+
+
+def _age(path, seconds=60):
+    stat = os.stat(path)
+    os.utime(
+        path,
+        ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1000 * 1000 * 1000),
+    )
+
+
+def test_parse_cache_hit(tmp_path):
+    file_path = tmp_path / "requirements.txt"
+    file_path.write_text("django==1.0\nredis==2.0\n")
+    _age(file_path)
+
+    parse = CountingParser(str(file_path))
+
+    for _ in range(3):
+        cache = ParseCache(str(tmp_path / "cache"))
+        entries = cache.get_or_parse(
+            "requirements.txt", str(file_path), [], parse
+        )
+
+        assert [str(entry) for entry in entries] == [
+            "django==1.0",
+            "redis==2.0",
+        ]
+
+    assert parse.calls == 1
+
+
+def test_parse_cache_invalidated_on_change(tmp_path):
+    file_path = tmp_path / "requirements.txt"
+    file_path.write_text("django==1.0\n")
+
+    parse = CountingParser(str(file_path))
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    list(cache.get_or_parse("requirements.txt", str(file_path), [], parse))
+
+    # same size, only the content changed
+    file_path.write_text("django==2.0\n")
+    entries = cache.get_or_parse("requirements.txt", str(file_path), [], parse)
+
+    assert [str(entry) for entry in entries] == ["django==2.0"]
+    assert parse.calls == 2
+
+
+def test_parse_cache_keyed_by_extras(tmp_path):
+    file_path = tmp_path / "requirements.txt"
+    file_path.write_text("django==1.0\n")
+
+    parse = CountingParser(str(file_path))
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    list(cache.get_or_parse("setup.py", str(file_path), ["a"], parse))
+    list(cache.get_or_parse("setup.py", str(file_path), ["b"], parse))
+    list(cache.get_or_parse("setup.py", str(file_path), ["a"], parse))
+
+    assert parse.calls == 2
+
+
+def test_parse_cache_corrupt_entries_are_a_miss(tmp_path):
+    file_path = tmp_path / "requirements.txt"
+    file_path.write_text("django==1.0\n")
+
+    parse = CountingParser(str(file_path))
+    cache = ParseCache(str(tmp_path / "cache"))
+    list(cache.get_or_parse("requirements.txt", str(file_path), [], parse))
+
+    for name in os.listdir(cache.entries_directory):
+        with open(os.path.join(cache.entries_directory, name), "wb") as fp:
+            fp.write(b"garbage")
+
+    entries = cache.get_or_parse("requirements.txt", str(file_path), [], parse)
+    assert [str(entry) for entry in entries] == ["django==1.0"]
+    assert parse.calls == 2
+
+
+def test_parse_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(str(tmp_path / "cache"), max_size=4096)
+
+    for index in range(50):
+        file_path = tmp_path / f"requirements-{index}.txt"
+        file_path.write_text(f"package{index}==1.0\n")
+
+        parse = CountingParser(str(file_path))
+        list(cache.get_or_parse("requirements.txt", str(file_path), [], parse))
+
+    assert cache.size <= 4096
+    assert sum(size for _, _, size in cache._list_files()) <= 4096
+
+
+def test_list_packages_from_files_with_cache(tmp_path):
+    path = os.path.join(test_case_1_path, "requirements.txt")
+    options = dict(recurse_recursive=True, recurse_editable=True)
+
+    expected = [str(req) for req in list_packages_from_files([path], **options)]
+
+    for _ in range(2):
+        actual = [
+            str(req)
+            for req in list_packages_from_files(
+                [path], cache_dir=str(tmp_path), **options
+            )
+        ]
+
+        assert actual == expected
+
+
+def test_list_packages_from_files_cache_keyed_by_setup_py_mode(tmp_path):
+    setup_py_path = tmp_path / "package/setup.py"
+    setup_py_path.parent.mkdir()
+    setup_py_path.write_text(
+        "from setuptools import setup\n\n"
+        "def requirements():\n"
+        "    return ['django']\n\n"
+        "setup(install_requires=requirements())\n"
+    )
+    cache_dir = str(tmp_path / "cache")
+
+    assert [
+        str(req)
+        for req in list_packages_from_files(
+            [str(setup_py_path)],
+            setup_py_mode=SetupPyMode.EXEC,
+            cache_dir=cache_dir,
+        )
+    ] == ["django"]
+
+    # The static analysis still fails, rather than the cache being used
+    with pytest.raises(SetupPyStaticAnalysisError):
+        list(
+            list_packages_from_files(
+                [str(setup_py_path)],
+                setup_py_mode=SetupPyMode.STATIC,
+                cache_dir=cache_dir,
+            )
+        )
+
+
+@pytest.mark.parametrize(
+    "file_name, content",
+    [
+        (
+            "setup.py",
+            "from setuptools import setup\n\n"
+            "with open('requirements.txt') as fp:\n"
+            "    requirements = fp.read().splitlines()\n\n"
+            "setup(install_requires=requirements)\n",
+        ),
+        (
+            "setup.cfg",
+            "[options]\ninstall_requires = file: requirements.txt\n",
+        ),
+        (
+            "pyproject.toml",
+            '[project]\nname = "package"\ndynamic = ["dependencies"]\n\n'
+            "[tool.setuptools.dynamic]\n"
+            'dependencies = {file = ["requirements.txt"]}\n',
+        ),
+    ],
+    ids=["setup.py", "setup.cfg", "pyproject.toml"],
+)
+def test_list_packages_from_files_cache_invalidated_by_read_files(
+    tmp_path, file_name, content
+):
+    package_path = tmp_path / "package"
+    package_path.mkdir()
+    (package_path / file_name).write_text(content)
+    _age(package_path / file_name)
+
+    requirements_path = package_path / "requirements.txt"
+    requirements_path.write_text("django==1.0\n")
+
+    root_path = tmp_path / "requirements.txt"
+    root_path.write_text("-e ./package\n")
+
+    def _list():
+        return [
+            str(req)
+            for req in list_packages_from_files(
+                [str(root_path)],
+                recurse_editable=True,
+                cache_dir=str(tmp_path / "cache"),
+            )
+        ]
+
+    assert _list() == ["django==1.0"]
+
+    requirements_path.write_text("django==2.0\n")
+    assert _list() == ["django==2.0"]
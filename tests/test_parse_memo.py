@@ -0,0 +1,72 @@
+import importlib
+import os
+
+from pippackagelist.list_packages_from_files import list_packages_from_files
+from pippackagelist.parse_session import ParseSession
+
+
+def _list(file_path, session):
+    return [
+        str(requirement)
+        for requirement in list_packages_from_files(
+            [str(file_path)], recurse_recursive=True, session=session
+        )
+    ]
+
+
+def test_parse_memo_only_parses_changed_files(tmp_path, monkeypatch):
+    base_path = tmp_path / "base.txt"
+    base_path.write_text("django==1.0\n")
+
+    requirements_path = tmp_path / "requirements.txt"
+    requirements_path.write_text("-r base.txt\nredis==2.0\n")
+
+    parsed_paths = []
+
+    # The package exports a function with the same name as the module
+    module = importlib.import_module(
+        "pippackagelist.list_packages_from_files"
+    )
+    parse_requirements_txt = module.parse_requirements_txt
+
+    def _parse_requirements_txt(file_path, *args):
+        parsed_paths.append(os.path.basename(file_path))
+        return parse_requirements_txt(file_path, *args)
+
+    monkeypatch.setattr(
+        module, "parse_requirements_txt", _parse_requirements_txt
+    )
+
+    session = ParseSession()
+    memo = session.memo
+
+    assert _list(requirements_path, session) == ["redis==2.0", "django==1.0"]
+    assert parsed_paths == ["requirements.txt", "base.txt"]
+
+    assert memo.poll() == set()
+    assert _list(requirements_path, session) == ["redis==2.0", "django==1.0"]
+    assert parsed_paths == ["requirements.txt", "base.txt"]
+
+    base_path.write_text("django==2.0\n")
+
+    assert memo.poll() == {os.path.realpath(base_path)}
+    assert _list(requirements_path, session) == ["redis==2.0", "django==2.0"]
+    assert parsed_paths == ["requirements.txt", "base.txt", "base.txt"]
+
+
+def test_parse_memo_tracks_missing_files(tmp_path):
+    requirements_path = tmp_path / "requirements.txt"
+    requirements_path.write_text("-r base.txt\n")
+
+    session = ParseSession()
+    memo = session.memo
+
+    try:
+        _list(requirements_path, session)
+    except FileNotFoundError:
+        pass
+
+    (tmp_path / "base.txt").write_text("django==1.0\n")
+
+    assert memo.poll() == {os.path.realpath(tmp_path / "base.txt")}
+    assert _list(requirements_path, session) == ["django==1.0"]
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from pippackagelist.entry import (
+    RequirementsEditableEntry,
+    RequirementsPackageEntry,
+    RequirementsVCSPackageEntry,
+)
+from pippackagelist.error import DeclarativeMetadataError
+from pippackagelist.parse_pipfile_lock import parse_pipfile_lock
+
+test_cases_path = os.path.join(os.path.dirname(__file__), "./test-cases/locks")
+pipfile_lock_path = os.path.join(test_cases_path, "pipenv/Pipfile.lock")
+
+
+def test_parse_pipfile_lock():
+    requirements = list(parse_pipfile_lock(pipfile_lock_path))
+
+    assert [type(req) for req in requirements] == [
+        RequirementsPackageEntry,
+        RequirementsPackageEntry,
+        RequirementsEditableEntry,
+        RequirementsVCSPackageEntry,
+    ]
+
+    django, celery, local, mylib = requirements
+
+    assert django.name == "django"
+    assert django.operator == "=="
+    assert django.version == "4.2.1"
+    assert django.markers == "python_version >= '3.8'"
+    assert django.hashes == ("sha256:aaaa", "sha256:bbbb")
+    assert django.source.path == os.path.realpath(pipfile_lock_path)
+
+    assert str(celery) == "celery[redis]==5.3.0 --hash=sha256:cccc"
+
+    assert local.resolved_absolute_path == os.path.realpath(
+        os.path.join(test_cases_path, "local/setup.py")
+    )
+
+    assert mylib.name == "mylib"
+    assert mylib.tag == "0123abcd"
+
+
+def test_parse_pipfile_lock_include_dev():
+    requirements = list(parse_pipfile_lock(pipfile_lock_path, True))
+
+    assert len(requirements) == 5
+    assert str(requirements[-1]) == "pytest==7.4.0 --hash=sha256:dddd"
+
+
+def test_parse_pipfile_lock_invalid(tmp_path):
+    path = tmp_path / "Pipfile.lock"
+    path.write_text("{")
+
+    with pytest.raises(DeclarativeMetadataError):
+        list(parse_pipfile_lock(str(path)))
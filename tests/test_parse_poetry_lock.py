@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from pippackagelist.entry import (
+    RequirementsEditableEntry,
+    RequirementsVCSPackageEntry,
+)
+from pippackagelist.parse_poetry_lock import parse_poetry_lock
+
+test_cases_path = os.path.join(os.path.dirname(__file__), "./test-cases/locks")
+poetry_lock_path = os.path.join(test_cases_path, "poetry/poetry.lock")
+
+
+def test_parse_poetry_lock():
+    requirements = list(parse_poetry_lock(poetry_lock_path))
+
+    colorama, django, local, mylib = requirements
+
+    assert str(colorama) == (
+        'colorama==0.4.6; sys_platform == "win32" '
+        "--hash=sha256:eeee --hash=sha256:ffff"
+    )
+    assert str(django) == "django==4.2.1 --hash=sha256:aaaa"
+    assert django.source.path == os.path.realpath(poetry_lock_path)
+
+    assert isinstance(local, RequirementsEditableEntry)
+    assert local.resolved_absolute_path == os.path.realpath(
+        os.path.join(test_cases_path, "local/setup.py")
+    )
+
+    assert isinstance(mylib, RequirementsVCSPackageEntry)
+    assert mylib.tag == "0123abcd"
+
+
+def test_parse_poetry_lock_include_dev():
+    requirements = list(parse_poetry_lock(poetry_lock_path, True))
+
+    assert requirements[0].markers == (
+        '(sys_platform == "win32") or (platform_system == "Windows")'
+    )
+    assert str(requirements[-1]) == "pytest==7.4.0 --hash=sha256:dddd"
+
+
+@pytest.mark.parametrize(
+    "include_dev,expected_requirements",
+    [
+        (False, ["django==3.2.0 --hash=sha256:aaaa --hash=sha256:bbbb"]),
+        (
+            True,
+            [
+                "django==3.2.0 --hash=sha256:aaaa --hash=sha256:bbbb",
+                "pytest==6.2.0 --hash=sha256:dddd",
+            ],
+        ),
+    ],
+)
+def test_parse_poetry_lock_legacy(include_dev, expected_requirements):
+    path = os.path.join(test_cases_path, "poetry-legacy/poetry.lock")
+
+    requirements = [str(req) for req in parse_poetry_lock(path, include_dev)]
+    assert requirements == expected_requirements
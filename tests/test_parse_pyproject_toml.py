@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from pippackagelist.error import DeclarativeMetadataError
+from pippackagelist.find_package_metadata_file import (
+    find_package_metadata_file,
+)
+from pippackagelist.parse_pyproject_toml import parse_pyproject_toml
+
+test_cases_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/declarative"
+)
+
+
+def test_parse_pyproject_toml():
+    path = os.path.join(test_cases_path, "pyproject-static/pyproject.toml")
+
+    requirements = [str(req) for req in parse_pyproject_toml(path)]
+    assert requirements == ["django==1.0", "redis>=2.0; python_version >= '3'"]
+
+    for requirement in parse_pyproject_toml(path):
+        assert requirement.source.path == os.path.realpath(path)
+
+
+def test_parse_pyproject_toml_extras_and_build_requires():
+    path = os.path.join(test_cases_path, "pyproject-static/pyproject.toml")
+
+    requirements = [
+        str(req)
+        for req in parse_pyproject_toml(
+            path, ["test", "docs"], include_build_requires=True
+        )
+    ]
+    assert requirements == [
+        "django==1.0",
+        "redis>=2.0; python_version >= '3'",
+        "pytest==7.0",
+        "sphinx",
+        "setuptools>=61.0",
+        "wheel",
+    ]
+
+
+def test_parse_pyproject_toml_dynamic_from_files():
+    path = os.path.join(test_cases_path, "pyproject-dynamic/pyproject.toml")
+
+    requirements = [str(req) for req in parse_pyproject_toml(path, ["test"])]
+    assert requirements == ["celery==4.0", "pytest==7.0"]
+
+
+def test_parse_pyproject_toml_dynamic():
+    path = os.path.join(
+        test_cases_path, "pyproject-dynamic-setup-py/pyproject.toml"
+    )
+
+    with pytest.raises(DeclarativeMetadataError):
+        list(parse_pyproject_toml(path))
+
+
+@pytest.mark.parametrize(
+    "package,file_name",
+    [
+        ("pyproject-static", "pyproject.toml"),
+        ("pyproject-dynamic", "pyproject.toml"),
+        ("pyproject-dynamic-setup-py", "setup.py"),
+        ("setup-cfg", "setup.cfg"),
+    ],
+)
+def test_find_package_metadata_file(package, file_name):
+    path = os.path.join(test_cases_path, package, "setup.py")
+
+    assert find_package_metadata_file(path) == os.path.join(
+        test_cases_path, package, file_name
+    )
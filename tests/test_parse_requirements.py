@@ -1,4 +1,5 @@
 import os
+import pickle
 
 import pytest
 
@@ -13,7 +14,12 @@ from pippackagelist.entry import (
     RequirementsVCSPackageEntry,
     RequirementsWheelPackageEntry,
 )
-from pippackagelist.parse_requirements_list import parse_requirements_list
+from pippackagelist.parse_requirements_list import (
+    _split_line,
+    parse_package_requirements_entry,
+    parse_requirements_buffer,
+    parse_requirements_list,
+)
 
 source = RequirementsEntrySource(
     path="requirements.txt", line=None, line_number=None,
@@ -338,3 +344,88 @@ def test_parse_requirements_ignores_leading_and_trailing_whitespace():
     assert requirements[3].vcs == "git"
     assert requirements[3].uri == "https://github.com/test/test"
     assert requirements[3].tag == "tag"
+
+
+def test_parse_requirements_without_line_text():
+    requirements = list(
+        parse_requirements_list(source, ["", "django==1.0"], False)
+    )
+
+    assert requirements[0].source.path == source.path
+    assert requirements[0].source.line is None
+    assert requirements[0].source.line_number == 2
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "-r ../bla.txt",
+        "-e ./bla[extra1]",
+        "git+https://github.com/org/repo@v1.0#egg=repo",
+        'django[extra1]==1.0 ; sys_platform == "linux"',
+    ],
+)
+def test_parse_requirements_entries_are_slotted(line):
+    requirement = next(parse_requirements_list(source, [line]))
+
+    assert not hasattr(requirement, "__dict__")
+    assert not hasattr(requirement.source, "__dict__")
+    assert pickle.loads(pickle.dumps(requirement)) == requirement
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "django==1.0",
+        "django==1.0 --hash=sha256:abcd",
+        "django==1.0 --hash=sha256:abcd --hash=sha256:ef01",
+        "django[extra1, extra2]==1.0 --hash=sha256:abcd",
+        'django==1.0 ; sys_platform == "linux" --hash=sha256:abcd',
+        "django==1.0;python_version<'3.8'",
+        "zope.interface==5.4.0",
+    ],
+)
+def test_parse_requirements_pinned_package_fast_path(line):
+    requirements = list(parse_requirements_list(source, [line]))
+    assert len(requirements) == 1
+
+    requirement, extras, markers, options = _split_line(line)
+    assert requirements[0] == parse_package_requirements_entry(
+        requirements[0].source, requirement, extras, markers, options
+    )
+
+
+def test_parse_requirements_hash_options():
+    line = "django>=1.0 --hash sha256:abcd --no-binary :all: --hash=md5:ef"
+
+    requirements = list(parse_requirements_list(source, [line]))
+
+    assert requirements[0].hashes == ("sha256:abcd", "md5:ef")
+    assert requirements[0].options == "--no-binary :all:"
+    assert str(requirements[0]) == (
+        "django>=1.0 --no-binary :all: --hash=sha256:abcd --hash=md5:ef"
+    )
+
+
+def test_parse_requirements_line_continuations():
+    buffer = "\n".join(
+        [
+            "django==1.0 \\",
+            "    --hash=sha256:abcd \\",
+            "    --hash=sha256:ef01",
+            "    # via -r requirements.in",
+            "redis==2.0  # via celery",
+            "-r \\",
+            "base.txt",
+        ]
+    )
+
+    requirements = list(parse_requirements_buffer(source, buffer))
+    assert len(requirements) == 3
+
+    assert requirements[0].hashes == ("sha256:abcd", "sha256:ef01")
+    assert requirements[0].source.line_number == 1
+    assert requirements[1].name == "redis"
+    assert requirements[1].source.line_number == 5
+    assert requirements[2].original_path == "base.txt"
+    assert requirements[2].source.line_number == 6
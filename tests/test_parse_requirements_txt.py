@@ -26,3 +26,41 @@ def test_parse_requirements_txt():
             requirements_txt_path
         )
         assert requirement.source.line_number == index + 1
+
+
+def test_parse_requirements_txt_pip_compile():
+    path = os.path.join(
+        os.path.dirname(__file__), "./test-cases/pip-compile/requirements.txt"
+    )
+
+    requirements = list(parse_requirements_txt(path))
+    assert len(requirements) == 5
+
+    assert [req.name for req in requirements[:4]] == [
+        "asgiref",
+        "django",
+        "pytz",
+        "sqlparse",
+    ]
+    assert [req.source.line_number for req in requirements] == [
+        7,
+        11,
+        14,
+        19,
+        20,
+    ]
+
+    assert requirements[0].version == "3.3.4"
+    assert requirements[0].options is None
+    assert requirements[0].hashes == (
+        "sha256:92906c611ce6c967347bbfea733f13d6313901d54dcca88195eaeb52b2a8e8ee",
+        "sha256:d1216dfbdfb63826470995d31caed36225dcaf34f182e0fa257a4dd9e86f1b78",
+    )
+
+    assert requirements[1].extras == ["argon2"]
+    assert requirements[1].markers == 'python_version >= "3.6"'
+    assert len(requirements[1].hashes) == 1
+
+    assert requirements[3].hashes == ()
+    assert isinstance(requirements[4], RequirementsEditableEntry)
+    assert requirements[4].original_path == "./libs/mylib"
@@ -0,0 +1,30 @@
+import os
+
+from pippackagelist.parse_setup_cfg import parse_setup_cfg
+
+setup_cfg_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/declarative/setup-cfg/setup.cfg"
+)
+
+
+def test_parse_setup_cfg():
+    requirements = [str(req) for req in parse_setup_cfg(setup_cfg_path)]
+
+    assert requirements == ["django==1.0", 'redis>=2.0; python_version >= "3"']
+
+
+def test_parse_setup_cfg_with_extras():
+    requirements = list(parse_setup_cfg(setup_cfg_path, ["test", "docs"]))
+
+    assert [str(req) for req in requirements] == [
+        "django==1.0",
+        'redis>=2.0; python_version >= "3"',
+        "pytest==7.0",
+        "pytest-cov",
+        "sphinx==4.0",
+    ]
+
+    # Read from a file, so the source points to that file
+    assert requirements[-1].source.path == os.path.realpath(
+        os.path.join(os.path.dirname(setup_cfg_path), "requirements-docs.txt")
+    )
@@ -1,11 +1,15 @@
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+
+import setuptools
+
 from pippackagelist.entry import (
     RequirementsEditableEntry,
     RequirementsPackageEntry,
     RequirementsRecursiveEntry,
 )
-from pippackagelist.parse_setup_py import parse_setup_py
+from pippackagelist.parse_setup_py import SetupPyMode, parse_setup_py
 
 setup_py_path = os.path.join(os.path.dirname(__file__), "./test-cases/setup.py")
 setup_py_with_extras_path = os.path.join(
@@ -40,3 +44,40 @@ def test_parse_setup_py_with_extras():
     assert requirements[1].name == "Sphinx"
     assert requirements[1].version == "1.0"
     assert requirements[1].operator == "=="
+
+
+def test_parse_setup_py_on_multiple_threads(tmp_path):
+    setup = setuptools.setup
+    setup_py_paths = []
+
+    for index in range(20):
+        (tmp_path / f"package{index}").mkdir()
+        (tmp_path / f"package{index}/README").write_text(f"package{index}")
+
+        # Half of them use distutils, all of them need the working
+        # directory and their own namespace.
+        module = "distutils.core" if index % 2 else "setuptools"
+        setup_py_path = tmp_path / f"package{index}/setup.py"
+        setup_py_path.write_text(
+            f"from {module} import setup\n\n"
+            "name = open('README').read()\n\n"
+            "if __name__ == '__main__':\n"
+            "    setup(install_requires=[name + '==1.0'])\n"
+        )
+        setup_py_paths.append(str(setup_py_path))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(
+                lambda setup_py_path: [
+                    str(requirement)
+                    for requirement in parse_setup_py(
+                        setup_py_path, mode=SetupPyMode.EXEC
+                    )
+                ],
+                setup_py_paths,
+            )
+        )
+
+    assert results == [[f"package{index}==1.0"] for index in range(20)]
+    assert setuptools.setup is setup
@@ -0,0 +1,127 @@
+import importlib
+import mmap
+
+import pytest
+
+from pippackagelist.read_requirements_lines import read_requirements_lines
+
+
+@pytest.mark.parametrize("newline", [b"\n", b"\r\n"])
+def test_read_requirements_lines(tmp_path, newline):
+    path = tmp_path / "requirements.txt"
+    path.write_bytes(
+        newline.join(
+            [
+                b"# comment",
+                b"",
+                b"django==1.0",
+                b"  \t",
+                b"  redis==2.0",
+                b"    # indented comment",
+                b"celery",
+            ]
+        )
+    )
+
+    lines = [
+        (line_number, line.strip())
+        for line_number, line in read_requirements_lines(str(path))
+    ]
+
+    assert lines == [(3, "django==1.0"), (5, "redis==2.0"), (7, "celery")]
+
+
+def test_read_requirements_lines_empty_file(tmp_path):
+    path = tmp_path / "requirements.txt"
+    path.write_bytes(b"")
+
+    assert list(read_requirements_lines(str(path))) == []
+
+
+def test_read_requirements_lines_stops_early(tmp_path):
+    path = tmp_path / "requirements.txt"
+    path.write_bytes(b"django==1.0\nredis==2.0\n")
+
+    lines = read_requirements_lines(str(path))
+    assert next(lines) == (1, "django==1.0")
+
+    # Closing the generator unmaps the file
+    lines.close()
+
+
+@pytest.mark.parametrize("newline", [b"\n", b"\r\n"])
+def test_read_requirements_lines_continuations(tmp_path, newline):
+    path = tmp_path / "requirements.txt"
+    path.write_bytes(
+        newline.join(
+            [
+                b"django==1.0 \\",
+                b"    --hash=sha256:abcd \\",
+                b"    --hash=sha256:ef01",
+                b"    # via -r requirements.in",
+                b"redis==2.0",
+            ]
+        )
+    )
+
+    lines = [
+        (line_number, " ".join(line.split()))
+        for line_number, line in read_requirements_lines(str(path))
+    ]
+
+    assert lines == [
+        (1, "django==1.0 --hash=sha256:abcd --hash=sha256:ef01"),
+        (5, "redis==2.0"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "content,expected_lines",
+    [
+        (b"", 0),
+        (b"\n", 1),
+        (b"django==1.0", 1),
+        (b"django==1.0\n", 1),
+        (b"django==1.0\n\n# comment\n", 3),
+        (b"django==1.0\n# comment", 2),
+    ],
+)
+def test_read_requirements_lines_line_counts(
+    tmp_path, content, expected_lines
+):
+    path = tmp_path / "requirements.txt"
+    path.write_bytes(content)
+
+    line_counts = []
+    list(read_requirements_lines(str(path), line_counts))
+
+    assert line_counts == [expected_lines]
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_read_requirements_lines_memory_map(
+    tmp_path, monkeypatch, memory_map
+):
+    path = tmp_path / "requirements.txt"
+    path.write_bytes(b"# comment\n\ndjango==1.0\n\n\nredis==2.0\n# end")
+
+    mapped = []
+
+    class _mmap(mmap.mmap):
+        def __new__(cls, *args, **kwargs):
+            mapped.append(args)
+            return super().__new__(cls, *args, **kwargs)
+
+    # The package exports a function with the same name as the module
+    module = importlib.import_module("pippackagelist.read_requirements_lines")
+
+    # Map files of any size
+    monkeypatch.setattr(module, "memory_map_min_size", 0)
+    monkeypatch.setattr(mmap, "mmap", _mmap)
+
+    line_counts = []
+    lines = list(read_requirements_lines(str(path), line_counts, memory_map))
+
+    assert lines == [(3, "django==1.0"), (6, "redis==2.0")]
+    assert line_counts == [7]
+    assert bool(mapped) == memory_map
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+
+import pytest
+
+from pippackagelist.list_packages_from_files import list_packages_from_files
+from pippackagelist.render_requirements import (
+    RelativePathCache,
+    RenderFormat,
+    render_requirements,
+)
+
+test_case_1_path = os.path.join(
+    os.path.dirname(__file__), "./test-cases/list-1"
+)
+
+
+class _CountingStringIO(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def _list_test_case_1():
+    return list(
+        list_packages_from_files(
+            [os.path.join(test_case_1_path, "requirements.txt")],
+            recurse_recursive=True,
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/a/b/c",
+        "/a/b/c/d.txt",
+        "/a/b",
+        "/a/b/cd",
+        "/a/b/c/d/e",
+        "/a/x/y",
+        "/z",
+        "/",
+    ],
+)
+def test_relative_path_cache(path):
+    relpath = RelativePathCache("/a/b/c")
+
+    # Twice to go through the cached path
+    assert relpath(path) == os.path.relpath(path, "/a/b/c")
+    assert relpath(path) == os.path.relpath(path, "/a/b/c")
+
+
+def test_render_requirements_text_matches_str():
+    requirements = _list_test_case_1()
+
+    out = io.StringIO()
+    assert render_requirements(requirements, out=out) == len(requirements)
+
+    assert out.getvalue() == "".join(f"{req}\n" for req in requirements)
+
+
+def test_render_requirements_base_dir():
+    requirements = _list_test_case_1()
+
+    out = io.StringIO()
+    render_requirements(requirements, base_dir=test_case_1_path, out=out)
+
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "-e package-1[local,special]"
+    assert "-c constraints.txt" in lines
+    assert "-e package-2" in lines
+
+
+def test_render_requirements_json():
+    requirements = _list_test_case_1()
+
+    out = io.StringIO()
+    render_requirements(
+        requirements,
+        base_dir=test_case_1_path,
+        fmt=RenderFormat.JSON,
+        out=out,
+    )
+
+    rendered = json.loads(out.getvalue())
+    assert len(rendered) == len(requirements)
+    assert rendered[1] == {
+        "kind": "package",
+        "requirement": "django==1.1",
+        "package_name": "django",
+        "source": {"path": "requirements.txt", "line_number": 2},
+    }
+
+
+def test_render_requirements_json_empty():
+    out = io.StringIO()
+    render_requirements([], fmt=RenderFormat.JSON, out=out)
+
+    assert json.loads(out.getvalue()) == []
+
+
+def test_render_requirements_chunks():
+    requirements = _list_test_case_1() * 100
+
+    out = _CountingStringIO()
+    render_requirements(requirements, out=out, chunk_size=1024)
+
+    assert out.getvalue() == "".join(f"{req}\n" for req in requirements)
+    assert 1 < out.writes < len(requirements) / 10
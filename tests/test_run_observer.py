@@ -0,0 +1,106 @@
+import io
+
+from pippackagelist.list_packages_from_files import (
+    DedupeMode,
+    list_packages_from_files,
+)
+from pippackagelist.run_observer import RunObserver, RunStatistics
+
+
+def _create_files(tmp_path):
+    (tmp_path / "constraints.txt").write_text("redis==2.0\n")
+    (tmp_path / "base.txt").write_text("# shared\ndjango==1.0\nRedis\n")
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package/setup.py").write_text(
+        "from setuptools import setup\n\n"
+        "setup(install_requires=['django==1.0'])\n"
+    )
+    (tmp_path / "requirements.txt").write_text(
+        "-c constraints.txt\n-r base.txt\n-e ./package\nredis\n"
+    )
+
+    return str(tmp_path / "requirements.txt")
+
+
+def test_run_statistics(tmp_path):
+    statistics = RunStatistics()
+
+    requirements = list(
+        list_packages_from_files(
+            [_create_files(tmp_path)],
+            recurse_recursive=True,
+            recurse_editable=True,
+            inline_constraints=True,
+            dedupe=True,
+            dedupe_mode=DedupeMode.SEMANTIC,
+            observer=statistics,
+        )
+    )
+
+    assert [str(requirement) for requirement in requirements] == [
+        "redis==2.0",
+        "django==1.0",
+    ]
+
+    assert statistics.files_parsed == {"requirements.txt": 3, "setup.py": 1}
+    assert statistics.lines_scanned == 4 + 3 + 1
+    assert statistics.entries_read == {
+        "constraints": 1,
+        "recursive": 1,
+        "editable": 1,
+        "package": 4,
+    }
+    assert statistics.constraints_applied == 2
+    assert statistics.duplicates_dropped == 2
+
+    assert set(statistics.stage_durations) == {
+        "prescan_constraints",
+        "traverse",
+        "remove",
+        "inline_constraints",
+        "dedupe",
+    }
+
+    slowest = statistics.slowest_files(10, kind="setup.py")
+    assert [timing.file_path for timing in slowest] == [
+        str(tmp_path / "package/setup.py")
+    ]
+    assert slowest[0].entries == 1
+
+    out = io.StringIO()
+    statistics.render_summary(out)
+    assert "duplicates dropped: 2\n" in out.getvalue()
+    assert str(tmp_path / "package/setup.py") in out.getvalue()
+
+
+def test_run_observer_is_only_told_about_parsed_files(tmp_path):
+    class Observer(RunObserver):
+        def __init__(self):
+            self.file_paths = []
+
+        def file_parsed(self, timing):
+            self.file_paths.append(timing.file_path)
+
+    file_path = _create_files(tmp_path)
+    observer = Observer()
+
+    list(
+        list_packages_from_files(
+            [file_path],
+            recurse_recursive=True,
+            cache_dir=str(tmp_path / "cache"),
+            observer=observer,
+        )
+    )
+    assert observer.file_paths == [file_path, str(tmp_path / "base.txt")]
+
+    # Everything comes from the cache now
+    list(
+        list_packages_from_files(
+            [file_path],
+            recurse_recursive=True,
+            cache_dir=str(tmp_path / "cache"),
+            observer=observer,
+        )
+    )
+    assert observer.file_paths == [file_path, str(tmp_path / "base.txt")]
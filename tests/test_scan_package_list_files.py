@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from pippackagelist.scan_package_list_files import (
+    IgnorePatterns,
+    scan_package_list_files,
+)
+
+
+def _create_files(directory, file_paths):
+    for file_path in file_paths:
+        path = directory / file_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+
+def _scan(directory, **kwargs):
+    return [
+        os.path.relpath(path, str(directory))
+        for path in scan_package_list_files(str(directory), **kwargs)
+    ]
+
+
+def test_scan_package_list_files(tmp_path):
+    _create_files(
+        tmp_path,
+        [
+            "requirements.txt",
+            "README.md",
+            "services/api/requirements.txt",
+            "services/api/requirements-test.txt",
+            "services/api/setup.py",
+            "services/api/src/api.py",
+            "services/web/requirements.txt",
+            "services/web/node_modules/thing/requirements.txt",
+            ".git/requirements.txt",
+            "env/pyvenv.cfg",
+            "env/lib/requirements.txt",
+        ],
+    )
+
+    assert _scan(tmp_path) == [
+        "requirements.txt",
+        "services/api/requirements-test.txt",
+        "services/api/requirements.txt",
+        "services/api/setup.py",
+        "services/web/requirements.txt",
+    ]
+
+
+def test_scan_package_list_files_include(tmp_path):
+    _create_files(tmp_path, ["requirements.txt", "a/setup.py", "a/deps.in"])
+
+    assert _scan(tmp_path, include=["*.in"]) == ["a/deps.in"]
+
+
+def test_scan_package_list_files_package_metadata(tmp_path):
+    _create_files(
+        tmp_path,
+        [
+            "pyproject.toml",
+            "setup.cfg",
+            "legacy/setup.py",
+            "legacy/setup.cfg",
+            "declarative/setup.py",
+            "declarative/setup.cfg",
+            "modern/setup.py",
+            "modern/setup.cfg",
+            "modern/pyproject.toml",
+        ],
+    )
+
+    # Only configure tools
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 80\n")
+    (tmp_path / "setup.cfg").write_text("[flake8]\nmax-line-length = 80\n")
+
+    (tmp_path / "declarative/setup.cfg").write_text(
+        "[options]\ninstall_requires =\n    django\n"
+    )
+    (tmp_path / "modern/pyproject.toml").write_text(
+        '[project]\nname = "modern"\ndependencies = ["django"]\n'
+    )
+
+    assert _scan(tmp_path) == [
+        "declarative/setup.cfg",
+        "legacy/setup.py",
+        "modern/pyproject.toml",
+    ]
+    assert _scan(tmp_path, include=["setup.py"]) == [
+        "declarative/setup.py",
+        "legacy/setup.py",
+        "modern/setup.py",
+    ]
+
+
+def test_scan_package_list_files_exclude(tmp_path):
+    _create_files(
+        tmp_path,
+        [
+            "requirements.txt",
+            "legacy/requirements.txt",
+            "services/legacy/requirements.txt",
+            "services/api/requirements.txt",
+            "services/api/requirements-dev.txt",
+            "tools/requirements.txt",
+        ],
+    )
+
+    exclude = IgnorePatterns(
+        ["legacy/", "requirements-*.txt", "/tools", "# a comment"]
+    )
+
+    assert _scan(tmp_path, exclude=exclude) == [
+        "requirements.txt",
+        "services/api/requirements.txt",
+    ]
+
+
+@pytest.mark.parametrize(
+    "patterns,path,is_directory,ignored",
+    [
+        (["*.txt"], "a/b/requirements.txt", False, True),
+        (["/requirements.txt"], "a/requirements.txt", False, False),
+        (["/requirements.txt"], "requirements.txt", False, True),
+        (["a/*.txt"], "a/requirements.txt", False, True),
+        (["a/*.txt"], "b/a/requirements.txt", False, False),
+        (["**/a/*.txt"], "b/a/requirements.txt", False, True),
+        (["build/"], "build", False, False),
+        (["build/"], "src/build", True, True),
+        (["*.txt", "!keep.txt"], "keep.txt", False, False),
+        (["requirements-[!d]*.txt"], "requirements-dev.txt", False, False),
+        (["requirements-[!d]*.txt"], "requirements-test.txt", False, True),
+    ],
+)
+def test_ignore_patterns(patterns, path, is_directory, ignored):
+    assert IgnorePatterns(patterns).is_ignored(path, is_directory) == ignored
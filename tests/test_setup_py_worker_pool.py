@@ -0,0 +1,85 @@
+import importlib
+import os
+import time
+
+import pytest
+
+from pippackagelist.error import SetupPyTimeoutError, SetupPyWorkerError
+from pippackagelist.list_packages_from_files import list_packages_from_files
+from pippackagelist.parse_setup_py import SetupPyMode
+from pippackagelist.setup_py_worker_pool import SetupPyWorkerPool
+
+test_cases_path = os.path.join(os.path.dirname(__file__), "./test-cases")
+
+
+@pytest.mark.parametrize("mode", [SetupPyMode.AUTO, SetupPyMode.EXEC])
+def test_setup_py_worker_pool(mode):
+    path = os.path.join(test_cases_path, "setup_with_extras.py")
+
+    with SetupPyWorkerPool(2, mode=mode) as pool:
+        requirements = [str(req) for req in pool.submit(path, ["docs"])]
+
+    assert requirements == ["django==1.0", "Sphinx==1.0"]
+
+
+def test_setup_py_worker_pool_timeout():
+    path = os.path.join(test_cases_path, "setup-py-slow/setup.py")
+
+    with SetupPyWorkerPool(1, mode=SetupPyMode.EXEC, timeout=0.5) as pool:
+        with pytest.raises(SetupPyTimeoutError):
+            list(pool.submit(path))
+
+
+def test_setup_py_worker_pool_stuck_worker(tmp_path, monkeypatch):
+    (tmp_path / "setup.py").write_text(
+        "import signal, time\n"
+        "signal.signal(signal.SIGALRM, signal.SIG_IGN)\n"
+        "time.sleep(60)\n"
+    )
+
+    module = importlib.import_module("pippackagelist.setup_py_worker_pool")
+    monkeypatch.setattr(module, "timeout_grace_period", 0.5)
+
+    start = time.perf_counter()
+
+    with SetupPyWorkerPool(1, mode=SetupPyMode.EXEC, timeout=0.1) as pool:
+        with pytest.raises(SetupPyTimeoutError):
+            list(pool.submit(str(tmp_path / "setup.py")))
+
+    # The worker was killed rather than waited for
+    assert time.perf_counter() - start < 30
+
+
+def test_setup_py_worker_pool_worker_exits(tmp_path):
+    (tmp_path / "setup.py").write_text("import os\nos._exit(1)\n")
+    path = str(tmp_path / "setup.py")
+
+    with SetupPyWorkerPool(1, mode=SetupPyMode.EXEC) as pool:
+        with pytest.raises(SetupPyWorkerError) as exc_info:
+            list(pool.submit(path))
+
+        assert exc_info.value.file_path == path
+
+        # The pool can't be used anymore
+        with pytest.raises(SetupPyWorkerError):
+            list(pool.submit(path))
+
+
+def test_list_packages_from_files_setup_py_workers_preserves_order():
+    path = os.path.join(test_cases_path, "list-1/requirements.txt")
+
+    options = dict(
+        recurse_recursive=True,
+        recurse_editable=True,
+        setup_py_mode=SetupPyMode.EXEC,
+    )
+
+    expected = [str(req) for req in list_packages_from_files([path], **options)]
+    actual = [
+        str(req)
+        for req in list_packages_from_files(
+            [path], setup_py_workers=2, **options
+        )
+    ]
+
+    assert actual == expected
@@ -0,0 +1,92 @@
+import io
+import json
+import threading
+
+from pippackagelist.list_packages_from_files import list_packages_from_files
+from pippackagelist.run_observer import RunObserverGroup, RunStatistics
+from pippackagelist.trace_recorder import TraceRecorder
+
+
+def _create_files(tmp_path):
+    (tmp_path / "constraints.txt").write_text("redis==2.0\n")
+    (tmp_path / "base.txt").write_text("django==1.0\nredis\n")
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package/setup.py").write_text(
+        "from setuptools import setup\n\n"
+        "setup(install_requires=['django==1.0'])\n"
+    )
+    (tmp_path / "requirements.txt").write_text(
+        "-c constraints.txt\n-r base.txt\n-e ./package\n"
+    )
+
+    return str(tmp_path / "requirements.txt")
+
+
+def _spans(events, category):
+    return [
+        event
+        for event in events
+        if event["ph"] == "X" and event["cat"] == category
+    ]
+
+
+def test_trace_recorder(tmp_path):
+    trace = TraceRecorder()
+    statistics = RunStatistics()
+
+    list(
+        list_packages_from_files(
+            [_create_files(tmp_path)],
+            recurse_recursive=True,
+            recurse_editable=True,
+            inline_constraints=True,
+            observer=RunObserverGroup([trace, statistics]),
+        )
+    )
+
+    out = io.StringIO()
+    trace.write(out)
+    events = json.loads(out.getvalue())["traceEvents"]
+
+    assert {
+        event["name"]: event["args"]["entries"]
+        for event in _spans(events, "requirements.txt")
+    } == {
+        str(tmp_path / "requirements.txt"): 3,
+        str(tmp_path / "base.txt"): 2,
+        str(tmp_path / "constraints.txt"): 1,
+    }
+    assert [event["name"] for event in _spans(events, "setup.py")] == [
+        str(tmp_path / "package/setup.py")
+    ]
+
+    # The files are parsed while the entries are being traversed
+    stages = {event["name"]: event for event in _spans(events, "stage")}
+    traverse = stages["traverse"]
+    for event in _spans(events, "setup.py"):
+        assert traverse["ts"] <= event["ts"]
+        assert event["ts"] + event["dur"] <= traverse["ts"] + traverse["dur"]
+
+    assert set(stages) == set(statistics.stage_durations)
+
+    # Requirements files are parsed while looking for -c entries and
+    # aren't parsed again during the traversal
+    prescan = stages["prescan_constraints"]
+    for event in _spans(events, "requirements.txt"):
+        if event["name"].endswith("base.txt"):
+            assert prescan["ts"] <= event["ts"]
+            assert event["ts"] + event["dur"] <= prescan["ts"] + prescan["dur"]
+
+    # An arrow from requirements.txt to each file it includes that's
+    # parsed during the traversal.
+    flows = [event for event in events if event["ph"] in ("s", "f")]
+    assert len(flows) == 2
+    assert {event["ts"] for event in flows if event["ph"] == "f"} == {
+        event["ts"] for event in _spans(events, "setup.py")
+    }
+
+    assert {
+        event["args"]["name"]
+        for event in events
+        if event["name"] == "thread_name"
+    } == {threading.current_thread().name}
@@ -0,0 +1,180 @@
+import os
+
+from pippackagelist.__main__ import main
+from pippackagelist.update_root_outputs import (
+    root_output_path,
+    update_root_outputs,
+)
+
+
+def _create_monorepo(tmp_path):
+    (tmp_path / "common").mkdir()
+    (tmp_path / "common/base.txt").write_text("requests==2.0\n")
+    (tmp_path / "common/constraints.txt").write_text("redis==2.0\n")
+
+    (tmp_path / "service-a").mkdir()
+    (tmp_path / "service-a/requirements.txt").write_text(
+        "-r ../common/base.txt\ndjango==1.0\n"
+    )
+
+    (tmp_path / "service-b").mkdir()
+    (tmp_path / "service-b/requirements.txt").write_text(
+        "-c ../common/constraints.txt\nredis\n"
+    )
+
+    return [
+        str(tmp_path / "service-a/requirements.txt"),
+        str(tmp_path / "service-b/requirements.txt"),
+    ]
+
+
+def test_update_root_outputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    root_paths = _create_monorepo(tmp_path)
+    output_dir = str(tmp_path / "output")
+
+    options = dict(recurse_recursive=True, inline_constraints=True)
+
+    assert update_root_outputs(root_paths, output_dir, **options) == [
+        os.path.join(output_dir, "service-a/requirements.txt"),
+        os.path.join(output_dir, "service-b/requirements.txt"),
+    ]
+
+    assert (tmp_path / "output/service-a/requirements.txt").read_text() == (
+        "django==1.0\nrequests==2.0\n"
+    )
+    assert (tmp_path / "output/service-b/requirements.txt").read_text() == (
+        "redis==2.0\n"
+    )
+
+    # Nothing that any of the roots includes changed
+    (tmp_path / "unrelated.txt").write_text("celery==4.0\n")
+    assert (
+        update_root_outputs(
+            root_paths,
+            output_dir,
+            changed_files=["unrelated.txt"],
+            **options,
+        )
+        == []
+    )
+
+    (tmp_path / "common/base.txt").write_text("requests==2.1\n")
+    (tmp_path / "common/constraints.txt").write_text("redis==2.1\n")
+
+    # Only the root including the changed file is listed again
+    assert update_root_outputs(
+        root_paths,
+        output_dir,
+        changed_files=["common/constraints.txt"],
+        **options,
+    ) == [os.path.join(output_dir, "service-b/requirements.txt")]
+
+    assert (tmp_path / "output/service-a/requirements.txt").read_text() == (
+        "django==1.0\nrequests==2.0\n"
+    )
+    assert (tmp_path / "output/service-b/requirements.txt").read_text() == (
+        "redis==2.1\n"
+    )
+
+    # Different options invalidate all roots
+    assert update_root_outputs(
+        root_paths,
+        output_dir,
+        changed_files=[],
+        recurse_recursive=True,
+    ) == [
+        os.path.join(output_dir, "service-a/requirements.txt"),
+        os.path.join(output_dir, "service-b/requirements.txt"),
+    ]
+
+
+def test_update_root_outputs_missing_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    root_paths = _create_monorepo(tmp_path)
+    output_dir = str(tmp_path / "output")
+
+    update_root_outputs(root_paths, output_dir)
+    os.unlink(tmp_path / "output/service-a/requirements.txt")
+
+    assert update_root_outputs(root_paths, output_dir, changed_files=[]) == [
+        os.path.join(output_dir, "service-a/requirements.txt")
+    ]
+
+
+def test_update_root_outputs_read_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package/setup.py").write_text(
+        "from setuptools import setup\n\n"
+        "with open('requirements.txt') as fp:\n"
+        "    requirements = fp.read().splitlines()\n\n"
+        "setup(install_requires=requirements)\n"
+    )
+    (tmp_path / "package/requirements.txt").write_text("django==1.0\n")
+    (tmp_path / "requirements.txt").write_text("-e ./package\n")
+
+    root_paths = [str(tmp_path / "requirements.txt")]
+    output_dir = str(tmp_path / "output")
+    output_path = os.path.join(output_dir, "requirements.txt")
+
+    update_root_outputs(root_paths, output_dir, recurse_editable=True)
+
+    (tmp_path / "package/requirements.txt").write_text("django==2.0\n")
+    assert update_root_outputs(
+        root_paths,
+        output_dir,
+        changed_files=["package/requirements.txt"],
+        recurse_editable=True,
+    ) == [output_path]
+
+    with open(output_path, "r") as fp:
+        assert fp.read() == "django==2.0\n"
+
+
+def test_update_root_outputs_stats(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+
+    root_paths = _create_monorepo(tmp_path)
+    args = ["--recurse-recursive", "--output-dir", "output", "--stats"]
+
+    assert main(args + root_paths) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        os.path.join("output", "service-a/requirements.txt"),
+        os.path.join("output", "service-b/requirements.txt"),
+    ]
+
+    # A new observer every run doesn't make the roots out of date,
+    # service-b isn't listed again even though it would change.
+    (tmp_path / "common/base.txt").write_text("requests==2.1\n")
+    (tmp_path / "service-b/requirements.txt").write_text("celery\n")
+    assert (
+        main(
+            args
+            + ["--changed-files", "common/base.txt", "--trace-out"]
+            + ["trace.json"]
+            + root_paths
+        )
+        == 0
+    )
+    assert capsys.readouterr().out.splitlines() == [
+        os.path.join("output", "service-a/requirements.txt"),
+    ]
+
+
+def test_root_output_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert root_output_path("output", "service/requirements.txt") == (
+        os.path.join("output", "service/requirements.txt")
+    )
+
+    outside_path = os.path.join(
+        os.path.dirname(str(tmp_path)), "requirements.txt"
+    )
+    assert root_output_path("output", outside_path) == os.path.join(
+        "output", outside_path.lstrip(os.sep)
+    )
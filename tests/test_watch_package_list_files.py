@@ -0,0 +1,68 @@
+from pippackagelist.watch_package_list_files import watch_package_list_files
+
+
+def test_watch_package_list_files(tmp_path, capsys):
+    base_path = tmp_path / "base.txt"
+    base_path.write_text("django==1.0\n")
+
+    requirements_path = tmp_path / "requirements.txt"
+    requirements_path.write_text("-r base.txt\nredis==2.0\n")
+
+    output_path = tmp_path / "output.txt"
+
+    watcher = watch_package_list_files(
+        [str(requirements_path)],
+        str(output_path),
+        poll_interval=0.01,
+        recurse_recursive=True,
+    )
+
+    assert next(watcher) is True
+    assert output_path.read_text() == "redis==2.0\ndjango==1.0\n"
+
+    # Changed, but the list is still the same
+    base_path.write_text("# comment\ndjango==1.0\n")
+    assert next(watcher) is False
+
+    base_path.write_text("django==2.0.1\n")
+    assert next(watcher) is True
+    assert output_path.read_text() == "redis==2.0\ndjango==2.0.1\n"
+
+    # Errors are reported and the previous output is kept
+    requirements_path.write_text("-r missing.txt\nredis==2.0\n")
+    assert next(watcher) is False
+    assert "missing.txt" in capsys.readouterr().err
+    assert output_path.read_text() == "redis==2.0\ndjango==2.0.1\n"
+
+    (tmp_path / "missing.txt").write_text("celery==4.0\n")
+    assert next(watcher) is True
+    assert output_path.read_text() == "redis==2.0\ncelery==4.0\n"
+
+    watcher.close()
+
+
+def test_watch_package_list_files_setup_py_read_files(tmp_path):
+    (tmp_path / "setup.py").write_text(
+        "from setuptools import setup\n\n"
+        "with open('requirements.txt') as fp:\n"
+        "    requirements = fp.read().splitlines()\n\n"
+        "setup(install_requires=requirements)\n"
+    )
+    requirements_path = tmp_path / "requirements.txt"
+    requirements_path.write_text("django==1.0\n")
+
+    output_path = tmp_path / "output.txt"
+
+    watcher = watch_package_list_files(
+        [str(tmp_path / "setup.py")], str(output_path), poll_interval=0.01
+    )
+
+    assert next(watcher) is True
+    assert output_path.read_text() == "django==1.0\n"
+
+    requirements_path.write_text("django==2.0\n")
+    assert next(watcher) is True
+    assert output_path.read_text() == "django==2.0\n"
+
+    watcher.close()
+
@@ -0,0 +1,130 @@
+import importlib
+import json
+import os
+
+import pytest
+
+from pippackagelist.error import OutputProfilesError
+from pippackagelist.list_packages_from_files import DedupeMode
+from pippackagelist.write_output_profiles import (
+    OutputProfile,
+    read_output_profiles,
+    write_output_profiles,
+)
+
+
+def test_write_output_profiles_reads_files_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    (tmp_path / "constraints.txt").write_text("redis==2.0\n")
+    (tmp_path / "base.txt").write_text("git+https://github.com/a/b#egg=b\n")
+    (tmp_path / "requirements.txt").write_text(
+        "-r base.txt\n-c constraints.txt\nredis\ndjango==1.0\n"
+    )
+
+    parsed_paths = []
+
+    # The package exports a function with the same name as the module
+    module = importlib.import_module(
+        "pippackagelist.list_packages_from_files"
+    )
+    parse_requirements_txt = module.parse_requirements_txt
+
+    def _parse_requirements_txt(file_path, *args):
+        parsed_paths.append(os.path.basename(file_path))
+        return parse_requirements_txt(file_path, *args)
+
+    monkeypatch.setattr(
+        module, "parse_requirements_txt", _parse_requirements_txt
+    )
+
+    profiles = [
+        OutputProfile(str(tmp_path / "all.txt")),
+        OutputProfile(
+            str(tmp_path / "pinned.txt"),
+            inline_constraints=True,
+            remove_vcs=True,
+        ),
+        OutputProfile(
+            str(tmp_path / "versioned.txt"),
+            remove_constraints=True,
+            remove_unversioned=True,
+        ),
+    ]
+
+    assert write_output_profiles(
+        [str(tmp_path / "requirements.txt")],
+        profiles,
+        recurse_recursive=True,
+    ) == [profile.output_path for profile in profiles]
+
+    assert sorted(parsed_paths) == [
+        "base.txt",
+        "constraints.txt",
+        "requirements.txt",
+    ]
+
+    assert (tmp_path / "all.txt").read_text() == (
+        "-c constraints.txt\nredis\ndjango==1.0\n"
+        "git+https://github.com/a/b#egg=b\n"
+    )
+    assert (tmp_path / "pinned.txt").read_text() == (
+        "redis==2.0\ndjango==1.0\n"
+    )
+    assert (tmp_path / "versioned.txt").read_text() == (
+        "django==1.0\ngit+https://github.com/a/b#egg=b\n"
+    )
+
+
+def test_write_output_profiles_rejects_output_options(tmp_path):
+    with pytest.raises(TypeError):
+        write_output_profiles(
+            [str(tmp_path / "requirements.txt")],
+            [OutputProfile(str(tmp_path / "all.txt"))],
+            remove_vcs=True,
+        )
+
+
+def test_read_output_profiles(tmp_path):
+    profiles_path = tmp_path / "profiles.json"
+    profiles_path.write_text(
+        json.dumps(
+            {
+                "lists/all.txt": {},
+                "lists/unique.txt": {
+                    "remove-vcs": True,
+                    "dedupe-mode": "semantic",
+                },
+            }
+        )
+    )
+
+    assert read_output_profiles(str(profiles_path), remove_path=True) == [
+        OutputProfile(str(tmp_path / "lists/all.txt"), remove_path=True),
+        OutputProfile(
+            str(tmp_path / "lists/unique.txt"),
+            remove_path=True,
+            remove_vcs=True,
+            dedupe=True,
+            dedupe_mode=DedupeMode.SEMANTIC,
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "not json",
+        '["all.txt"]',
+        '{"all.txt": true}',
+        '{"all.txt": {"recurse-recursive": true}}',
+        '{"all.txt": {"remove-vcs": "yes"}}',
+        '{"all.txt": {"dedupe-mode": "fuzzy"}}',
+    ],
+)
+def test_read_output_profiles_invalid(tmp_path, content):
+    profiles_path = tmp_path / "profiles.json"
+    profiles_path.write_text(content)
+
+    with pytest.raises(OutputProfilesError):
+        read_output_profiles(str(profiles_path))
@@ -0,0 +1,90 @@
+import importlib
+import json
+import os
+
+import pytest
+
+from pippackagelist.error import RootsManifestError
+from pippackagelist.write_root_lists import (
+    read_roots_manifest,
+    write_root_lists,
+)
+
+
+def test_write_root_lists_parses_shared_files_once(tmp_path, monkeypatch):
+    (tmp_path / "base.txt").write_text("requests==2.0\n")
+    (tmp_path / "api.txt").write_text("-r base.txt\ndjango==1.0\n")
+    (tmp_path / "worker.txt").write_text("-r base.txt\ncelery==4.0\n")
+
+    parsed_paths = []
+
+    # The package exports a function with the same name as the module
+    module = importlib.import_module(
+        "pippackagelist.list_packages_from_files"
+    )
+    parse_requirements_txt = module.parse_requirements_txt
+
+    def _parse_requirements_txt(file_path, *args):
+        parsed_paths.append(os.path.basename(file_path))
+        return parse_requirements_txt(file_path, *args)
+
+    monkeypatch.setattr(
+        module, "parse_requirements_txt", _parse_requirements_txt
+    )
+
+    roots = {
+        str(tmp_path / "lists/api.txt"): [str(tmp_path / "api.txt")],
+        str(tmp_path / "lists/worker.txt"): [str(tmp_path / "worker.txt")],
+    }
+
+    assert write_root_lists(roots, recurse_recursive=True) == list(roots)
+    assert sorted(parsed_paths) == ["api.txt", "base.txt", "worker.txt"]
+
+    assert (tmp_path / "lists/api.txt").read_text() == (
+        "django==1.0\nrequests==2.0\n"
+    )
+    assert (tmp_path / "lists/worker.txt").read_text() == (
+        "celery==4.0\nrequests==2.0\n"
+    )
+
+    # Nothing changed, nothing is written
+    assert write_root_lists(roots, recurse_recursive=True) == []
+
+
+def test_read_roots_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "lists/api.txt": ["api/requirements.txt", "api/setup.py"],
+                "lists/worker.txt": "worker/requirements.txt",
+            }
+        )
+    )
+
+    assert read_roots_manifest(str(manifest_path)) == {
+        str(tmp_path / "lists/api.txt"): [
+            str(tmp_path / "api/requirements.txt"),
+            str(tmp_path / "api/setup.py"),
+        ],
+        str(tmp_path / "lists/worker.txt"): [
+            str(tmp_path / "worker/requirements.txt")
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "not json",
+        '["requirements.txt"]',
+        '{"lists/api.txt": 1}',
+        '{"lists/api.txt": ["requirements.txt", null]}',
+    ],
+)
+def test_read_roots_manifest_invalid(tmp_path, content):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(content)
+
+    with pytest.raises(RootsManifestError):
+        read_roots_manifest(str(manifest_path))